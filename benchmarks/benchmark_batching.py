@@ -0,0 +1,120 @@
+# benchmarks/benchmark_batching.py
+"""
+Throughput/latency benchmark of the serving app with and without micro-batching.
+
+Starts `uvicorn predict:app` once per mode and fires concurrent single-instance
+requests at it, then prints requests/sec and latency percentiles per mode.
+
+    python benchmarks/benchmark_batching.py --model_dir local_model_dir --concurrency 32
+"""
+import argparse
+import asyncio
+import json
+import os
+import subprocess
+import sys
+import time
+
+import httpx
+import numpy as np
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+SERVING_DIR = os.path.join(ROOT, "serving")
+
+INSTANCE = [18.0846, 0.0, 18.1, 0.0, 0.679, 6.434, 100.0, 1.8347, 24.0, 666.0, 20.2, 27.25, 29.05]
+
+
+def start_server(model_dir: str, port: int, env_overrides: dict) -> subprocess.Popen:
+    env = dict(os.environ)
+    env.update({
+        "AIP_MODEL_DIR": os.path.abspath(model_dir),
+        "AIP_HEALTH_ROUTE": "/health",
+        "AIP_PREDICT_ROUTE": "/predict",
+    })
+    env.update(env_overrides)
+    return subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "predict:app", "--port", str(port), "--log-level", "warning"],
+        cwd=SERVING_DIR,
+        env=env,
+    )
+
+
+def wait_until_healthy(url: str, timeout: float = 120.0):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            if httpx.get(f"{url}/health").status_code == 200:
+                return
+        except httpx.TransportError:
+            pass
+        time.sleep(0.5)
+    raise TimeoutError(f"Server at {url} did not become healthy within {timeout}s.")
+
+
+async def run_load(url: str, concurrency: int, num_requests: int) -> dict:
+    latencies = []
+    payload = {"instances": [INSTANCE]}
+    remaining = iter(range(num_requests))
+
+    async def worker(client):
+        for _ in remaining:
+            start = time.perf_counter()
+            response = await client.post(f"{url}/predict", json=payload)
+            response.raise_for_status()
+            latencies.append(time.perf_counter() - start)
+
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(limits=limits, timeout=60.0) as client:
+        # Warm up the connection pool and the model before timing
+        await asyncio.gather(*(client.post(f"{url}/predict", json=payload) for _ in range(concurrency)))
+        start = time.perf_counter()
+        await asyncio.gather(*(worker(client) for _ in range(concurrency)))
+        elapsed = time.perf_counter() - start
+
+    latencies_ms = np.array(latencies) * 1000
+    return {
+        "requests": num_requests,
+        "concurrency": concurrency,
+        "requests_per_sec": round(num_requests / elapsed, 1),
+        "p50_ms": round(float(np.percentile(latencies_ms, 50)), 2),
+        "p99_ms": round(float(np.percentile(latencies_ms, 99)), 2),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare batched and unbatched serving throughput.")
+    parser.add_argument("--model_dir", type=str, default=os.path.join(ROOT, "local_model_dir"),
+                        help="Directory containing model.keras.")
+    parser.add_argument("--concurrency", type=int, default=32, help="Number of concurrent clients.")
+    parser.add_argument("--requests", type=int, default=2000, help="Total requests per mode.")
+    parser.add_argument("--max_batch_size", type=int, default=64)
+    parser.add_argument("--max_batch_wait_ms", type=float, default=5.0)
+    parser.add_argument("--port", type=int, default=8090)
+    args = parser.parse_args()
+
+    modes = {
+        "unbatched": {"ENABLE_BATCHING": "0"},
+        "batched": {
+            "ENABLE_BATCHING": "1",
+            "MAX_BATCH_SIZE": str(args.max_batch_size),
+            "MAX_BATCH_WAIT_MS": str(args.max_batch_wait_ms),
+        },
+    }
+
+    results = {}
+    for mode, env_overrides in modes.items():
+        url = f"http://127.0.0.1:{args.port}"
+        server = start_server(args.model_dir, args.port, env_overrides)
+        try:
+            wait_until_healthy(url)
+            results[mode] = asyncio.run(run_load(url, args.concurrency, args.requests))
+        finally:
+            server.terminate()
+            server.wait()
+        print(f"{mode}: {results[mode]}")
+
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
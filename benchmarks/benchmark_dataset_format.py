@@ -0,0 +1,102 @@
+# benchmarks/benchmark_dataset_format.py
+"""
+Compares the .npz handoff between load_data and train.py with the memory-mapped
+.npy layout on load time, the time for one pass over the training rows, and
+peak memory.
+
+Each format is read in a fresh interpreter. Peak RSS (VmHWM) includes mapped
+file pages that the pass touched; anonymous RSS (RssAnon) is the memory that
+cannot simply be dropped and re-read from disk.
+
+    python benchmarks/benchmark_dataset_format.py --rows 2000000
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+
+import numpy as np
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, os.path.join(ROOT, "training"))
+
+LOAD_SCRIPT = """
+import json, sys, time
+import numpy as np
+from mmap_dataset import open_mmap_dataset
+path, mode, batch_size = sys.argv[1], sys.argv[2], int(sys.argv[3])
+start = time.perf_counter()
+if mode == "mmap":
+    X, y = open_mmap_dataset(path)["train"]
+else:
+    with np.load(path) as data:
+        X, y = data["X_train"], data["y_train"]
+load_s = time.perf_counter() - start
+
+# One pass over the training rows in batches, as an epoch of training would
+start = time.perf_counter()
+total = 0.0
+for i in range(0, len(X), batch_size):
+    total += float(np.asarray(X[i:i + batch_size], dtype=np.float32).sum()) + float(y[i:i + batch_size].sum())
+pass_s = time.perf_counter() - start
+
+status = {}
+with open("/proc/self/status") as f:
+    for line in f:
+        key, _, value = line.partition(":")
+        status[key] = value.split()
+print(json.dumps({"load_s": load_s, "pass_s": pass_s, "peak_rss_mb": int(status["VmHWM"][0]) / 1024,
+                  "anon_rss_mb": int(status["RssAnon"][0]) / 1024}))
+"""
+
+
+def write_datasets(directory: str, rows: int, features: int) -> dict:
+    from mmap_dataset import write_mmap_dataset
+
+    rng = np.random.default_rng(0)
+    X = rng.uniform(0, 100, size=(rows, features)).astype(np.float32)
+    y = X[:, :3].sum(axis=1)
+    num_train = int(rows * 0.8)
+    arrays = {"X_train": X[:num_train], "y_train": y[:num_train], "X_test": X[num_train:], "y_test": y[num_train:]}
+
+    paths = {
+        "npz": os.path.join(directory, "data.npz"),
+        "npz_compressed": os.path.join(directory, "data_compressed.npz"),
+        "mmap": os.path.join(directory, "mmap"),
+    }
+    np.savez(paths["npz"], **arrays)
+    np.savez_compressed(paths["npz_compressed"], **arrays)
+    write_mmap_dataset(paths["mmap"], {"train": (arrays["X_train"], arrays["y_train"]),
+                                       "test": (arrays["X_test"], arrays["y_test"])})
+    return paths
+
+
+def measure(path: str, mode: str, batch_size: int) -> dict:
+    env = dict(os.environ, PYTHONPATH=os.path.join(ROOT, "training"))
+    output = subprocess.check_output([sys.executable, "-c", LOAD_SCRIPT, path, mode, str(batch_size)],
+                                     env=env, text=True)
+    result = json.loads(output.strip().splitlines()[-1])
+    return {key: round(value, 3) for key, value in result.items()}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark .npz against the memory-mapped dataset layout.")
+    parser.add_argument("--rows", type=int, default=2_000_000)
+    parser.add_argument("--features", type=int, default=13)
+    parser.add_argument("--batch_size", type=int, default=1024)
+    args = parser.parse_args()
+
+    results = {}
+    with tempfile.TemporaryDirectory() as directory:
+        paths = write_datasets(directory, args.rows, args.features)
+        for mode, path in paths.items():
+            results[mode] = measure(path, mode, args.batch_size)
+            print(f"{mode}: {results[mode]}")
+
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
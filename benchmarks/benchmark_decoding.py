@@ -0,0 +1,74 @@
+# benchmarks/benchmark_decoding.py
+"""
+Microbenchmark of /predict request decoding cost per 10k rows, comparing the
+json.loads -> list -> ndarray baseline against each decoding path in
+serving/decoding.py.
+
+    python benchmarks/benchmark_decoding.py --rows 10000
+"""
+import argparse
+import io
+import json
+import os
+import sys
+import time
+
+import numpy as np
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, os.path.join(ROOT, "serving"))
+
+from decoding import decode_instances  # noqa: E402
+
+NUM_FEATURES = 13
+
+
+def baseline(body: bytes) -> np.ndarray:
+    """What a naive handler does: parse to Python lists, then convert."""
+    return np.asarray(json.loads(body)["instances"], dtype=np.float32)
+
+
+def time_per_call(fn, repeats: int) -> float:
+    fn()  # warm up
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    return float(np.median(timings))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark request decoding paths.")
+    parser.add_argument("--rows", type=int, default=10000, help="Rows per request body.")
+    parser.add_argument("--repeats", type=int, default=30)
+    args = parser.parse_args()
+
+    rows = np.random.default_rng(0).uniform(0, 700, size=(args.rows, NUM_FEATURES)).round(4)
+    json_body = json.dumps({"instances": rows.tolist()}).encode()
+    jsonl_body = "\n".join(json.dumps({"instances": row}) for row in rows.tolist()).encode()
+    raw_body = rows.astype("<f4").tobytes()
+    npy_buffer = io.BytesIO()
+    np.save(npy_buffer, rows.astype(np.float32))
+    npy_body = npy_buffer.getvalue()
+
+    cases = {
+        "json_baseline": lambda: baseline(json_body),
+        "json": lambda: decode_instances(json_body, "application/json", NUM_FEATURES),
+        "jsonlines": lambda: decode_instances(jsonl_body, "application/jsonlines", NUM_FEATURES),
+        "raw_float32": lambda: decode_instances(raw_body, "application/octet-stream", NUM_FEATURES),
+        "npy": lambda: decode_instances(npy_body, "application/x-npy", NUM_FEATURES),
+    }
+
+    scale = 10000 / args.rows
+    results = {}
+    for name, fn in cases.items():
+        ms_per_10k = time_per_call(fn, args.repeats) * 1000 * scale
+        results[name] = round(ms_per_10k, 3)
+        print(f"{name:>14}: {ms_per_10k:9.3f} ms per 10k rows")
+
+    print(json.dumps({"ms_per_10k_rows": results}, indent=2))
+
+
+if __name__ == "__main__":
+    main()
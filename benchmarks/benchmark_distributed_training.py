@@ -0,0 +1,88 @@
+# benchmarks/benchmark_distributed_training.py
+"""
+Measures training samples/sec as local multi-worker data parallel workers are
+added, next to a single-process baseline.
+
+Each worker is a separate train.py process in a local MultiWorkerMirroredStrategy
+cluster with `--threads_per_worker` intra-op threads. The per-worker batch size is
+fixed, so the global batch grows with the number of workers. Throughput is the
+median over the epochs after the first, which includes tracing.
+
+    python benchmarks/benchmark_distributed_training.py --workers 1 2 4 --rows 200000
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+
+import numpy as np
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, os.path.join(ROOT, "training"))
+
+
+def write_data(path: str, rows: int):
+    rng = np.random.default_rng(0)
+    X = rng.uniform(0, 10, size=(rows, 13)).astype(np.float32)
+    y = X[:, :3].sum(axis=1)
+    num_train = int(rows * 0.9)
+    np.savez(path, X_train=X[:num_train], y_train=y[:num_train], X_test=X[num_train:], y_test=y[num_train:])
+
+
+def run(directory: str, data_path: str, num_workers: int, args) -> dict:
+    from distributed import launch_local_workers
+
+    metrics_file = os.path.join(directory, f"metrics-{num_workers}.json")
+    train_args = [
+        "--model_dir", os.path.join(directory, f"model-{num_workers}"), "--data_path", data_path,
+        "--epochs", str(args.epochs), "--batch_size", str(args.batch_size), "--precision", args.precision,
+        "--intra_op_threads", str(args.threads_per_worker), "--inter_op_threads", "1",
+        "--early_stopping_patience", "0", "--checkpoint_every", "0", "--metrics_file", metrics_file,
+        "--export_formats", "numpy",
+    ]
+    if num_workers == 0:
+        subprocess.check_call([sys.executable, os.path.join(ROOT, "training", "train.py"), *train_args],
+                              stdout=subprocess.DEVNULL)
+    elif max(launch_local_workers(num_workers, train_args)) != 0:
+        raise RuntimeError(f"Training with {num_workers} workers failed.")
+
+    with open(metrics_file) as f:
+        metrics = json.load(f)
+    return {
+        "samples_per_sec": round(float(np.median(metrics["samples_per_sec"][1:] or metrics["samples_per_sec"])), 1),
+        "global_batch_size": metrics["global_batch_size"],
+        "test_mae": round(metrics["test_mae"], 4),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark multi-worker training throughput scaling.")
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument("--rows", type=int, default=200_000)
+    parser.add_argument("--epochs", type=int, default=3)
+    parser.add_argument("--batch_size", type=int, default=256, help="Batch size per worker")
+    parser.add_argument("--threads_per_worker", type=int, default=1)
+    parser.add_argument("--precision", type=str, choices=["float32", "mixed_bfloat16"], default="float32")
+    args = parser.parse_args()
+    # The workers inherit the environment; keep their TensorFlow logging quiet
+    os.environ.setdefault("TF_CPP_MIN_LOG_LEVEL", "3")
+
+    results = {}
+    with tempfile.TemporaryDirectory() as directory:
+        data_path = os.path.join(directory, "data.npz")
+        write_data(data_path, args.rows)
+        results["single_process"] = run(directory, data_path, 0, args)
+        print(f"single process: {results['single_process']}")
+        for num_workers in args.workers:
+            result = run(directory, data_path, num_workers, args)
+            result["speedup"] = round(result["samples_per_sec"] / results["single_process"]["samples_per_sec"], 2)
+            results[f"{num_workers}_workers"] = result
+            print(f"{num_workers} worker(s): {result}")
+
+    print(json.dumps({"cpu_count": os.cpu_count(), "precision": args.precision, "results": results}, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+# benchmarks/benchmark_explain.py
+"""
+Measures what the explain route's attributions cost relative to a plain
+prediction of the same batch, per serving backend, batch size and number of
+integrated-gradients steps.
+
+explain() stacks every instance's interpolation points into one batch, so its
+cost grows with batch_size x steps rows through a forward and backward pass.
+The looped column explains the same instances one request at a time, which is
+what a client without a batched route would do.
+
+    python benchmarks/benchmark_explain.py --model_dir local_model_dir
+    python benchmarks/benchmark_explain.py --backends numpy --batch_sizes 1 64 --steps 16 50 200
+"""
+import argparse
+import json
+import os
+import sys
+import time
+
+import numpy as np
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, os.path.join(ROOT, "serving"))
+
+
+def median_ms(fn, repeats: int) -> float:
+    fn()  # warm up, e.g. tracing the tf.function
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    return float(np.median(timings)) * 1000
+
+
+def measure(predictor, batch_sizes, steps_list, repeats: int, loop_max_batch: int) -> list:
+    from explain import explain
+
+    rng = np.random.default_rng(0)
+    rows = []
+    for batch_size in batch_sizes:
+        X = rng.uniform(0, 100, size=(batch_size, predictor.num_features)).astype(np.float32)
+        predict_ms = median_ms(lambda: predictor.predict(X), repeats)
+        for steps in steps_list:
+            explain_ms = median_ms(lambda: explain(predictor, X, steps=steps), repeats)
+            row = {"batch_size": batch_size, "steps": steps, "predict_ms": round(predict_ms, 4),
+                   "explain_ms": round(explain_ms, 3), "explain_over_predict": round(explain_ms / predict_ms, 1)}
+            if batch_size <= loop_max_batch:
+                looped_ms = median_ms(lambda: [explain(predictor, X[i:i + 1], steps=steps) for i in range(batch_size)],
+                                      max(1, repeats // 5))
+                row["looped_ms"] = round(looped_ms, 3)
+                row["batched_speedup"] = round(looped_ms / explain_ms, 1)
+            rows.append(row)
+            print(row)
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark explain attributions against plain predictions.")
+    parser.add_argument("--model_dir", type=str, default=os.path.join(ROOT, "local_model_dir"))
+    parser.add_argument("--backends", type=str, nargs="+", default=["numpy", "keras"],
+                        help="Backends of load_predictor(); savedmodel and tflite need their exported artifacts.")
+    parser.add_argument("--batch_sizes", type=int, nargs="+", default=[1, 16, 256])
+    parser.add_argument("--steps", type=int, nargs="+", default=[16, 50, 200])
+    parser.add_argument("--repeats", type=int, default=20)
+    parser.add_argument("--loop_max_batch", type=int, default=16,
+                        help="Largest batch that is also explained one instance at a time.")
+    parser.add_argument("--output_file", type=str, default="", help="Also write the JSON report here.")
+    args = parser.parse_args()
+
+    from backends import load_predictor
+
+    report = {}
+    for backend in args.backends:
+        print(f"{backend}:")
+        predictor = load_predictor(args.model_dir, backend)
+        report[backend] = measure(predictor, args.batch_sizes, args.steps, args.repeats, args.loop_max_batch)
+
+    if args.output_file:
+        with open(args.output_file, "w") as f:
+            json.dump(report, f, indent=2)
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
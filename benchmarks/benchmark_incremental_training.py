@@ -0,0 +1,112 @@
+# benchmarks/benchmark_incremental_training.py
+"""
+Compares incremental (warm-start) retraining with full retraining as daily
+shards of new data arrive.
+
+A base dataset is trained on once. Then, for every simulated day, a new shard
+is generated whose target drifts a little from the day before, and the model
+is brought up to date in two ways:
+  full         a new model trained from scratch on the base data and every shard so far
+  incremental  the previous day's model trained further on the new shard plus the
+               replay sample of earlier data (train.py --training_mode incremental)
+Both are tested on held-out rows of the new day. The report has the wall time
+(of the whole train.py run) and test MAE of both, per day and in total.
+
+    python benchmarks/benchmark_incremental_training.py --base_rows 50000 --rows_per_day 5000 --days 5
+"""
+import argparse
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+
+
+def make_day(day: int, rows: int, drift: float, seed: int):
+    """One day of data; the weight of feature 3 in the target grows by `drift` a day."""
+    rng = np.random.default_rng(seed)
+    X = rng.uniform(0, 10, size=(rows, 13)).astype(np.float32)
+    y = X[:, :3].sum(axis=1) + day * drift * X[:, 3] + rng.normal(scale=0.5, size=rows)
+    return X, y.astype(np.float32)
+
+
+def write_npz(path: str, X, y, X_test, y_test):
+    np.savez(path, X_train=X, y_train=y, X_test=X_test, y_test=y_test)
+
+
+def train(train_args: list) -> dict:
+    metrics_file = train_args[train_args.index("--metrics_file") + 1]
+    start = time.perf_counter()
+    subprocess.check_call([sys.executable, os.path.join(ROOT, "training", "train.py"), *train_args],
+                          stdout=subprocess.DEVNULL)
+    wall_time = time.perf_counter() - start
+    with open(metrics_file) as f:
+        return {"wall_time_s": round(wall_time, 2), "test_mae": round(json.load(f)["test_mae"], 4)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare incremental and full retraining on daily shards.")
+    parser.add_argument("--base_rows", type=int, default=50_000)
+    parser.add_argument("--rows_per_day", type=int, default=5_000)
+    parser.add_argument("--days", type=int, default=5)
+    parser.add_argument("--drift", type=float, default=0.1, help="Daily change of one target coefficient")
+    parser.add_argument("--epochs", type=int, default=10, help="Epochs of the base and full runs")
+    parser.add_argument("--incremental_epochs", type=int, default=5)
+    parser.add_argument("--replay_size", type=int, default=10_000)
+    parser.add_argument("--batch_size", type=int, default=128)
+    parser.add_argument("--output_file", type=str, default="", help="Also write the JSON report here.")
+    args = parser.parse_args()
+    os.environ.setdefault("TF_CPP_MIN_LOG_LEVEL", "3")
+
+    common = ["--batch_size", str(args.batch_size), "--early_stopping_patience", "0", "--checkpoint_every", "0",
+              "--export_formats", "numpy", "--replay_size", str(args.replay_size)]
+    days = []
+    with tempfile.TemporaryDirectory() as directory:
+        X, y = make_day(0, args.base_rows, args.drift, seed=0)
+        X_test, y_test = make_day(0, 2000, args.drift, seed=1)
+        write_npz(os.path.join(directory, "base.npz"), X, y, X_test, y_test)
+        incremental_dir = os.path.join(directory, "incremental")
+        metrics = os.path.join(directory, "metrics.json")
+        base = train(["--model_dir", incremental_dir, "--data_path", os.path.join(directory, "base.npz"),
+                      "--epochs", str(args.epochs), "--normalize", "--metrics_file", metrics, *common])
+        print(f"base: {base}")
+
+        for day in range(1, args.days + 1):
+            X_new, y_new = make_day(day, args.rows_per_day, args.drift, seed=2 * day)
+            X_test, y_test = make_day(day, 2000, args.drift, seed=2 * day + 1)
+            shard = os.path.join(directory, f"day-{day:03d}.npz")
+            write_npz(shard, X_new, y_new, X_test, y_test)
+            X, y = np.concatenate([X, X_new]), np.concatenate([y, y_new])
+            # Shuffled, since Keras' validation_split would otherwise hold out all of the newest rows
+            order = np.random.default_rng(day).permutation(len(X))
+            write_npz(os.path.join(directory, "all.npz"), X[order], y[order], X_test, y_test)
+
+            full_dir = os.path.join(directory, "full")
+            shutil.rmtree(full_dir, ignore_errors=True)
+            full = train(["--model_dir", full_dir, "--data_path", os.path.join(directory, "all.npz"),
+                          "--epochs", str(args.epochs), "--normalize", "--metrics_file", metrics, *common])
+            incremental = train(["--model_dir", incremental_dir, "--training_mode", "incremental",
+                                 "--new_data_path", shard, "--epochs", str(args.incremental_epochs),
+                                 "--metrics_file", metrics, *common])
+            days.append({"day": day, "total_rows": len(X), "full": full, "incremental": incremental})
+            print(f"day {day}: {days[-1]}")
+
+    totals = {mode: {"wall_time_s": round(sum(day[mode]["wall_time_s"] for day in days), 2),
+                     "mean_test_mae": round(float(np.mean([day[mode]["test_mae"] for day in days])), 4)}
+              for mode in ("full", "incremental")}
+    totals["speedup"] = round(totals["full"]["wall_time_s"] / totals["incremental"]["wall_time_s"], 2)
+    report = {"base": base, "days": days, "totals": totals}
+    if args.output_file:
+        with open(args.output_file, "w") as f:
+            json.dump(report, f, indent=2)
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
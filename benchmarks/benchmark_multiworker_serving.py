@@ -0,0 +1,149 @@
+# benchmarks/benchmark_multiworker_serving.py
+"""
+Measures serving throughput and total memory as uvicorn workers are added, with
+the NumPy weights memory-mapped and shared between the workers or copied into
+each of them.
+
+By default a synthetic NumPy model with large hidden layers is generated, so
+the weights are big enough for sharing to show. Memory is the summed PSS
+(proportional set size) of the server and its workers, which splits shared
+pages between the processes that map them; the summed RSS would count them
+once per worker.
+
+    python benchmarks/benchmark_multiworker_serving.py --workers 1 2 4 --width 4096
+"""
+import argparse
+import asyncio
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+import httpx
+import numpy as np
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+SERVING_DIR = os.path.join(ROOT, "serving")
+sys.path.insert(0, ROOT)
+sys.path.insert(0, SERVING_DIR)
+
+
+def write_synthetic_model(model_dir: str, width: int, depth: int, num_features: int = 13):
+    from backends import NumpyFeedForward
+
+    rng = np.random.default_rng(0)
+    sizes = [num_features] + [width] * depth + [1]
+    kernels = [(rng.normal(size=(n_in, n_out)) / np.sqrt(n_in)).astype(np.float32)
+               for n_in, n_out in zip(sizes[:-1], sizes[1:])]
+    biases = [np.zeros(n_out, dtype=np.float32) for n_out in sizes[1:]]
+    activations = ["relu"] * depth + ["linear"]
+    probe_inputs = rng.normal(size=(8, num_features)).astype(np.float32)
+    probe_outputs = NumpyFeedForward(kernels, biases, activations).predict(probe_inputs)
+    os.makedirs(model_dir, exist_ok=True)
+    np.savez(os.path.join(model_dir, "model_weights.npz"), num_layers=len(kernels),
+             activations=np.array(activations), probe_inputs=probe_inputs, probe_outputs=probe_outputs,
+             **{f"kernel_{i}": k for i, k in enumerate(kernels)}, **{f"bias_{i}": b for i, b in enumerate(biases)})
+
+
+def process_tree(pid: int) -> list:
+    pids = [pid]
+    for task in os.listdir(f"/proc/{pid}/task"):
+        try:
+            with open(f"/proc/{pid}/task/{task}/children") as f:
+                children = [int(child) for child in f.read().split()]
+        except OSError:
+            continue
+        for child in children:
+            pids.extend(process_tree(child))
+    return pids
+
+
+def memory_mb(pids: list) -> dict:
+    totals = {"Pss": 0, "Rss": 0}
+    for pid in pids:
+        try:
+            with open(f"/proc/{pid}/smaps_rollup") as f:
+                for line in f:
+                    key = line.split(":")[0]
+                    if key in totals:
+                        totals[key] += int(line.split()[1])
+        except OSError:
+            pass
+    return {"total_pss_mb": round(totals["Pss"] / 1024, 1), "total_rss_mb": round(totals["Rss"] / 1024, 1)}
+
+
+def wait_until_ready(url: str, num_workers: int, timeout: float = 180.0):
+    # Any one worker answering is not enough; send requests until every worker has answered
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            if httpx.get(f"{url}/health").status_code == 200:
+                time.sleep(1.0 + 0.5 * num_workers)
+                return
+        except httpx.TransportError:
+            pass
+        time.sleep(0.5)
+    raise TimeoutError(f"Server at {url} did not become healthy within {timeout}s.")
+
+
+def run(model_dir: str, num_workers: int, mmap: bool, args) -> dict:
+    from scripts.load_test import run_load_test, synthetic_rows
+
+    env = dict(os.environ, AIP_MODEL_DIR=model_dir, AIP_HEALTH_ROUTE="/health", AIP_PREDICT_ROUTE="/predict",
+               AIP_HTTP_PORT=str(args.port), WORKERS=str(num_workers), MMAP_WEIGHTS="1" if mmap else "0",
+               MODEL_BACKEND="numpy", MODEL_POLL_INTERVAL_S="0", CACHE_MAX_ENTRIES="0", LOG_LEVEL="warning")
+    server = subprocess.Popen([sys.executable, "server.py"], cwd=SERVING_DIR, env=env)
+    url = f"http://127.0.0.1:{args.port}"
+    try:
+        wait_until_ready(url, num_workers)
+        report = asyncio.run(run_load_test(f"{url}/predict", synthetic_rows(10000), args.batch_size,
+                                           concurrency=args.concurrency, duration=args.duration,
+                                           warmup_requests=4 * num_workers))
+        result = {
+            "throughput_rps": report["throughput_rps"],
+            "rows_per_sec": report["rows_per_sec"],
+            "p50_ms": report["latency_ms"]["p50"],
+            "p99_ms": report["latency_ms"]["p99"],
+            "error_rate": report["error_rate"],
+        }
+        result.update(memory_mb(process_tree(server.pid)))
+        return result
+    finally:
+        server.terminate()
+        server.wait()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark multi-worker serving throughput and memory.")
+    parser.add_argument("--model_dir", type=str, default="",
+                        help="Directory with model_weights.npz; a synthetic model is generated if not given.")
+    parser.add_argument("--width", type=int, default=4096, help="Hidden units of the synthetic model.")
+    parser.add_argument("--depth", type=int, default=3, help="Hidden layers of the synthetic model.")
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--batch_size", type=int, default=1)
+    parser.add_argument("--duration", type=float, default=10.0)
+    parser.add_argument("--port", type=int, default=8095)
+    args = parser.parse_args()
+
+    results = {}
+    with tempfile.TemporaryDirectory() as directory:
+        model_dir = args.model_dir
+        if not model_dir:
+            model_dir = os.path.join(directory, "model")
+            write_synthetic_model(model_dir, args.width, args.depth)
+        weights_mb = round(os.path.getsize(os.path.join(model_dir, "model_weights.npz")) / 2 ** 20, 1)
+        print(f"Model with {weights_mb} MB of weights")
+        for num_workers in args.workers:
+            for mmap in (True, False):
+                key = f"{num_workers}_workers_{'mmap' if mmap else 'copied'}"
+                results[key] = run(os.path.abspath(model_dir), num_workers, mmap, args)
+                print(f"{key}: {results[key]}")
+
+    print(json.dumps({"cpu_count": os.cpu_count(), "weights_mb": weights_mb, "results": results}, indent=2))
+
+
+if __name__ == "__main__":
+    main()
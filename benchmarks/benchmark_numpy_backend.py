@@ -0,0 +1,84 @@
+# benchmarks/benchmark_numpy_backend.py
+"""
+Compares the NumPy and Keras serving backends on cold start, peak memory and
+per-batch latency.
+
+Cold start and memory are measured in a fresh interpreter per backend, covering
+imports, model loading and the first prediction.
+
+    python benchmarks/benchmark_numpy_backend.py --model_dir local_model_dir
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+
+import numpy as np
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, os.path.join(ROOT, "serving"))
+
+# VmHWM is read from /proc rather than getrusage(), since ru_maxrss survives exec
+# and would report the parent's peak when it has already imported TensorFlow
+COLD_START_SCRIPT = """
+import json, sys, time
+start = time.perf_counter()
+import numpy as np
+from backends import load_predictor
+predictor = load_predictor(sys.argv[1], sys.argv[2])
+predictor.predict(np.zeros((1, predictor.num_features), dtype=np.float32))
+elapsed = time.perf_counter() - start
+with open("/proc/self/status") as f:
+    peak_kb = next(int(line.split()[1]) for line in f if line.startswith("VmHWM:"))
+print(json.dumps({"cold_start_s": elapsed, "peak_rss_mb": peak_kb / 1024}))
+"""
+
+
+def measure_cold_start(model_dir: str, backend: str) -> dict:
+    env = dict(os.environ, PYTHONPATH=os.path.join(ROOT, "serving"), TF_CPP_MIN_LOG_LEVEL="3")
+    output = subprocess.check_output(
+        [sys.executable, "-c", COLD_START_SCRIPT, model_dir, backend], env=env, text=True
+    )
+    result = json.loads(output.strip().splitlines()[-1])
+    return {key: round(value, 3) for key, value in result.items()}
+
+
+def measure_latency(predictor, batch_sizes, repeats: int) -> dict:
+    rng = np.random.default_rng(0)
+    latencies = {}
+    for batch_size in batch_sizes:
+        X = rng.uniform(0, 100, size=(batch_size, predictor.num_features)).astype(np.float32)
+        predictor.predict(X)  # warm up
+        timings = []
+        for _ in range(repeats):
+            start = time.perf_counter()
+            predictor.predict(X)
+            timings.append(time.perf_counter() - start)
+        latencies[str(batch_size)] = round(float(np.median(timings)) * 1000, 4)
+    return latencies
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the NumPy backend against the Keras backend.")
+    parser.add_argument("--model_dir", type=str, default=os.path.join(ROOT, "local_model_dir"),
+                        help="Directory with model.keras and model_weights.npz.")
+    parser.add_argument("--batch_sizes", type=int, nargs="+", default=[1, 32, 1024, 65536])
+    parser.add_argument("--repeats", type=int, default=50)
+    args = parser.parse_args()
+
+    from backends import load_predictor
+
+    results = {}
+    for backend in ["keras", "numpy"]:
+        results[backend] = measure_cold_start(args.model_dir, backend)
+        predictor = load_predictor(args.model_dir, backend)
+        results[backend]["median_latency_ms"] = measure_latency(predictor, args.batch_sizes, args.repeats)
+        print(f"{backend}: {results[backend]}")
+
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
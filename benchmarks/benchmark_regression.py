@@ -0,0 +1,296 @@
+# benchmarks/benchmark_regression.py
+"""
+Performance regression suite. Measures the numbers a change is most likely to
+slow down and compares them with a stored JSON baseline:
+
+  build      feed_forward_net build (and compile) time
+  train      training/train.py samples/sec
+  load       serving model load time (backends.load_predictor)
+  predict    p50 predict latency at batch sizes 1, 32, 1024 and 65536
+  serving    request throughput of the serving container (serving/server.py) under load
+
+Every metric has a relative tolerance. A metric regresses when it is worse than
+its baseline by more than that, e.g. a latency 30% above the baseline with a
+tolerance of 0.25; the report lists every metric and the run exits with status
+1 if any regressed. Faster results never fail; --save_baseline records them.
+Timings on a shared machine are noisy, so the groups of regressed metrics are
+measured again (--retries) and every metric keeps its best value before the
+run is failed.
+
+Baselines only compare like with like. Record one per machine type, and the
+environment it was measured in is stored with it and shown in the report.
+
+    python benchmarks/benchmark_regression.py --save_baseline
+    python benchmarks/benchmark_regression.py --tolerance 0.3 --metric_tolerance predict_p50_ms_1=0.5
+    python benchmarks/benchmark_regression.py --groups build predict --baseline benchmarks/baselines/ci.json
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+SERVING_DIR = os.path.join(ROOT, "serving")
+sys.path.insert(0, ROOT)
+DEFAULT_BASELINE = os.path.join(ROOT, "benchmarks", "baselines", "baseline.json")
+GROUPS = ["build", "train", "load", "predict", "serving"]
+PREDICT_BATCH_SIZES = [1, 32, 1024, 65536]
+# Relative tolerance of each metric; small-batch latencies are the noisiest
+DEFAULT_TOLERANCES = {
+    "build_time_s": 0.3,
+    "train_samples_per_sec": 0.25,
+    "load_time_s": 0.5,
+    **{f"predict_p50_ms_{batch_size}": 0.5 if batch_size < 1024 else 0.3 for batch_size in PREDICT_BATCH_SIZES},
+    "serving_throughput_rps": 0.25,
+}
+HIGHER_IS_BETTER = {"train_samples_per_sec", "serving_throughput_rps"}
+
+
+def metric_group(name: str) -> str:
+    return name.split("_")[0]
+
+
+def best(name: str, values: list):
+    return max(values) if name in HIGHER_IS_BETTER else min(values)
+
+
+def environment() -> dict:
+    import tensorflow as tf
+
+    return {"platform": platform.platform(), "python": platform.python_version(), "cpu_count": os.cpu_count(),
+            "numpy": np.__version__, "tensorflow": tf.__version__}
+
+
+def timed(fn, repeats: int) -> float:
+    """Median wall time of `repeats` calls of `fn`."""
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    return float(np.median(timings))
+
+
+def measure_build(repeats: int) -> dict:
+    import tensorflow as tf
+    from training.model import feed_forward_net
+
+    def build():
+        tf.keras.backend.clear_session()
+        feed_forward_net((13,))
+
+    build()
+    return {"build_time_s": round(timed(build, repeats), 4)}
+
+
+def write_training_data(path: str, rows: int):
+    rng = np.random.default_rng(0)
+    X = rng.uniform(0, 10, size=(rows, 13)).astype(np.float32)
+    y = (X[:, :3].sum(axis=1) + rng.normal(scale=0.5, size=rows)).astype(np.float32)
+    np.savez(path, X_train=X, y_train=y, X_test=X[:1000], y_test=y[:1000])
+
+
+def measure_train(directory: str, model_dir: str, args) -> dict:
+    """
+    Runs train.py and returns the best samples/sec of the epochs after the
+    first, which includes tracing. Epochs this short vary a lot from one to
+    the next, and the best of them is far steadier across runs than the median.
+    """
+    data_path = os.path.join(directory, "train.npz")
+    metrics_file = os.path.join(directory, "metrics.json")
+    write_training_data(data_path, args.train_rows)
+    subprocess.check_call([sys.executable, os.path.join(ROOT, "training", "train.py"), "--model_dir", model_dir,
+                           "--data_path", data_path, "--epochs", str(args.train_epochs),
+                           "--batch_size", str(args.train_batch_size), "--early_stopping_patience", "0",
+                           "--checkpoint_every", "0", "--normalize", "--metrics_file", metrics_file],
+                          stdout=subprocess.DEVNULL)
+    with open(metrics_file) as f:
+        history = json.load(f)["samples_per_sec"]
+    return {"train_samples_per_sec": round(float(max(history[1:] or history)), 1)}
+
+
+def measure_load_and_predict(model_dir: str, groups: list, args) -> dict:
+    sys.path.insert(0, SERVING_DIR)
+    from backends import load_predictor, warmup_batches
+
+    results = {}
+    if "load" in groups:
+        results["load_time_s"] = round(timed(lambda: load_predictor(model_dir, args.backend), args.load_repeats), 4)
+    if "predict" in groups:
+        predictor = load_predictor(model_dir, args.backend)
+        for batch in warmup_batches(model_dir, predictor.num_features):
+            predictor.predict(batch)
+        rng = np.random.default_rng(0)
+        for batch_size in PREDICT_BATCH_SIZES:
+            X = rng.uniform(0, 100, size=(batch_size, predictor.num_features)).astype(np.float32)
+            predictor.predict(X)
+            # Fewer repeats of the large batches, so each size takes about as long
+            repeats = max(5, min(args.predict_repeats, args.predict_repeats * 32 // batch_size))
+            results[f"predict_p50_ms_{batch_size}"] = round(timed(lambda: predictor.predict(X), repeats) * 1000, 4)
+    return results
+
+
+def measure_serving(model_dir: str, args) -> dict:
+    from benchmarks.benchmark_multiworker_serving import wait_until_ready
+    from scripts.load_test import run_load_test, synthetic_rows
+
+    env = dict(os.environ, AIP_MODEL_DIR=model_dir, AIP_HEALTH_ROUTE="/health", AIP_PREDICT_ROUTE="/predict",
+               AIP_HTTP_PORT=str(args.port), MODEL_BACKEND=args.backend, MODEL_POLL_INTERVAL_S="0",
+               CACHE_MAX_ENTRIES="0", LOG_LEVEL="warning")
+    server = subprocess.Popen([sys.executable, "server.py"], cwd=SERVING_DIR, env=env)
+    url = f"http://127.0.0.1:{args.port}"
+    try:
+        wait_until_ready(url, 1)
+        report = asyncio.run(run_load_test(f"{url}/predict", synthetic_rows(10000), args.serving_batch_size,
+                                           concurrency=args.serving_concurrency, duration=args.serving_duration))
+    finally:
+        server.terminate()
+        server.wait()
+    if report["error_rate"]:
+        raise RuntimeError(f"Serving benchmark saw an error rate of {report['error_rate']}")
+    return {"serving_throughput_rps": report["throughput_rps"]}
+
+
+def run_benchmarks(groups: list, args) -> dict:
+    results = {}
+    if "build" in groups:
+        results.update(measure_build(args.build_repeats))
+    with tempfile.TemporaryDirectory() as directory:
+        # The model trained for the train benchmark is the one loaded and served, unless --model_dir is given
+        trained_dir = os.path.join(directory, "model")
+        needs_model = any(group in groups for group in ("load", "predict", "serving"))
+        if "train" in groups or (needs_model and not args.model_dir):
+            measured = measure_train(directory, trained_dir, args)
+            if "train" in groups:
+                results.update(measured)
+        model_dir = args.model_dir or trained_dir
+        if "load" in groups or "predict" in groups:
+            results.update(measure_load_and_predict(model_dir, groups, args))
+        if "serving" in groups:
+            results.update(measure_serving(os.path.abspath(model_dir), args))
+    return results
+
+
+def compare(results: dict, baseline: dict, tolerances: dict) -> dict:
+    """
+    Compares `results` with the baseline's metrics. Returns per-metric rows
+    with the relative change (positive is better) and a status of "ok",
+    "improved", "regressed" or "new", and the names of the regressed metrics.
+    """
+    rows = {}
+    for name, value in results.items():
+        if name not in baseline:
+            rows[name] = {"value": value, "baseline": None, "change": None, "tolerance": None, "status": "new"}
+            continue
+        reference = baseline[name]["value"]
+        tolerance = tolerances[name]
+        change = (value - reference) / reference if reference else 0.0
+        if name not in HIGHER_IS_BETTER:
+            change = -change
+        status = "regressed" if change < -tolerance else "improved" if change > tolerance else "ok"
+        rows[name] = {"value": value, "baseline": reference, "change": round(change, 4), "tolerance": tolerance,
+                      "status": status}
+    return {"metrics": rows, "regressions": [name for name, row in rows.items() if row["status"] == "regressed"]}
+
+
+def resolve_tolerances(baseline: dict, tolerance: float = None, metric_tolerances: dict = None) -> dict:
+    """Per-metric tolerances: --metric_tolerance, then --tolerance, then the baseline's own, then the defaults."""
+    tolerances = dict(DEFAULT_TOLERANCES)
+    tolerances.update({name: row["tolerance"] for name, row in baseline.items() if "tolerance" in row})
+    if tolerance is not None:
+        tolerances = {name: tolerance for name in tolerances}
+    tolerances.update(metric_tolerances or {})
+    return tolerances
+
+
+def parse_metric_tolerances(values: list) -> dict:
+    tolerances = {}
+    for value in values:
+        name, _, tolerance = value.partition("=")
+        if name not in DEFAULT_TOLERANCES or not tolerance:
+            raise ValueError(f"Expected <metric>=<tolerance> with one of {sorted(DEFAULT_TOLERANCES)}, got {value!r}")
+        tolerances[name] = float(tolerance)
+    return tolerances
+
+
+def save_baseline(path: str, results: dict, tolerances: dict, existing: dict):
+    # Metrics that were not measured this time keep their previous baseline
+    metrics = dict(existing)
+    metrics.update({name: {"value": value, "higher_is_better": name in HIGHER_IS_BETTER,
+                           "tolerance": tolerances[name]} for name, value in results.items()})
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    with open(path, "w") as f:
+        json.dump({"environment": environment(), "metrics": metrics}, f, indent=2)
+        f.write("\n")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the performance regression benchmarks against a baseline.")
+    parser.add_argument("--baseline", type=str, default=DEFAULT_BASELINE, help="Baseline JSON file")
+    parser.add_argument("--save_baseline", action="store_true",
+                        help="Record the results as the baseline instead of failing on regressions")
+    parser.add_argument("--groups", type=str, nargs="+", choices=GROUPS, default=GROUPS)
+    parser.add_argument("--tolerance", type=float, default=None, help="Relative tolerance of every metric")
+    parser.add_argument("--metric_tolerance", type=str, nargs="*", default=[],
+                        help="Per-metric tolerances as <metric>=<tolerance>")
+    parser.add_argument("--retries", type=int, default=1,
+                        help="Times the groups of regressed metrics are measured again before failing")
+    parser.add_argument("--model_dir", type=str, default="",
+                        help="Model to load, predict with and serve; one is trained if not given")
+    parser.add_argument("--backend", type=str, default="auto", help="Serving backend, as MODEL_BACKEND")
+    parser.add_argument("--build_repeats", type=int, default=20)
+    parser.add_argument("--train_rows", type=int, default=50_000)
+    parser.add_argument("--train_epochs", type=int, default=6)
+    parser.add_argument("--train_batch_size", type=int, default=128)
+    parser.add_argument("--load_repeats", type=int, default=10)
+    parser.add_argument("--predict_repeats", type=int, default=200)
+    parser.add_argument("--serving_duration", type=float, default=10.0)
+    parser.add_argument("--serving_concurrency", type=int, default=16)
+    parser.add_argument("--serving_batch_size", type=int, default=1)
+    parser.add_argument("--port", type=int, default=8096)
+    parser.add_argument("--output_file", type=str, default="", help="Also write the JSON report here.")
+    args = parser.parse_args()
+    os.environ.setdefault("TF_CPP_MIN_LOG_LEVEL", "3")
+
+    existing = {}
+    if os.path.exists(args.baseline):
+        with open(args.baseline) as f:
+            stored = json.load(f)
+        existing, baseline_environment = stored["metrics"], stored.get("environment", {})
+    else:
+        baseline_environment = None
+    tolerances = resolve_tolerances(existing, args.tolerance, parse_metric_tolerances(args.metric_tolerance))
+
+    results = run_benchmarks(args.groups, args)
+    comparison = compare(results, existing, tolerances)
+    for _ in range(0 if args.save_baseline else args.retries):
+        if not comparison["regressions"]:
+            break
+        groups = sorted({metric_group(name) for name in comparison["regressions"]}, key=GROUPS.index)
+        print(f"Measuring {', '.join(groups)} again after regressions in {', '.join(comparison['regressions'])}")
+        for name, value in run_benchmarks(groups, args).items():
+            results[name] = best(name, [results[name], value])
+        comparison = compare(results, existing, tolerances)
+    report = {"environment": environment(), "baseline_environment": baseline_environment, **comparison}
+    if args.output_file:
+        with open(args.output_file, "w") as f:
+            json.dump(report, f, indent=2)
+    print(json.dumps(report, indent=2))
+
+    if args.save_baseline:
+        save_baseline(args.baseline, results, tolerances, existing)
+        print(f"Baseline saved to {args.baseline}")
+    elif report["regressions"]:
+        print(f"Regressed beyond tolerance: {', '.join(report['regressions'])}", file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
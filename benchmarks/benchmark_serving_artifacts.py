@@ -0,0 +1,62 @@
+# benchmarks/benchmark_serving_artifacts.py
+"""
+Compares p50/p99 prediction latency of the serving artifacts: model.keras, the
+NumPy weights, the traced SavedModel and the TFLite flatbuffer.
+
+Each backend is loaded and warmed up with the exported warmup requests before
+it is timed, as the serving container does at startup. Export the artifacts
+first with training/train.py or training/export.py.
+
+    python benchmarks/benchmark_serving_artifacts.py --model_dir local_model_dir
+"""
+import argparse
+import json
+import os
+import sys
+import time
+
+import numpy as np
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, os.path.join(ROOT, "serving"))
+
+
+def measure_latency(predictor, batch_size: int, repeats: int) -> dict:
+    X = np.random.default_rng(0).uniform(0, 100, size=(batch_size, predictor.num_features)).astype(np.float32)
+    predictor.predict(X)
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        predictor.predict(X)
+        timings.append(time.perf_counter() - start)
+    p50, p99 = np.percentile(timings, [50, 99]) * 1000
+    return {"p50_ms": round(float(p50), 4), "p99_ms": round(float(p99), 4)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark prediction latency of each serving artifact.")
+    parser.add_argument("--model_dir", type=str, default=os.path.join(ROOT, "local_model_dir"),
+                        help="Directory with the artifacts written by training/export.py.")
+    parser.add_argument("--backends", type=str, nargs="+", default=["keras", "numpy", "savedmodel", "tflite"])
+    parser.add_argument("--batch_sizes", type=int, nargs="+", default=[1, 64, 1000, 1024])
+    parser.add_argument("--repeats", type=int, default=200)
+    args = parser.parse_args()
+
+    from backends import load_predictor, warmup_batches
+
+    results = {}
+    for backend in args.backends:
+        start = time.perf_counter()
+        predictor = load_predictor(args.model_dir, backend)
+        for batch in warmup_batches(args.model_dir, predictor.num_features):
+            predictor.predict(batch)
+        results[backend] = {"load_and_warmup_s": round(time.perf_counter() - start, 3)}
+        for batch_size in args.batch_sizes:
+            results[backend][str(batch_size)] = measure_latency(predictor, batch_size, args.repeats)
+        print(f"{backend}: {results[backend]}")
+
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+# benchmarks/benchmark_startup.py
+"""
+Measures cold-start time: how long a fresh interpreter takes to import each
+subcommand of scripts/cli.py, and how long the serving container (serving/server.py)
+takes from process start until /health answers 200, which is what a new Vertex
+replica waits for before it takes traffic.
+
+Import times are the median wall time of `python -c "import <module>"` over
+--repeats fresh processes, less that of an empty interpreter. The serving
+model is a small synthetic NumPy model, so the time is mostly imports.
+
+    python benchmarks/benchmark_startup.py --repeats 5
+    python benchmarks/benchmark_startup.py --commands serve train --serving_repeats 10
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+import httpx
+import numpy as np
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+SERVING_DIR = os.path.join(ROOT, "serving")
+sys.path.insert(0, ROOT)
+sys.path.insert(0, SERVING_DIR)
+# The serving app reads its routes when it is imported
+SERVING_ENV = {"AIP_HEALTH_ROUTE": "/health", "AIP_PREDICT_ROUTE": "/predict"}
+
+
+def run_seconds(command: list, env: dict) -> float:
+    start = time.perf_counter()
+    result = subprocess.run(command, cwd=ROOT, env=env, capture_output=True)
+    elapsed = time.perf_counter() - start
+    if result.returncode:
+        raise RuntimeError(f"{' '.join(command)} failed:\n{result.stderr.decode()}")
+    return elapsed
+
+
+def import_seconds(modules: list, path: list, repeats: int, env: dict) -> float:
+    code = f"import sys; sys.path[:0] = {path!r}\n" + "".join(f"import {module}\n" for module in modules)
+    return float(np.median([run_seconds([sys.executable, "-c", code], env) for _ in range(repeats)]))
+
+
+def time_to_healthy(model_dir: str, port: int, timeout: float = 60.0) -> float:
+    env = dict(os.environ, **SERVING_ENV, AIP_MODEL_DIR=model_dir, AIP_HTTP_PORT=str(port),
+               MODEL_POLL_INTERVAL_S="0", LOG_LEVEL="warning")
+    start = time.perf_counter()
+    server = subprocess.Popen([sys.executable, "server.py"], cwd=SERVING_DIR, env=env)
+    try:
+        while time.perf_counter() - start < timeout:
+            try:
+                if httpx.get(f"http://127.0.0.1:{port}/health", timeout=1.0).status_code == 200:
+                    return time.perf_counter() - start
+            except httpx.TransportError:
+                pass
+            if server.poll() is not None:
+                raise RuntimeError(f"The server exited with status {server.returncode}")
+            time.sleep(0.01)
+        raise TimeoutError(f"The server did not become healthy within {timeout}s")
+    finally:
+        server.terminate()
+        server.wait()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure CLI import times and serving cold start.")
+    parser.add_argument("--commands", type=str, nargs="*", default=None,
+                        help="CLI subcommands to time; all of them by default")
+    parser.add_argument("--repeats", type=int, default=5)
+    parser.add_argument("--serving_repeats", type=int, default=5, help="0 skips the serving cold start")
+    parser.add_argument("--port", type=int, default=8097)
+    parser.add_argument("--output_file", type=str, default="", help="Also write the JSON report here.")
+    args = parser.parse_args()
+
+    from scripts.cli import COMMANDS, command_path
+
+    env = dict(os.environ, **SERVING_ENV, TF_CPP_MIN_LOG_LEVEL="3")
+    interpreter = float(np.median([run_seconds([sys.executable, "-c", "pass"], env) for _ in range(args.repeats)]))
+    report = {"interpreter_s": round(interpreter, 3), "import_s": {}}
+    for name in args.commands if args.commands is not None else COMMANDS:
+        command = COMMANDS[name]
+        try:
+            seconds = import_seconds(command.modules, command_path(command), args.repeats, env) - interpreter
+            report["import_s"][name] = round(seconds, 3)
+        except RuntimeError as e:
+            # e.g. a subcommand whose optional dependency is not installed here
+            report["import_s"][name] = str(e).strip().splitlines()[-1]
+        print(f"{name}: {report['import_s'][name]}")
+
+    if args.serving_repeats:
+        from benchmarks.benchmark_multiworker_serving import write_synthetic_model
+
+        with tempfile.TemporaryDirectory() as directory:
+            write_synthetic_model(directory, width=64, depth=2)
+            timings = [time_to_healthy(directory, args.port) for _ in range(args.serving_repeats)]
+        report["serving_time_to_healthy_s"] = {"p50": round(float(np.median(timings)), 3),
+                                               "min": round(min(timings), 3), "max": round(max(timings), 3)}
+
+    if args.output_file:
+        with open(args.output_file, "w") as f:
+            json.dump(report, f, indent=2)
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
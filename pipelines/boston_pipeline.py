@@ -15,19 +15,36 @@ from kfp.dsl import (Dataset, Output, Input, Model)
 def load_data(output_data: Output[Dataset]):
     """
     Loads data (in real scenario, from GCS/BigQuery),
-    saves as .npz for the training container.
+    saves it as memory-mapped .npy arrays plus a manifest for the training container.
+    The layout matches training/mmap_dataset.py; it is inlined because this step
+    runs in a plain Python image without the repository code.
     """
+    import json
+    import os
     import numpy as np
     import tensorflow as tf
 
     (X_train, y_train), (X_test, y_test) = tf.keras.datasets.boston_housing.load_data()
-
-    # Save to a local .npz file
-    npz_path = f"{output_data.path}.npz"  # .path is a directory, so we add .npz
-    np.savez(npz_path, X_train=X_train, y_train=y_train, X_test=X_test, y_test=y_test)
-
-    # This is important so the next step can see the actual file
-    output_data.metadata["npz_file"] = npz_path
+    splits = {"train": (X_train, y_train), "test": (X_test, y_test)}
+
+    # .path is a directory; write X.npy, y.npy and manifest.json into it.
+    # float32 is what the model trains on, so store that instead of float64
+    dataset_dir = output_data.path
+    os.makedirs(dataset_dir, exist_ok=True)
+    manifest = {"format_version": 1, "arrays": {}, "splits": {}}
+    for index, name in enumerate(["X", "y"]):
+        array = np.concatenate([split[index] for split in splits.values()]).astype(np.float32)
+        np.save(os.path.join(dataset_dir, f"{name}.npy"), array)
+        manifest["arrays"][name] = {"file": f"{name}.npy", "shape": list(array.shape), "dtype": array.dtype.str}
+    start = 0
+    for name, (X, _) in splits.items():
+        manifest["splits"][name] = [start, start + len(X)]
+        start += len(X)
+    with open(os.path.join(dataset_dir, "manifest.json"), "w") as f:
+        json.dump(manifest, f, indent=2)
+
+    # This is important so the next step can see the actual files
+    output_data.metadata["dataset_dir"] = dataset_dir
 
 
 # 2) Train Model (container step)
@@ -36,14 +53,23 @@ def train_model(
     data: Input[Dataset],
     output_model: Output[Model],
     project_id: str,
-    model_dir: str = "artifacts"
+    model_dir: str = "artifacts",
+    training_mode: str = "full",
+    new_data_path: str = "",
 ):
+    # "incremental" warm-starts from the model already in model_dir and trains on new_data_path
+    # (a gs:// glob of new .npz shards) plus the replay sample saved with that model
     return ContainerSpec(
         image=f"europe-west1-docker.pkg.dev/{project_id}/boston-example/boston-training-image:latest",
         command=["python", "train.py"],
         args=[
             "--model_dir", model_dir,
-            "--data_path", data.metadata["npz_file"],
+            "--data_path", data.metadata["dataset_dir"],
+            "--training_mode", training_mode,
+            "--new_data_path", new_data_path,
+            # Vertex runs can be preempted: checkpoint every epoch so a retry can --resume
+            "--early_stopping_patience", "3",
+            "--checkpoint_every", "1",
         ],
     )
 
@@ -99,7 +125,8 @@ def deploy_model(
 
 # 4) Define Pipeline
 @dsl.pipeline(name="boston-housing-pipeline")
-def boston_pipeline(project_id: str = "affor-models", region: str = "europe-west1"):
+def boston_pipeline(project_id: str = "affor-models", region: str = "europe-west1", training_mode: str = "full",
+                    new_data_path: str = ""):
     # Step A: load data
     data_task = load_data()
 
@@ -108,6 +135,8 @@ def boston_pipeline(project_id: str = "affor-models", region: str = "europe-west
         data=data_task.outputs["output_data"],
         project_id=project_id,
         model_dir="gs://boston-example/artifacts",
+        training_mode=training_mode,
+        new_data_path=new_data_path,
     )
 
     # Step C: deploy model
@@ -0,0 +1,162 @@
+# pipelines/local_runner.py
+"""
+Runs the load_data -> train_model -> deploy_model graph of boston_pipeline.py on
+this machine, each step as a plain subprocess, with deployment replaced by a copy
+into a local serving model directory (see pipelines/local_steps.py).
+
+Every step's outputs are cached under a key that hashes its command and
+parameters, the contents of its code and data files, and the keys of the steps
+it consumes, so a step only reruns when something it depends on has changed:
+
+    python -m pipelines.local_runner --deploy_dir local_model_dir -- --epochs 20 --normalize
+"""
+import argparse
+import glob
+import hashlib
+import json
+import os
+import shutil
+import subprocess
+import sys
+import time
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+
+CACHE_DIR = ".pipeline_cache"
+STEP_FILE = "step.json"
+
+
+def _hash_file(digest, path):
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+
+
+class Step:
+    """
+    One pipeline step.
+
+    `command(inputs, output_dir)` returns the argv to run, given the output
+    directories of the `inputs` steps by name. `files` are hashed by content
+    into the cache key (code, and data read from outside the pipeline); globs
+    are expanded. Steps with `cache=False` always run, e.g. for side effects
+    like deployment.
+    """
+
+    def __init__(self, name, command, inputs=(), files=(), cache=True):
+        self.name = name
+        self.command = command
+        self.inputs = list(inputs)
+        self.files = list(files)
+        self.cache = cache
+
+    def cache_key(self, input_keys):
+        digest = hashlib.sha256()
+        # The command is hashed with placeholder paths, since the real ones contain cache keys
+        placeholders = {name: f"{{{name}}}" for name in self.inputs}
+        digest.update(json.dumps([self.name, self.command(placeholders, "{output}")]).encode())
+        for name in self.inputs:
+            digest.update(f"{name}:{input_keys[name]};".encode())
+        for path in sorted({path for pattern in self.files for path in glob.glob(pattern)}):
+            digest.update(os.path.relpath(path, ROOT).encode())
+            _hash_file(digest, path)
+        return digest.hexdigest()[:16]
+
+
+def _topological_order(steps):
+    order, done = [], set()
+    pending = list(steps)
+    while pending:
+        ready = [step for step in pending if all(name in done for name in step.inputs)]
+        if not ready:
+            raise ValueError(f"Steps have missing or circular inputs: {[step.name for step in pending]}")
+        for step in ready:
+            order.append(step)
+            done.add(step.name)
+            pending.remove(step)
+    return order
+
+
+def run_pipeline(steps, cache_dir=CACHE_DIR, use_cache=True, env=None):
+    """
+    Runs `steps` in dependency order and returns {step name: {"key", "output_dir",
+    "cached", "seconds"}}. A step's outputs are written to a scratch directory and
+    only moved to <cache_dir>/<step>/<key> once it succeeds, so a failed or
+    interrupted step never leaves an entry that later runs would reuse.
+    """
+    results = {}
+    for step in _topological_order(steps):
+        key = step.cache_key({name: results[name]["key"] for name in step.inputs})
+        output_dir = os.path.abspath(os.path.join(cache_dir, step.name, key))
+        start = time.perf_counter()
+        cached = use_cache and step.cache and os.path.exists(os.path.join(output_dir, STEP_FILE))
+        if cached:
+            print(f"[{step.name}] cached ({key})")
+        else:
+            scratch = f"{output_dir}.tmp-{os.getpid()}"
+            shutil.rmtree(scratch, ignore_errors=True)
+            os.makedirs(scratch)
+            command = step.command({name: results[name]["output_dir"] for name in step.inputs}, scratch)
+            print(f"[{step.name}] running ({key}): {' '.join(command)}")
+            subprocess.run(command, check=True, cwd=ROOT, env=env)
+            with open(os.path.join(scratch, STEP_FILE), "w") as f:
+                json.dump({"step": step.name, "key": key, "command": command, "finished_at": time.time()}, f)
+            shutil.rmtree(output_dir, ignore_errors=True)
+            os.replace(scratch, output_dir)
+        results[step.name] = {"key": key, "output_dir": output_dir, "cached": cached,
+                              "seconds": round(time.perf_counter() - start, 3)}
+    return results
+
+
+def boston_steps(deploy_dir, train_args=(), source=""):
+    """The load_data -> train_model -> deploy_model graph, with `train_args` passed on to train.py."""
+    python = sys.executable
+    training_code = os.path.join(ROOT, "training", "*.py")
+    return [
+        Step(
+            "load_data",
+            lambda inputs, output: [python, "-m", "pipelines.local_steps", "load_data", "--output_dir", output,
+                                    "--source", source],
+            files=[os.path.join(ROOT, "pipelines", "local_steps.py"),
+                   os.path.join(ROOT, "training", "mmap_dataset.py"), *([source] if source else [])],
+        ),
+        Step(
+            "train_model",
+            lambda inputs, output: [python, os.path.join(ROOT, "training", "train.py"), "--model_dir", output,
+                                    "--data_path", inputs["load_data"], *train_args],
+            inputs=["load_data"],
+            files=[training_code],
+        ),
+        Step(
+            "deploy_model",
+            lambda inputs, output: [python, "-m", "pipelines.local_steps", "deploy_model",
+                                    "--model_dir", inputs["train_model"], "--deploy_dir", deploy_dir],
+            inputs=["train_model"],
+            files=[os.path.join(ROOT, "pipelines", "local_steps.py")],
+            cache=False,
+        ),
+    ]
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Run the Boston pipeline locally with cached steps. Arguments after -- are passed to train.py."
+    )
+    parser.add_argument("--deploy_dir", type=str, default=os.path.join(ROOT, "local_model_dir"),
+                        help="Model directory the local deploy step copies the trained model into")
+    parser.add_argument("--data_path", type=str, default="",
+                        help=".npz with X_train, y_train, X_test, y_test; defaults to the built-in Boston data")
+    parser.add_argument("--cache_dir", type=str, default=os.path.join(ROOT, CACHE_DIR))
+    parser.add_argument("--no_cache", action="store_true", help="Rerun every step")
+    parser.add_argument("train_args", nargs=argparse.REMAINDER)
+    args = parser.parse_args()
+
+    train_args = args.train_args[1:] if args.train_args[:1] == ["--"] else args.train_args
+    source = os.path.abspath(args.data_path) if args.data_path else ""
+    steps = boston_steps(os.path.abspath(args.deploy_dir), train_args, source)
+    results = run_pipeline(steps, args.cache_dir, use_cache=not args.no_cache)
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
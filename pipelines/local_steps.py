@@ -0,0 +1,90 @@
+# pipelines/local_steps.py
+"""
+Local stand-ins for the load_data and deploy_model steps of boston_pipeline.py,
+run as subprocesses by pipelines/local_runner.py:
+
+    python -m pipelines.local_steps load_data --output_dir data
+    python -m pipelines.local_steps deploy_model --model_dir model --deploy_dir local_model_dir
+"""
+import argparse
+import json
+import os
+import shutil
+import sys
+import time
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, os.path.join(ROOT, "training"))
+
+DEPLOYMENT_FILE = "deployment.json"
+# Written by local_runner.py into every step output; not part of the model
+STEP_FILE = "step.json"
+
+
+def load_data(output_dir, source=None):
+    """
+    Writes the dataset as a memory-mapped dataset directory, like the pipeline's
+    load_data step. `source` is an .npz with X_train, y_train, X_test and y_test;
+    without it the built-in Boston Housing data is downloaded.
+    """
+    import numpy as np
+    from mmap_dataset import write_mmap_dataset
+
+    if source:
+        with np.load(source) as data:
+            X_train, y_train, X_test, y_test = (data[key] for key in ("X_train", "y_train", "X_test", "y_test"))
+    else:
+        import tensorflow as tf
+
+        (X_train, y_train), (X_test, y_test) = tf.keras.datasets.boston_housing.load_data()
+    splits = {
+        "train": (X_train.astype(np.float32), y_train.astype(np.float32)),
+        "test": (X_test.astype(np.float32), y_test.astype(np.float32)),
+    }
+    return write_mmap_dataset(output_dir, splits)
+
+
+def deploy_model(model_dir, deploy_dir):
+    """
+    Stands in for uploading and deploying to a Vertex AI endpoint: copies the model
+    artifacts into `deploy_dir`, the AIP_MODEL_DIR of a local serving container,
+    which picks up the new files on its next poll. The files are copied next to
+    their final names and then renamed, so the server never loads a half-copied model.
+    """
+    os.makedirs(deploy_dir, exist_ok=True)
+    staging = os.path.join(deploy_dir, ".staging")
+    shutil.rmtree(staging, ignore_errors=True)
+    shutil.copytree(model_dir, staging, ignore=shutil.ignore_patterns("checkpoints", STEP_FILE))
+    for name in os.listdir(staging):
+        target = os.path.join(deploy_dir, name)
+        if os.path.isdir(target):
+            shutil.rmtree(target)
+        os.replace(os.path.join(staging, name), target)
+    os.rmdir(staging)
+
+    deployment = {"model_dir": os.path.abspath(model_dir), "deployed_at": time.time()}
+    with open(os.path.join(deploy_dir, DEPLOYMENT_FILE), "w") as f:
+        json.dump(deployment, f, indent=2)
+    print(f"Deployed {model_dir} to {deploy_dir}")
+    return deploy_dir
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run one local pipeline step.")
+    subparsers = parser.add_subparsers(dest="step", required=True)
+    load = subparsers.add_parser("load_data")
+    load.add_argument("--output_dir", type=str, required=True)
+    load.add_argument("--source", type=str, default="", help=".npz to load instead of the built-in Boston data")
+    deploy = subparsers.add_parser("deploy_model")
+    deploy.add_argument("--model_dir", type=str, required=True)
+    deploy.add_argument("--deploy_dir", type=str, required=True)
+    args = parser.parse_args()
+
+    if args.step == "load_data":
+        load_data(args.output_dir, args.source)
+    else:
+        deploy_model(args.model_dir, args.deploy_dir)
+
+
+if __name__ == "__main__":
+    main()
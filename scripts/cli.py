@@ -0,0 +1,160 @@
+# scripts/cli.py
+"""
+Single entry point for the training, serving, prediction and Vertex AI scripts.
+
+Only the chosen subcommand's module is imported, when it runs, so listing the
+commands or running a light one never pays for TensorFlow, FastAPI or the
+Google Cloud clients. Everything after the command name is passed to it:
+
+    python -m scripts.cli train --model_dir local_model_dir --epochs 20 --normalize
+    python -m scripts.cli serve
+    python -m scripts.cli deploy-model
+
+--profile_imports imports the command's modules in a fresh interpreter under
+`python -X importtime` instead of running it, and reports where the startup
+time goes, per package and per module:
+
+    python -m scripts.cli --profile_imports serve
+"""
+import argparse
+import importlib
+import os
+import subprocess
+import sys
+from collections import defaultdict
+from typing import NamedTuple
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+# The serving app reads its routes when it is imported
+IMPORT_ENV = {"AIP_HEALTH_ROUTE": "/health", "AIP_PREDICT_ROUTE": "/predict"}
+
+
+class Command(NamedTuple):
+    # Directory of flat modules to put on sys.path ("" for the packages at the repo root)
+    directory: str
+    module: str
+    help: str
+    # Modules the command imports at startup besides its own, e.g. the app uvicorn loads
+    startup_modules: tuple = ()
+
+    @property
+    def modules(self) -> list:
+        return [self.module, *self.startup_modules]
+
+
+COMMANDS = {
+    "train": Command("training", "train", "Train the model and export the serving artifacts"),
+    "sweep": Command("training", "sweep", "Run a hyperparameter sweep over a process pool"),
+    "export": Command("training", "export", "Export serving artifacts from a saved model.keras"),
+    "evaluate": Command("training", "evaluation", "Error and drift report of prediction logs"),
+    "serve": Command("serving", "server", "Start the serving container's app", ("predict",)),
+    "prediction-input": Command("", "scripts.create_prediction_input", "Generate prediction inputs of any size"),
+    "payload": Command("", "scripts.json_payload", "Convert a JSONL file into online prediction payloads"),
+    "local-predict": Command("", "scripts.run_local_predict", "Predict locally with a model from the registry"),
+    "local-batch-predict": Command("", "scripts.run_local_batch_prediction", "Score a JSONL file locally"),
+    "load-test": Command("", "scripts.load_test", "Load test a running serving container"),
+    "pipeline-local": Command("", "pipelines.local_runner", "Run the pipeline graph on this machine"),
+    "pipeline": Command("", "scripts.run_boston_pipeline", "Compile and submit the pipeline to Vertex AI"),
+    "custom-training-job": Command("scripts", "run_custom_training_job", "Submit a custom training job"),
+    "upload-model": Command("scripts", "run_upload_model", "Upload the trained model to the Model Registry"),
+    "deploy-model": Command("scripts", "run_deploy_model", "Deploy a registered model to an endpoint"),
+    "undeploy-model": Command("scripts", "run_undeploy_model", "Undeploy every model from an endpoint"),
+    "batch-predict": Command("scripts", "run_batch_prediction", "Run a batch prediction job"),
+    "online-predict": Command("scripts", "run_online_prediction", "Send an online prediction request"),
+}
+
+
+def command_path(command: Command) -> list:
+    """The sys.path entries `command` imports from."""
+    return [os.path.join(ROOT, command.directory)] if command.directory else [ROOT]
+
+
+def run(name: str, argv: list):
+    command = COMMANDS[name]
+    for path in reversed(command_path(command) + [ROOT]):
+        if path not in sys.path:
+            sys.path.insert(0, path)
+    # The command parses its own arguments from sys.argv
+    sys.argv = [f"{os.path.basename(sys.executable)} -m scripts.cli {name}", *argv]
+    importlib.import_module(command.module).main()
+
+
+def parse_importtime(lines) -> list:
+    """
+    Parses `python -X importtime` output into (module, self_us, cumulative_us,
+    depth) tuples, in the order the imports finished.
+    """
+    imports = []
+    for line in lines:
+        if not line.startswith("import time:"):
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|", 2)
+        if not self_us.strip().isdigit():
+            continue  # The header
+        name = name[1:].rstrip("\n")
+        depth = (len(name) - len(name.lstrip(" "))) // 2
+        imports.append((name.strip(), int(self_us), int(cumulative_us), depth))
+    return imports
+
+
+def summarize_imports(imports, top: int = 15) -> dict:
+    """Total import time, and the most expensive packages (summed self time of their modules) and modules."""
+    packages = defaultdict(int)
+    for module, self_us, _, _ in imports:
+        packages[module.split(".")[0]] += self_us
+    by_module = sorted(imports, key=lambda row: row[1], reverse=True)
+    return {
+        "total_ms": round(sum(row[2] for row in imports if row[3] == 0) / 1000, 1),
+        "packages": [(package, round(us / 1000, 1))
+                     for package, us in sorted(packages.items(), key=lambda item: item[1], reverse=True)[:top]],
+        "modules": [(module, round(self_us / 1000, 1), round(cumulative_us / 1000, 1))
+                    for module, self_us, cumulative_us, _ in by_module[:top]],
+    }
+
+
+def profile_imports(name: str, top: int) -> dict:
+    """Imports the modules of command `name` in a fresh interpreter under -X importtime."""
+    command = COMMANDS[name]
+    code = (f"import sys; sys.path[:0] = {command_path(command) + [ROOT]!r}\n"
+            + "".join(f"import {module}\n" for module in command.modules))
+    env = dict(IMPORT_ENV, **os.environ)
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", code], env=env, capture_output=True,
+                            text=True)
+    lines = result.stderr.splitlines()
+    if result.returncode:
+        sys.stderr.write("\n".join(line for line in lines if not line.startswith("import time:")) + "\n")
+        raise SystemExit(f"Importing {', '.join(command.modules)} failed")
+    return summarize_imports(parse_importtime(lines), top)
+
+
+def print_profile(name: str, summary: dict):
+    print(f"{name}: {summary['total_ms']} ms of imports ({', '.join(COMMANDS[name].modules)})")
+    print(f"\n{'package':<40} {'self ms':>10}")
+    for package, ms in summary["packages"]:
+        print(f"{package:<40} {ms:>10}")
+    print(f"\n{'module':<40} {'self ms':>10} {'cumulative ms':>14}")
+    for module, self_ms, cumulative_ms in summary["modules"]:
+        print(f"{module:<40} {self_ms:>10} {cumulative_ms:>14}")
+
+
+def main(argv=None):
+    width = max(len(name) for name in COMMANDS)
+    parser = argparse.ArgumentParser(
+        prog="python -m scripts.cli", description="Run a project script; its own arguments follow the command.",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="commands:\n" + "\n".join(f"  {name:<{width}}  {command.help}" for name, command in COMMANDS.items()))
+    parser.add_argument("--profile_imports", action="store_true",
+                        help="Report the command's import time per package and module instead of running it")
+    parser.add_argument("--top", type=int, default=15, help="Rows of the import profile")
+    parser.add_argument("command", choices=COMMANDS, metavar="command")
+    parser.add_argument("args", nargs=argparse.REMAINDER, help="Arguments of the command")
+    args = parser.parse_args(argv)
+
+    if args.profile_imports:
+        print_profile(args.command, profile_imports(args.command, args.top))
+    else:
+        run(args.command, args.args)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,34 +1,247 @@
-import tensorflow as tf
-import json
+# scripts/create_prediction_input.py
+"""
+Generates Boston-shaped prediction inputs of any size, for batch prediction and
+for benchmarking the serving container. Rows come from the Boston test split
+(or an .npz/.npy given with --data_path), are bootstrap-resampled from it, or
+are drawn uniformly from the Boston feature ranges without any data.
+
+Rows are serialized column-wise with NumPy into fixed-width JSON numbers rather
+than one json.dumps per row, so a million rows take seconds. Output formats:
+  jsonl    one {"instances": [...]} record per line, sharded by --rows_per_shard
+  npy      float32 (n, 13) arrays, sharded by --rows_per_shard
+  payload  Vertex AI online prediction bodies, {"instances": [[...], ...]}, each
+           split to stay under --max_request_bytes
+
+    python -m scripts.create_prediction_input
+    python -m scripts.create_prediction_input --source resample --num_rows 1000000 --noise 0.05 \
+        --rows_per_shard 250000 --output_file bench/input.jsonl
+    python -m scripts.create_prediction_input --source synthetic --num_rows 100000 --format payload \
+        --output_file bench/payload.json
+"""
+import argparse
 import os
+import time
+
+import numpy as np
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+
+SOURCES = ["real", "resample", "synthetic"]
+FORMATS = ["jsonl", "npy", "payload"]
+# Vertex AI rejects online prediction requests larger than 1.5 MB
+DEFAULT_MAX_REQUEST_BYTES = 1_500_000
+# Rows formatted at a time, which bounds the memory used for any output size
+FORMAT_BLOCK_ROWS = 65536
+
+_PAYLOAD_HEADER = b'{"instances": [\n'
+_PAYLOAD_FOOTER = b"\n]}\n"
+
+
+def load_rows(data_path: str = "") -> np.ndarray:
+    """
+    Real feature rows: X_test (or X) of an .npz, an .npy array, or the Boston
+    Housing test split when no path is given.
+    """
+    if data_path.endswith(".npy"):
+        return np.load(data_path).astype(np.float32)
+    if data_path:
+        with np.load(data_path) as data:
+            return data["X_test" if "X_test" in data else "X"].astype(np.float32)
+    import tensorflow as tf
+
+    (_, _), (X_test, _) = tf.keras.datasets.boston_housing.load_data()
+    return X_test.astype(np.float32)
+
+
+def resample_rows(rows: np.ndarray, num_rows: int, noise: float = 0.0, seed: int = 0) -> np.ndarray:
+    """
+    Draws `num_rows` rows from `rows` with replacement. With `noise`, each feature
+    is jittered by that fraction of its standard deviation and clipped to the
+    observed range; features that only hold whole numbers stay whole.
+    """
+    rng = np.random.default_rng(seed)
+    sample = rows[rng.integers(0, len(rows), size=num_rows)].astype(np.float32)
+    if noise:
+        sample += rng.normal(scale=noise, size=sample.shape).astype(np.float32) * rows.std(axis=0)
+        np.clip(sample, rows.min(axis=0), rows.max(axis=0), out=sample)
+        whole = np.all(rows == np.round(rows), axis=0)
+        sample[:, whole] = np.round(sample[:, whole])
+    return sample
+
+
+def _format_column(values: np.ndarray, decimals: int) -> np.ndarray:
+    """One column as an (n, width) array of ASCII digits, right-aligned with spaces."""
+    scale = 10 ** decimals
+    scaled = np.rint(np.abs(values) * scale).astype(np.int64)
+    negative = (values < 0) & (scaled > 0)
+    whole, fraction = np.divmod(scaled, scale)
+    int_width = len(str(int(whole.max())))
+    sign_width = int(negative.any())
+    width = sign_width + int_width + (decimals + 1 if decimals else 0)
+
+    field = np.full((len(values), width), ord(" "), dtype=np.uint8)
+    num_digits = np.ones(len(values), dtype=np.int64)
+    for place in range(int_width):
+        column = sign_width + int_width - 1 - place
+        digits = ord("0") + whole % 10
+        if place == 0:
+            field[:, column] = digits
+        else:
+            # Leading zeros stay blank
+            shown = whole > 0
+            field[shown, column] = digits[shown]
+            num_digits += shown
+        whole = whole // 10
+    if decimals:
+        field[:, sign_width + int_width] = ord(".")
+        for place in range(decimals):
+            field[:, width - 1 - place] = ord("0") + fraction % 10
+            fraction = fraction // 10
+    if sign_width:
+        rows = np.flatnonzero(negative)
+        field[rows, sign_width + int_width - 1 - num_digits[rows]] = ord("-")
+    return field
+
+
+def format_rows(rows: np.ndarray, decimals: int = 4, prefix: bytes = b"[", suffix: bytes = b"]\n") -> np.ndarray:
+    """
+    Formats every row as `prefix` + a JSON list of its values + `suffix`, and
+    returns the lines as an (n, line_width) uint8 array, so `.tobytes()` is the
+    file contents. Numbers are rounded to `decimals` places and padded with
+    leading spaces to the widest value of their column, which JSON allows, so
+    all lines have the same length.
+    """
+    rows = np.asarray(rows, dtype=np.float64)
+    if rows.ndim != 2 or not len(rows):
+        raise ValueError(f"Expected a non-empty 2D array of rows, got shape {rows.shape}.")
+    if not np.isfinite(rows).all():
+        raise ValueError("Rows must not contain NaN or infinite values; JSON cannot represent them.")
+    if np.abs(rows).max() * 10 ** decimals >= 2 ** 62:
+        raise ValueError(f"Values are too large to format with {decimals} decimals.")
+
+    def constant(text):
+        return np.broadcast_to(np.frombuffer(text, dtype=np.uint8), (len(rows), len(text)))
+
+    parts = [constant(prefix)]
+    for column in range(rows.shape[1]):
+        if column:
+            parts.append(constant(b", "))
+        parts.append(_format_column(rows[:, column], decimals))
+    parts.append(constant(suffix))
+    return np.concatenate(parts, axis=1)
+
+
+def shard_paths(output_file: str, num_shards: int) -> list:
+    """`output_file` itself for one shard, otherwise <name>-00000-of-0000N<ext> next to it."""
+    if num_shards == 1:
+        return [output_file]
+    stem, ext = os.path.splitext(output_file)
+    return [f"{stem}-{index:05d}-of-{num_shards:05d}{ext}" for index in range(num_shards)]
+
+
+def _shards(rows: np.ndarray, output_file: str, rows_per_shard: int):
+    rows_per_shard = rows_per_shard or len(rows)
+    starts = range(0, len(rows), rows_per_shard)
+    return zip(shard_paths(output_file, len(starts)), (rows[start:start + rows_per_shard] for start in starts))
+
+
+def write_jsonl(rows: np.ndarray, output_file: str, rows_per_shard: int = 0, decimals: int = 4) -> list:
+    paths = []
+    for path, shard in _shards(rows, output_file, rows_per_shard):
+        with open(path, "wb") as f:
+            for start in range(0, len(shard), FORMAT_BLOCK_ROWS):
+                block = shard[start:start + FORMAT_BLOCK_ROWS]
+                f.write(format_rows(block, decimals, prefix=b'{"instances": [', suffix=b"]}\n").tobytes())
+        paths.append(path)
+    return paths
+
+
+def write_npy(rows: np.ndarray, output_file: str, rows_per_shard: int = 0) -> list:
+    paths = []
+    for path, shard in _shards(rows, output_file, rows_per_shard):
+        with open(path, "wb") as f:
+            np.save(f, np.ascontiguousarray(shard, dtype=np.float32))
+        paths.append(path)
+    return paths
+
 
+def write_payloads(rows: np.ndarray, output_file: str, max_request_bytes: int = DEFAULT_MAX_REQUEST_BYTES,
+                   decimals: int = 4) -> list:
+    """
+    Writes {"instances": [[...], ...]} request bodies of at most
+    `max_request_bytes` each. All rows of a formatted block have the same width,
+    so the rows per request follow from it without measuring each body.
+    """
+    overhead = len(_PAYLOAD_HEADER) + len(_PAYLOAD_FOOTER) - 2
+    # The shard names need the number of bodies, so bodies go to numbered files until it is known
+    written = []
+    for block_start in range(0, len(rows), FORMAT_BLOCK_ROWS):
+        # Rows are joined with ",\n", which the last row of each body does not need
+        lines = format_rows(rows[block_start:block_start + FORMAT_BLOCK_ROWS], decimals, suffix=b"],\n")
+        rows_per_request = (max_request_bytes - overhead) // lines.shape[1]
+        if rows_per_request < 1:
+            raise ValueError(f"A single row takes {lines.shape[1] + overhead} bytes, more than "
+                             f"max_request_bytes={max_request_bytes}.")
+        for start in range(0, len(lines), rows_per_request):
+            written.append(f"{output_file}.{len(written)}.tmp")
+            with open(written[-1], "wb") as f:
+                f.write(_PAYLOAD_HEADER)
+                f.write(lines[start:start + rows_per_request].tobytes()[:-2])
+                f.write(_PAYLOAD_FOOTER)
 
-# Load Boston Housing dataset
-def load_boston_data():
-    (X_train, y_train), (X_test, y_test) = tf.keras.datasets.boston_housing.load_data()
-    return X_test
+    paths = shard_paths(output_file, len(written))
+    for temporary, path in zip(written, paths):
+        os.replace(temporary, path)
+    return paths
 
 
-# Save observations to JSONL
-def save_to_jsonl(data, output_file):
-    with open(output_file, 'w') as f:
-        for row in data:
-            json.dump({"input": row.tolist()}, f)  # Convert array to list for JSON serialization
-            f.write('\n')
+def write_prediction_input(rows: np.ndarray, output_file: str, output_format: str = "jsonl",
+                           rows_per_shard: int = 0, max_request_bytes: int = DEFAULT_MAX_REQUEST_BYTES,
+                           decimals: int = 4) -> list:
+    """Writes `rows` in `output_format` and returns the paths written."""
+    os.makedirs(os.path.dirname(os.path.abspath(output_file)), exist_ok=True)
+    if output_format == "jsonl":
+        return write_jsonl(rows, output_file, rows_per_shard, decimals)
+    if output_format == "npy":
+        return write_npy(rows, output_file, rows_per_shard)
+    if output_format == "payload":
+        return write_payloads(rows, output_file, max_request_bytes, decimals)
+    raise ValueError(f"Unknown format '{output_format}'. Expected one of {FORMATS}.")
 
 
 def main():
-    data = load_boston_data()
+    parser = argparse.ArgumentParser(description="Generate Boston-shaped prediction inputs.")
+    parser.add_argument("--source", type=str, choices=SOURCES, default="real",
+                        help="real: the first --num_rows real rows; resample: bootstrap-resampled real rows; "
+                             "synthetic: uniform over the Boston feature ranges, no data needed")
+    parser.add_argument("--data_path", type=str, default="",
+                        help=".npz (X_test or X) or .npy with real rows; defaults to the Boston test split")
+    parser.add_argument("--num_rows", type=int, default=1)
+    parser.add_argument("--noise", type=float, default=0.0,
+                        help="resample: jitter as a fraction of each feature's standard deviation")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--format", type=str, choices=FORMATS, default="jsonl")
+    parser.add_argument("--output_file", type=str, default=os.path.join(ROOT, "prediction_input.jsonl"))
+    parser.add_argument("--rows_per_shard", type=int, default=0, help="jsonl and npy: 0 writes a single file")
+    parser.add_argument("--max_request_bytes", type=int, default=DEFAULT_MAX_REQUEST_BYTES,
+                        help="payload: largest request body to write")
+    parser.add_argument("--decimals", type=int, default=4)
+    args = parser.parse_args()
 
-    selected_data = data[:1]
+    start = time.perf_counter()
+    if args.source == "synthetic":
+        from scripts.load_test import synthetic_rows
 
-    # Save to JSONL in the root folder
-    script_folder = os.path.dirname(os.path.abspath(__file__))
-    root_folder = os.path.abspath(os.path.join(script_folder, ".."))
-    output_file = os.path.join(root_folder, "prediction_input.jsonl")
-    save_to_jsonl(selected_data, output_file)
+        rows = synthetic_rows(args.num_rows, args.seed)
+    elif args.source == "resample":
+        rows = resample_rows(load_rows(args.data_path), args.num_rows, args.noise, args.seed)
+    else:
+        rows = load_rows(args.data_path)[:args.num_rows]
+    paths = write_prediction_input(rows, args.output_file, args.format, args.rows_per_shard,
+                                   args.max_request_bytes, args.decimals)
 
-    print(f"Saved 1 observation for prediction to {output_file}")
+    print(f"Wrote {len(rows)} rows to {len(paths)} file(s) in {time.perf_counter() - start:.2f}s: "
+          f"{paths[0]}{' ...' if len(paths) > 1 else ''}")
 
 
 if __name__ == "__main__":
@@ -1,16 +1,45 @@
+# scripts/json_payload.py
+"""
+Converts a JSONL file of instances into Vertex AI online prediction payloads,
+{"instances": [...]}, split so no request body exceeds --max_request_bytes.
+
+    python -m scripts.json_payload --input_file prediction_input.jsonl --output_file payload.json
+"""
+import argparse
 import json
 
+import numpy as np
+
+from scripts.create_prediction_input import DEFAULT_MAX_REQUEST_BYTES, write_payloads
+
 
 # Convert JSONL to a single JSON payload
 def convert_jsonl_to_payload(jsonl_path):
+    instances = []
     with open(jsonl_path, "r") as f:
-        instances = [json.loads(line)["input"] for line in f]
+        for line in f:
+            if not line.strip():
+                continue
+            record = json.loads(line)
+            if isinstance(record, dict):
+                record = record["instances"] if "instances" in record else record["input"]
+            instances.extend(record if record and isinstance(record[0], list) else [record])
     return {"instances": instances}
 
 
-# Save the payload to a file for testing
-payload = convert_jsonl_to_payload("../prediction_input.jsonl")
-with open("../payload.json", "w") as f:
-    json.dump(payload, f, indent=4)
+def main():
+    parser = argparse.ArgumentParser(description="Convert a JSONL file of instances into online prediction payloads.")
+    parser.add_argument("--input_file", type=str, default="prediction_input.jsonl")
+    parser.add_argument("--output_file", type=str, default="payload.json",
+                        help="Payload file; numbered shards are written next to it when one request is not enough")
+    parser.add_argument("--max_request_bytes", type=int, default=DEFAULT_MAX_REQUEST_BYTES)
+    parser.add_argument("--decimals", type=int, default=4)
+    args = parser.parse_args()
+
+    rows = np.array(convert_jsonl_to_payload(args.input_file)["instances"], dtype=np.float64)
+    paths = write_payloads(rows, args.output_file, args.max_request_bytes, args.decimals)
+    print(f"Converted payload saved to {', '.join(paths)}")
+
 
-print("Converted payload saved to payload.json")
+if __name__ == "__main__":
+    main()
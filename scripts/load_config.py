@@ -1,16 +1,22 @@
 # scripts/load_config.py
+import functools
 import os
-import yaml
 
 CONFIG_PATH = os.path.join(os.path.dirname(__file__), "..", "config", "config.yaml")
+# Settings that can be imported by name; config.yaml is only read when one is first used
+_SETTINGS = {"PROJECT_ID": "project_id", "REGION": "region", "BUCKET": "bucket", "REPO": "repo"}
 
+
+@functools.lru_cache(maxsize=None)
 def load_config():
+    import yaml
+
     with open(CONFIG_PATH, "r") as f:
         config = yaml.safe_load(f)
     return config
 
-config = load_config()
-PROJECT_ID = config["project_id"]
-REGION = config["region"]
-BUCKET = config["bucket"]
-REPO = config["repo"]
+
+def __getattr__(name):
+    if name in _SETTINGS:
+        return load_config()[_SETTINGS[name]]
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
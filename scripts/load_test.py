@@ -0,0 +1,232 @@
+# scripts/load_test.py
+"""
+Load test for the serving container. Replays the rows of a JSONL file (or
+synthetic Boston-shaped rows) against /predict over a pooled asyncio HTTP
+client, and prints throughput, latency percentiles and the error rate as JSON.
+
+Two load models:
+  --concurrency N   closed loop: N clients, each sending its next request as soon
+                    as the previous one returns
+  --rps R           open loop: requests start on a fixed schedule of R per second,
+                    however long earlier requests take; latency is measured from the
+                    scheduled start, so a server that falls behind shows it
+
+    python -m scripts.load_test --url http://127.0.0.1:8080 --rps 200 --duration 30 --batch_size 8
+    python -m scripts.load_test --input_file prediction_input.jsonl --concurrency 32 --requests 5000
+"""
+import argparse
+import asyncio
+import itertools
+import json
+import time
+from collections import Counter
+
+import httpx
+import numpy as np
+
+NUM_FEATURES = 13
+# Per-feature [min, max] of the Boston Housing data, for synthetic rows
+BOSTON_RANGES = [(0.006, 89.0), (0.0, 100.0), (0.46, 27.7), (0.0, 1.0), (0.385, 0.871), (3.56, 8.78),
+                 (2.9, 100.0), (1.13, 12.1), (1.0, 24.0), (187.0, 711.0), (12.6, 22.0), (0.32, 396.9),
+                 (1.73, 37.97)]
+ENCODINGS = {
+    "json": "application/json",
+    "octet-stream": "application/octet-stream",
+}
+
+
+def read_rows(path: str) -> np.ndarray:
+    """Reads instances from a JSONL file of {"instances": [...]} records or bare lists."""
+    rows = []
+    with open(path, "r") as f:
+        for line in f:
+            if not line.strip():
+                continue
+            record = json.loads(line)
+            instances = record["instances"] if isinstance(record, dict) else record
+            rows.append(np.asarray(instances, dtype=np.float32).reshape(-1, NUM_FEATURES))
+    if not rows:
+        raise ValueError(f"No instances found in {path}.")
+    return np.concatenate(rows)
+
+
+def synthetic_rows(num_rows: int, seed: int = 0) -> np.ndarray:
+    rng = np.random.default_rng(seed)
+    low, high = np.array(BOSTON_RANGES).T
+    rows = rng.uniform(low, high, size=(num_rows, NUM_FEATURES))
+    rows[:, 3] = rows[:, 3] > 0.93  # CHAS is a 0/1 flag
+    rows[:, 8] = np.round(rows[:, 8])  # RAD is an index
+    return rows.astype(np.float32)
+
+
+def encode_bodies(rows: np.ndarray, batch_size: int, encoding: str, max_bodies: int = 1024) -> list:
+    """
+    Pre-encodes request bodies of `batch_size` rows each, cycling through `rows`,
+    so encoding does not count against the client during the test.
+    """
+    num_bodies = min(max_bodies, max(1, -(-len(rows) // batch_size)))
+    indices = np.arange(num_bodies * batch_size) % len(rows)
+    bodies = []
+    for batch in np.split(rows[indices], num_bodies):
+        if encoding == "octet-stream":
+            bodies.append(np.ascontiguousarray(batch, dtype="<f4").tobytes())
+        else:
+            bodies.append(json.dumps({"instances": batch.tolist()}).encode())
+    return bodies
+
+
+class LoadTestResults:
+    def __init__(self):
+        self.latencies = []
+        self.errors = Counter()
+
+    def record(self, start: float, outcome: str):
+        if outcome == "ok":
+            self.latencies.append(time.perf_counter() - start)
+        else:
+            self.errors[outcome] += 1
+
+    def report(self, elapsed: float, batch_size: int) -> dict:
+        ok = len(self.latencies)
+        total = ok + sum(self.errors.values())
+        latencies_ms = np.array(self.latencies or [np.nan]) * 1000
+        p50, p95, p99 = np.percentile(latencies_ms, [50, 95, 99])
+        return {
+            "requests": total,
+            "ok": ok,
+            "errors": total - ok,
+            "error_rate": round((total - ok) / total, 6) if total else 0.0,
+            "errors_by_type": dict(self.errors),
+            "duration_s": round(elapsed, 3),
+            "throughput_rps": round(ok / elapsed, 1) if elapsed > 0 else 0.0,
+            "rows_per_sec": round(ok * batch_size / elapsed, 1) if elapsed > 0 else 0.0,
+            "latency_ms": {
+                "p50": round(float(p50), 3),
+                "p95": round(float(p95), 3),
+                "p99": round(float(p99), 3),
+                "mean": round(float(np.mean(latencies_ms)), 3),
+                "max": round(float(np.max(latencies_ms)), 3),
+            },
+        }
+
+
+async def _send(client, url, body, headers, start, results):
+    try:
+        response = await client.post(url, content=body, headers=headers)
+        results.record(start, "ok" if response.status_code < 400 else f"http_{response.status_code}")
+    except httpx.HTTPError as e:
+        results.record(start, type(e).__name__)
+
+
+async def _closed_loop(client, url, bodies, headers, results, concurrency, num_requests, deadline):
+    counter = itertools.count()
+
+    async def worker():
+        while time.perf_counter() < deadline:
+            index = next(counter)
+            if num_requests and index >= num_requests:
+                return
+            await _send(client, url, bodies[index % len(bodies)], headers, time.perf_counter(), results)
+
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+
+
+async def _open_loop(client, url, bodies, headers, results, rps, num_requests, deadline, max_in_flight):
+    in_flight = asyncio.Semaphore(max_in_flight)
+    tasks = []
+    start = time.perf_counter()
+
+    async def send(body, scheduled):
+        async with in_flight:
+            await _send(client, url, body, headers, scheduled, results)
+
+    for index in itertools.count():
+        scheduled = start + index / rps
+        if (num_requests and index >= num_requests) or scheduled >= deadline:
+            break
+        delay = scheduled - time.perf_counter()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        tasks.append(asyncio.create_task(send(bodies[index % len(bodies)], scheduled)))
+    await asyncio.gather(*tasks)
+
+
+async def run_load_test(url: str, rows: np.ndarray, batch_size: int = 1, concurrency: int = 0, rps: float = 0.0,
+                        num_requests: int = 0, duration: float = 0.0, encoding: str = "json",
+                        warmup_requests: int = 10, max_in_flight: int = 1024, timeout: float = 30.0,
+                        transport=None) -> dict:
+    """
+    Sends requests of `batch_size` rows to `url` until `num_requests` have been
+    sent or `duration` seconds have passed, with either `concurrency` closed-loop
+    clients or an open-loop rate of `rps`, and returns the report.
+    """
+    if bool(concurrency) == bool(rps):
+        raise ValueError("Set exactly one of concurrency and rps.")
+    if not num_requests and not duration:
+        raise ValueError("Set num_requests or duration.")
+
+    bodies = encode_bodies(rows, batch_size, encoding)
+    headers = {"Content-Type": ENCODINGS[encoding]}
+    pool_size = concurrency or max_in_flight
+    limits = httpx.Limits(max_connections=pool_size, max_keepalive_connections=pool_size)
+    results = LoadTestResults()
+    async with httpx.AsyncClient(limits=limits, timeout=timeout, transport=transport) as client:
+        # Open connections and let the server warm up before anything is timed
+        await asyncio.gather(*(_send(client, url, bodies[i % len(bodies)], headers, 0.0, LoadTestResults())
+                               for i in range(warmup_requests)))
+        start = time.perf_counter()
+        deadline = start + duration if duration else float("inf")
+        if concurrency:
+            await _closed_loop(client, url, bodies, headers, results, concurrency, num_requests, deadline)
+        else:
+            await _open_loop(client, url, bodies, headers, results, rps, num_requests, deadline, max_in_flight)
+        elapsed = time.perf_counter() - start
+
+    report = {
+        "url": url,
+        "mode": "concurrency" if concurrency else "rps",
+        "concurrency": concurrency or None,
+        "target_rps": rps or None,
+        "batch_size": batch_size,
+        "encoding": encoding,
+    }
+    report.update(results.report(elapsed, batch_size))
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load test the serving container's predict route.")
+    parser.add_argument("--url", type=str, default="http://127.0.0.1:8080", help="Base URL of the server.")
+    parser.add_argument("--route", type=str, default="/predict")
+    parser.add_argument("--input_file", type=str, default="",
+                        help="JSONL file of instances to replay; synthetic Boston-shaped rows if not given.")
+    parser.add_argument("--synthetic_rows", type=int, default=10000)
+    parser.add_argument("--batch_size", type=int, default=1, help="Rows per request.")
+    load = parser.add_mutually_exclusive_group(required=True)
+    load.add_argument("--concurrency", type=int, default=0, help="Closed loop with this many concurrent clients.")
+    load.add_argument("--rps", type=float, default=0.0, help="Open loop at this many requests per second.")
+    parser.add_argument("--requests", type=int, default=0, help="Stop after this many requests.")
+    parser.add_argument("--duration", type=float, default=0.0, help="Stop after this many seconds.")
+    parser.add_argument("--encoding", type=str, choices=list(ENCODINGS), default="json")
+    parser.add_argument("--warmup_requests", type=int, default=10)
+    parser.add_argument("--max_in_flight", type=int, default=1024,
+                        help="Open loop: most requests outstanding at once; later ones wait for a free slot.")
+    parser.add_argument("--timeout", type=float, default=30.0, help="Per-request timeout in seconds.")
+    parser.add_argument("--output_file", type=str, default="", help="Also write the JSON report here.")
+    args = parser.parse_args()
+    if not args.requests and not args.duration:
+        args.duration = 30.0
+
+    rows = read_rows(args.input_file) if args.input_file else synthetic_rows(args.synthetic_rows)
+    report = asyncio.run(run_load_test(
+        args.url.rstrip("/") + args.route, rows, args.batch_size, args.concurrency, args.rps, args.requests,
+        args.duration, args.encoding, args.warmup_requests, args.max_in_flight, args.timeout,
+    ))
+    if args.output_file:
+        with open(args.output_file, "w") as f:
+            json.dump(report, f, indent=2)
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
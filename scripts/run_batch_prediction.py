@@ -1,22 +1,31 @@
-from google.cloud import aiplatform
-from load_config import PROJECT_ID, REGION, BUCKET
+from load_config import load_config
 
-aiplatform.init(project=PROJECT_ID, location=REGION)
+MODEL_ID = "1631486139619606528"  # Replace after upload step
 
 
-MODEL_ID = "1631486139619606528"  # Replace after upload step
-INPUT_URI = f"{BUCKET}input/prediction_input.jsonl"
-OUTPUT_PREFIX = f"{BUCKET}output/"
+def main():
+    from google.cloud import aiplatform
+
+    config = load_config()
+    project_id, region, bucket = config["project_id"], config["region"], config["bucket"]
+    aiplatform.init(project=project_id, location=region)
+
+    input_uri = f"{bucket}input/prediction_input.jsonl"
+    output_prefix = f"{bucket}output/"
+
+    model_resource_name = f"projects/{project_id}/locations/{region}/models/{MODEL_ID}"
+    model = aiplatform.Model(model_resource_name)
+
+    batch_job = model.batch_predict(
+        job_display_name='boston-housing-test-batch',
+        gcs_source=input_uri,
+        gcs_destination_prefix=output_prefix,
+        machine_type="n1-standard-4"
+    )
 
-model_resource_name = f"projects/{PROJECT_ID}/locations/{REGION}/models/{MODEL_ID}"
-model = aiplatform.Model(model_resource_name)
+    batch_job.wait()
+    print("Batch prediction completed. Check output in:", output_prefix)
 
-batch_job = model.batch_predict(
-    job_display_name='boston-housing-test-batch',
-    gcs_source=INPUT_URI,
-    gcs_destination_prefix=OUTPUT_PREFIX,
-    machine_type="n1-standard-4"
-)
 
-batch_job.wait()
-print("Batch prediction completed. Check output in:", OUTPUT_PREFIX)
+if __name__ == "__main__":
+    main()
@@ -1,11 +1,5 @@
 # run_boston_pipeline.py
 import os
-import sys
-from kfp import compiler
-from google.cloud import aiplatform
-
-# Import your pipeline function
-from pipelines.boston_pipeline import boston_pipeline
 
 
 def compile_and_submit_pipeline(
@@ -13,8 +7,15 @@ def compile_and_submit_pipeline(
     region: str,
     bucket_name: str,
     pipeline_name: str = "boston-housing-pipeline",
+    training_mode: str = "full",
+    new_data_path: str = "",
 ):
     """Compiles your KFP pipeline to JSON, then submits it to Vertex AI Pipelines."""
+    from google.cloud import aiplatform
+    from kfp import compiler
+
+    # Import your pipeline function
+    from pipelines.boston_pipeline import boston_pipeline
 
     # 1) Compile Pipeline to JSON
     pipeline_json = f"{pipeline_name}.json"
@@ -38,6 +39,8 @@ def compile_and_submit_pipeline(
         parameter_values={
             "project_id": project_id,
             "region": region,
+            "training_mode": training_mode,
+            "new_data_path": new_data_path,
             # Add more parameters if your pipeline_func has more
         },
     )
@@ -45,10 +48,18 @@ def compile_and_submit_pipeline(
     print("Pipeline submitted. Check Vertex AI Pipelines UI for status.")
 
 
-if __name__ == "__main__":
+def main():
     # Simple CLI interface
     project_id = os.getenv("PROJECT_ID", "affor-models")
     region = os.getenv("REGION", "europe-west1")
     bucket_name = os.getenv("BUCKET_NAME", "boston-example")
+    # TRAINING_MODE=incremental NEW_DATA_PATH="gs://boston-example/new/*.npz" retrains on the new shards only
+    training_mode = os.getenv("TRAINING_MODE", "full")
+    new_data_path = os.getenv("NEW_DATA_PATH", "")
 
-    compile_and_submit_pipeline(project_id, region, bucket_name)
+    compile_and_submit_pipeline(project_id, region, bucket_name, training_mode=training_mode,
+                                new_data_path=new_data_path)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,20 +1,28 @@
 # scripts/run_custom_training_job.py
-from google.cloud import aiplatform
-from load_config import PROJECT_ID, REGION, BUCKET, REPO
+from load_config import load_config
 
-aiplatform.init(project=PROJECT_ID, location=REGION, staging_bucket=f"gs://{BUCKET}")
 
-training_image_uri = f"{REGION}-docker.pkg.dev/{PROJECT_ID}/{REPO}/training-image:latest"
+def main():
+    from google.cloud import aiplatform
 
-job = aiplatform.CustomContainerTrainingJob(
-    display_name="boston-housing",
-    container_uri=training_image_uri,
-)
+    config = load_config()
+    project_id, region, bucket, repo = config["project_id"], config["region"], config["bucket"], config["repo"]
+    aiplatform.init(project=project_id, location=region, staging_bucket=f"gs://{bucket}")
 
-job.run(
-    args=["--model_dir", f"{BUCKET}artifacts/"],
-    replica_count=1,
-    machine_type="n1-standard-4",
-    base_output_dir=f"{BUCKET}artifacts/"
-)
+    training_image_uri = f"{region}-docker.pkg.dev/{project_id}/{repo}/training-image:latest"
 
+    job = aiplatform.CustomContainerTrainingJob(
+        display_name="boston-housing",
+        container_uri=training_image_uri,
+    )
+
+    job.run(
+        args=["--model_dir", f"{bucket}artifacts/", "--early_stopping_patience", "3", "--checkpoint_every", "1"],
+        replica_count=1,
+        machine_type="n1-standard-4",
+        base_output_dir=f"{bucket}artifacts/"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -1,5 +1,4 @@
-from google.cloud import aiplatform
-from load_config import PROJECT_ID, REGION
+from load_config import load_config
 
 MODEL_ID = "5460671722791370752"
 ENDPOINT_NAME = "boston-housing-endpoint"
@@ -11,6 +10,8 @@ def deploy_model_to_vertex_ai(project_id: str, region: str, model_id: str, endpo
     """
     Deploy a model from the Vertex AI Model Registry to an endpoint.
     """
+    from google.cloud import aiplatform
+
     # Initialize
     aiplatform.init(project=project_id, location=region)
 
@@ -39,5 +40,10 @@ def deploy_model_to_vertex_ai(project_id: str, region: str, model_id: str, endpo
     print(f"Model deployed to endpoint: {endpoint.resource_name}")
 
 
+def main():
+    config = load_config()
+    deploy_model_to_vertex_ai(config["project_id"], config["region"], MODEL_ID, ENDPOINT_NAME, DEPLOYED_MODEL_NAME)
+
+
 if __name__ == "__main__":
-    deploy_model_to_vertex_ai(PROJECT_ID, REGION, MODEL_ID, ENDPOINT_NAME, DEPLOYED_MODEL_NAME)
+    main()
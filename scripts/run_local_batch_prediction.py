@@ -0,0 +1,153 @@
+# scripts/run_local_batch_prediction.py
+"""
+Scores a JSONL file locally, streaming it in fixed-size chunks so memory stays
+flat regardless of file size. Each output line follows the Vertex AI batch
+prediction format: {"instance": [...], "prediction": ...}.
+
+    python -m scripts.run_local_batch_prediction --model_dir local_model_dir \
+        --input_file prediction_input.jsonl --output_file predictions.jsonl --workers 4
+"""
+import argparse
+import json
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from serving.backends import load_predictor
+
+_predictor = None
+
+
+def iter_chunks(path: str, chunk_size: int):
+    """Yields (first_line_number, lines) for consecutive chunks of non-empty lines."""
+    chunk = []
+    first_line = 1
+    with open(path, "r") as f:
+        for line_number, line in enumerate(f, start=1):
+            if not line.strip():
+                continue
+            if not chunk:
+                first_line = line_number
+            chunk.append(line)
+            if len(chunk) == chunk_size:
+                yield first_line, chunk
+                chunk = []
+    if chunk:
+        yield first_line, chunk
+
+
+def _extract_instances(record):
+    """Returns the list of instances held by one JSONL record."""
+    if isinstance(record, dict):
+        for key in ("instances", "instance", "input"):
+            if key in record:
+                record = record[key]
+                break
+        else:
+            raise ValueError("record has none of the keys 'instances', 'instance' or 'input'")
+    if record and isinstance(record[0], list):
+        return record
+    return [record]
+
+
+def parse_chunk(lines, num_features: int, first_line: int = 1):
+    """Parses JSONL lines into the raw instances and a contiguous (n, num_features) float32 array."""
+    rows = []
+    for offset, line in enumerate(lines):
+        try:
+            rows.extend(_extract_instances(json.loads(line)))
+        except (ValueError, TypeError, IndexError) as e:
+            raise ValueError(f"Line {first_line + offset}: {e}") from e
+
+    try:
+        instances = np.array(rows, dtype=np.float32)
+    except ValueError as e:
+        raise ValueError(f"Lines {first_line}-{first_line + len(lines) - 1}: instances must be numeric lists of equal length") from e
+    if instances.ndim != 2 or instances.shape[1] != num_features:
+        raise ValueError(
+            f"Lines {first_line}-{first_line + len(lines) - 1}: expected {num_features} features per instance, got shape {instances.shape}"
+        )
+    return rows, instances
+
+
+def score_chunk(predictor, lines, first_line: int = 1):
+    """Runs one chunk through the model and returns (number of rows, output JSONL text)."""
+    rows, instances = parse_chunk(lines, predictor.num_features, first_line)
+    predictions = predictor.predict(instances).tolist()
+    output = "".join(
+        f'{{"instance": {json.dumps(row)}, "prediction": {prediction!r}}}\n'
+        for row, prediction in zip(rows, predictions)
+    )
+    return len(rows), output
+
+
+def _init_worker(model_dir: str, backend: str):
+    global _predictor
+    _predictor = load_predictor(model_dir, backend)
+
+
+def _score_in_worker(first_line: int, lines):
+    return score_chunk(_predictor, lines, first_line)
+
+
+def run_batch_prediction(model_dir: str, input_file: str, output_file: str, chunk_size: int = 10000,
+                         workers: int = 1, backend: str = "auto") -> dict:
+    """
+    Streams `input_file` through the model and writes predictions to `output_file`
+    in input order. With workers > 1, chunks are scored in a process pool while at
+    most two chunks per worker are held in memory.
+    """
+    start = time.perf_counter()
+    total_rows = 0
+
+    with open(output_file, "w") as out:
+        if workers <= 1:
+            predictor = load_predictor(model_dir, backend)
+            for first_line, lines in iter_chunks(input_file, chunk_size):
+                num_rows, output = score_chunk(predictor, lines, first_line)
+                out.write(output)
+                total_rows += num_rows
+        else:
+            with ProcessPoolExecutor(workers, initializer=_init_worker, initargs=(model_dir, backend)) as pool:
+                pending = deque()
+                for first_line, lines in iter_chunks(input_file, chunk_size):
+                    pending.append(pool.submit(_score_in_worker, first_line, lines))
+                    # Bound the number of chunks in flight so memory does not grow with the file
+                    if len(pending) >= 2 * workers:
+                        num_rows, output = pending.popleft().result()
+                        out.write(output)
+                        total_rows += num_rows
+                while pending:
+                    num_rows, output = pending.popleft().result()
+                    out.write(output)
+                    total_rows += num_rows
+
+    elapsed = time.perf_counter() - start
+    return {
+        "rows": total_rows,
+        "seconds": round(elapsed, 3),
+        "rows_per_sec": round(total_rows / elapsed, 1) if elapsed > 0 else 0.0,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run batch predictions locally over a JSONL file.")
+    parser.add_argument("--model_dir", type=str, required=True, help="Directory with model.keras / model_weights.npz.")
+    parser.add_argument("--input_file", type=str, required=True, help="JSONL file with one or more instances per line.")
+    parser.add_argument("--output_file", type=str, required=True, help="JSONL file to write predictions to.")
+    parser.add_argument("--chunk_size", type=int, default=10000, help="Number of lines scored per chunk.")
+    parser.add_argument("--workers", type=int, default=1, help="Number of scoring processes.")
+    parser.add_argument("--backend", type=str, choices=["auto", "keras", "numpy"], default="auto",
+                        help="Model backend to score with.")
+    args = parser.parse_args()
+
+    stats = run_batch_prediction(args.model_dir, args.input_file, args.output_file,
+                                 args.chunk_size, args.workers, args.backend)
+    print(f"Scored {stats['rows']} rows in {stats['seconds']}s ({stats['rows_per_sec']} rows/sec).")
+    print(f"Predictions written to {args.output_file}")
+
+
+if __name__ == "__main__":
+    main()
@@ -2,9 +2,20 @@ import argparse
 import json
 import numpy as np
 import os
-import subprocess
-import tensorflow as tf
-from google.cloud import aiplatform
+import sys
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+from serving.backends import (KERAS_MODEL_FILE, NUMPY_WEIGHTS_FILE, SAVED_MODEL_DIR, TFLITE_MODEL_FILE,  # noqa: E402
+                              WARMUP_FILE, load_predictor, warmup_batches)
+from training.storage import download, download_dir  # noqa: E402
+
+ARTIFACTS = {
+    "keras": KERAS_MODEL_FILE,
+    "numpy": NUMPY_WEIGHTS_FILE,
+    "savedmodel": SAVED_MODEL_DIR,
+    "tflite": TFLITE_MODEL_FILE,
+}
 
 
 def main():
@@ -14,8 +25,15 @@ def main():
     parser.add_argument("--model_id", type=str, required=True, help="Vertex AI Model resource ID.")
     parser.add_argument("--input_file", type=str, required=True, help="Path to the JSON file containing 'instances'.")
     parser.add_argument("--download_dir", type=str, default=".", help="Local directory to download model artifacts.")
+    parser.add_argument("--backend", type=str, choices=list(ARTIFACTS), default="keras",
+                        help="Run model.keras with TensorFlow, the exported weights with NumPy only, "
+                             "or the traced SavedModel or TFLite export.")
+    parser.add_argument("--repeats", type=int, default=0,
+                        help="Time this many predictions after warmup and report p50/p99 latency.")
     args = parser.parse_args()
 
+    from google.cloud import aiplatform
+
     # Initialize Vertex AI
     aiplatform.init(project=args.project, location=args.location)
 
@@ -28,18 +46,28 @@ def main():
     if not artifact_uri:
         raise ValueError("No artifact_uri found for this model. Ensure the model was uploaded correctly.")
 
-    # We assume model.keras is stored at artifact_uri.
-    model_keras_path_gcs = os.path.join(artifact_uri, "model.keras")
+    # We assume the artifacts written by training/export.py are stored at artifact_uri.
+    artifact_file = ARTIFACTS[args.backend]
+    artifact_path_gcs = os.path.join(artifact_uri, artifact_file)
 
     # Create download directory if not exists
     os.makedirs(args.download_dir, exist_ok=True)
-    local_model_path = os.path.join(args.download_dir, "model.keras")
+    local_artifact_path = os.path.join(args.download_dir, artifact_file)
 
-    print(f"Downloading model from {model_keras_path_gcs} to {local_model_path}...")
-    subprocess.check_call(["gsutil", "cp", model_keras_path_gcs, local_model_path])
+    print(f"Downloading model from {artifact_path_gcs} to {local_artifact_path}...")
+    # The SavedModel is a directory; files are fetched in parallel byte ranges
+    if args.backend == "savedmodel":
+        download_dir(artifact_path_gcs, local_artifact_path)
+    else:
+        download(artifact_path_gcs, local_artifact_path)
+    # Older models have no warmup requests; warmup_batches() falls back to zero batches
+    try:
+        download(os.path.join(artifact_uri, WARMUP_FILE), os.path.join(args.download_dir, WARMUP_FILE))
+    except FileNotFoundError:
+        pass
 
-    print(f"Loading model from {local_model_path}...")
-    model = tf.keras.models.load_model(local_model_path)
+    print(f"Loading model from {local_artifact_path} with the {args.backend} backend...")
+    model = load_predictor(args.download_dir, args.backend)
 
     # Load the input data
     with open(args.input_file, "r") as f:
@@ -48,12 +76,25 @@ def main():
     if "instances" not in data:
         raise ValueError("JSON input file must contain an 'instances' key.")
 
-    instances = np.array(data["instances"])
+    instances = np.array(data["instances"], dtype=np.float32)
+
+    for batch in warmup_batches(args.download_dir, model.num_features):
+        model.predict(batch)
 
     print("Running predictions...")
     predictions = model.predict(instances).tolist()
     print("Predictions:", predictions)
 
+    if args.repeats > 0:
+        latencies = []
+        for _ in range(args.repeats):
+            start = time.perf_counter()
+            model.predict(instances)
+            latencies.append(time.perf_counter() - start)
+        p50, p99 = np.percentile(latencies, [50, 99]) * 1000
+        print(f"{args.backend} latency over {args.repeats} runs of {len(instances)} rows: "
+              f"p50 {p50:.3f} ms, p99 {p99:.3f} ms")
+
 
 if __name__ == "__main__":
     main()
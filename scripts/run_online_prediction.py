@@ -1,6 +1,10 @@
-from google.cloud import aiplatform, storage
 import json
-from load_config import PROJECT_ID, REGION, BUCKET, REPO
+import os
+import sys
+from load_config import load_config
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+from training.storage import iter_lines  # noqa: E402
 
 ENDPOINT_ID = "4883718389278703616"
 GCS_INPUT_FILE = "input/prediction_input.jsonl"  # Path to file in GCS
@@ -8,31 +12,29 @@ GCS_INPUT_FILE = "input/prediction_input.jsonl"  # Path to file in GCS
 
 def load_jsonl_from_gcs(bucket_name: str, file_path: str) -> list:
     """
-    Load and parse a JSONL file from Google Cloud Storage.
+    Load and parse a JSONL file from Google Cloud Storage, streaming it in
+    byte ranges rather than downloading it whole.
 
     Args:
-        bucket_name (str): Name of the GCS bucket.
+        bucket_name (str): Name of the GCS bucket, with or without gs://.
         file_path (str): Path to the JSONL file in the bucket.
 
     Returns:
         list: A list of instances parsed from the JSONL file.
     """
-    storage_client = storage.Client(project=PROJECT_ID)
-    bucket = storage_client.bucket(REPO)
-    blob = bucket.blob(file_path)
-
-    # Read the file content
-    file_content = blob.download_as_text()
-    print(f"Loaded file '{file_path}' from bucket '{bucket_name}'.")
+    uri = f"gs://{bucket_name.removeprefix('gs://').rstrip('/')}/{file_path}"
 
     # Parse JSONL file line by line
     instances = []
-    for line in file_content.strip().split("\n"):
+    for line in iter_lines(uri):
+        if not line.strip():
+            continue
         instance = json.loads(line)
         if "instances" in instance:
             instances.extend(instance["instances"])  # Add instances to the list
         else:
             print(f"Warning: Line missing 'instances' key: {line}")
+    print(f"Loaded file '{file_path}' from bucket '{bucket_name}'.")
 
     return instances
 
@@ -47,6 +49,8 @@ def online_prediction(project: str, region: str, endpoint_id: str, instances: li
         endpoint_id (str): Vertex AI endpoint ID.
         instances (list): Input data instances for prediction.
     """
+    from google.cloud import aiplatform
+
     aiplatform.init(project=project, location=region)
 
     endpoint = aiplatform.Endpoint(endpoint_name=f"projects/{project}/locations/{region}/endpoints/{endpoint_id}")
@@ -59,14 +63,19 @@ def online_prediction(project: str, region: str, endpoint_id: str, instances: li
         print(f"Error during prediction: {str(e)}")
 
 
-if __name__ == "__main__":
+def main():
+    config = load_config()
     # Load instances from GCS file
     print("Loading input data from GCS...")
-    instances = load_jsonl_from_gcs(bucket_name=BUCKET, file_path=GCS_INPUT_FILE)
+    instances = load_jsonl_from_gcs(bucket_name=config["bucket"], file_path=GCS_INPUT_FILE)
 
     if not instances:
         print("Error: No instances found in the input file.")
     else:
         # Perform online prediction
         print("Sending online prediction request...")
-        online_prediction(PROJECT_ID, REGION, ENDPOINT_ID, instances)
+        online_prediction(config["project_id"], config["region"], ENDPOINT_ID, instances)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,16 +1,24 @@
-from google.cloud import aiplatform
-from load_config import PROJECT_ID, REGION
+from load_config import load_config
+
+ENDPOINT_ID = "2213083810247999488"
 
 
 def undeploy_models(endpoint_id: str):
-    aiplatform.init(project=PROJECT_ID, location=REGION)
-    endpoint = aiplatform.Endpoint(endpoint_name=f"projects/{PROJECT_ID}/locations/{REGION}/endpoints/{endpoint_id}")
+    from google.cloud import aiplatform
+
+    config = load_config()
+    project_id, region = config["project_id"], config["region"]
+    aiplatform.init(project=project_id, location=region)
+    endpoint = aiplatform.Endpoint(endpoint_name=f"projects/{project_id}/locations/{region}/endpoints/{endpoint_id}")
 
     for deployed_model in endpoint.gca_resource.deployed_models:
         endpoint.undeploy(deployed_model_id=deployed_model.id)
         print(f"Undeployed model ID: {deployed_model.id}")
 
 
-if __name__ == "__main__":
-    ENDPOINT_ID = "2213083810247999488"
+def main():
     undeploy_models(ENDPOINT_ID)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,20 +1,29 @@
-from google.cloud import aiplatform
-from load_config import PROJECT_ID, REGION, BUCKET, REPO
+from load_config import load_config
 
-aiplatform.init(project=PROJECT_ID, location=REGION)
 
-# Serving container image URI for custom predictions
-serving_image_uri = f"{REGION}-docker.pkg.dev/{PROJECT_ID}/{REPO}/serving-image:latest"
+def main():
+    from google.cloud import aiplatform
 
-# Directory where the trained model is stored
-artifact_uri = f"{BUCKET}artifacts/"
+    config = load_config()
+    project_id, region, bucket, repo = config["project_id"], config["region"], config["bucket"], config["repo"]
+    aiplatform.init(project=project_id, location=region)
 
-model = aiplatform.Model.upload(
-    display_name="boston-housing-model",
-    artifact_uri=artifact_uri,
-    serving_container_image_uri=serving_image_uri,
-    serving_container_predict_route="/predict",
-    serving_container_health_route="/health"
-)
+    # Serving container image URI for custom predictions
+    serving_image_uri = f"{region}-docker.pkg.dev/{project_id}/{repo}/serving-image:latest"
 
-print("Model uploaded:", model.resource_name)
+    # Directory where the trained model is stored
+    artifact_uri = f"{bucket}artifacts/"
+
+    model = aiplatform.Model.upload(
+        display_name="boston-housing-model",
+        artifact_uri=artifact_uri,
+        serving_container_image_uri=serving_image_uri,
+        serving_container_predict_route="/predict",
+        serving_container_health_route="/health"
+    )
+
+    print("Model uploaded:", model.resource_name)
+
+
+if __name__ == "__main__":
+    main()
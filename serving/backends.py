@@ -0,0 +1,326 @@
+import hashlib
+import os
+import struct
+import threading
+import zipfile
+
+import numpy as np
+
+KERAS_MODEL_FILE = "model.keras"
+NUMPY_WEIGHTS_FILE = "model_weights.npz"
+SAVED_MODEL_DIR = "saved_model"
+TFLITE_MODEL_FILE = "model.tflite"
+WARMUP_FILE = "warmup_requests.npz"
+BACKENDS = ["auto", "numpy", "keras", "savedmodel", "tflite"]
+
+# Maximum allowed difference between the NumPy forward pass and the Keras outputs
+# recorded at export time
+NUMPY_RTOL = 1e-4
+NUMPY_ATOL = 1e-4
+
+_ACTIVATIONS = {
+    "linear": None,
+    "relu": lambda h: np.maximum(h, 0, out=h),
+}
+
+
+class NumpyFeedForward:
+    """
+    Pure-NumPy forward pass for a stack of Dense layers, as built by
+    training.model.feed_forward_net. Loads the weights written by
+    training/export.py, so serving does not need the TensorFlow runtime.
+    """
+
+    def __init__(self, kernels, biases, activations):
+        for activation in activations:
+            if activation not in _ACTIVATIONS:
+                raise ValueError(f"Unsupported activation for the NumPy backend: {activation}")
+        self.kernels = [np.ascontiguousarray(k, dtype=np.float32) for k in kernels]
+        self.biases = [np.ascontiguousarray(b, dtype=np.float32) for b in biases]
+        self.activations = [_ACTIVATIONS[a] for a in activations]
+        self.num_features = self.kernels[0].shape[0]
+        # Mean of the training features, if the export recorded it; the default attribution baseline
+        self.feature_mean = None
+
+    @classmethod
+    def from_npz(cls, path: str, verify: bool = True, mmap: bool = False):
+        """
+        Loads exported weights and checks them against the Keras outputs stored alongside.
+
+        With mmap=True the kernels and biases are read-only memory maps of the file
+        instead of copies, so every process serving the same file shares one copy
+        of the weights in the page cache. The file must then only ever be replaced
+        by a rename, never rewritten in place.
+        """
+        if mmap:
+            data = _mmap_npz(path, mapped_prefixes=("kernel_", "bias_"))
+        else:
+            with np.load(path) as npz:
+                data = {name: npz[name] for name in npz.files}
+        num_layers = int(data["num_layers"])
+        kernels = [data[f"kernel_{i}"] for i in range(num_layers)]
+        biases = [data[f"bias_{i}"] for i in range(num_layers)]
+        activations = [str(a) for a in data["activations"]]
+        probe_inputs = data["probe_inputs"]
+        probe_outputs = data["probe_outputs"]
+
+        model = cls(kernels, biases, activations)
+        if "feature_mean" in data:
+            model.feature_mean = np.asarray(data["feature_mean"], dtype=np.float32)
+        if verify:
+            predictions = model.predict(probe_inputs)
+            if not np.allclose(predictions, probe_outputs, rtol=NUMPY_RTOL, atol=NUMPY_ATOL):
+                max_diff = float(np.max(np.abs(predictions - probe_outputs)))
+                raise ValueError(
+                    f"NumPy forward pass differs from Keras outputs by up to {max_diff} in {path}."
+                )
+        return model
+
+    def predict(self, instances: np.ndarray) -> np.ndarray:
+        """Maps (n, features) inputs to (n,) predictions."""
+        h = np.asarray(instances, dtype=np.float32)
+        for kernel, bias, activation in zip(self.kernels, self.biases, self.activations):
+            h = h @ kernel
+            h += bias
+            if activation is not None:
+                activation(h)
+        return h.reshape(-1)
+
+    def gradients(self, instances: np.ndarray):
+        """
+        Returns the (n,) predictions and the (n, features) gradients of each
+        prediction with respect to its inputs: the forward pass keeps which ReLU
+        units were active, and the backward pass multiplies the output gradient
+        back through the transposed kernels, all rows at once.
+        """
+        h = np.asarray(instances, dtype=np.float32)
+        active = []
+        for kernel, bias, activation in zip(self.kernels, self.biases, self.activations):
+            h = h @ kernel
+            h += bias
+            if activation is not None:
+                mask = h > 0
+                h *= mask
+                active.append(mask)
+            else:
+                active.append(None)
+        grad = np.ones_like(h)
+        for kernel, mask in zip(reversed(self.kernels), reversed(active)):
+            if mask is not None:
+                grad *= mask
+            grad = grad @ kernel.T
+        return h.reshape(-1), grad
+
+
+def _mmap_npz(path: str, mapped_prefixes: tuple) -> dict:
+    """
+    Reads the arrays of an .npz, memory-mapping those whose names start with one
+    of `mapped_prefixes` straight out of the archive instead of copying them.
+    """
+    arrays = {}
+    with zipfile.ZipFile(path) as archive, open(path, "rb") as f:
+        for info in archive.infolist():
+            name = info.filename[:-len(".npy")]
+            # The member data starts after its local file header, whose name and extra fields vary in length
+            f.seek(info.header_offset + 26)
+            name_length, extra_length = struct.unpack("<HH", f.read(4))
+            f.seek(info.header_offset + 30 + name_length + extra_length)
+            if not name.startswith(mapped_prefixes):
+                arrays[name] = np.lib.format.read_array(archive.open(info))
+                continue
+            if info.compress_type != zipfile.ZIP_STORED:
+                raise ValueError(f"Cannot memory-map '{name}' in {path}: the archive is compressed.")
+            version = np.lib.format.read_magic(f)
+            read_header = (np.lib.format.read_array_header_1_0 if version == (1, 0)
+                           else np.lib.format.read_array_header_2_0)
+            shape, fortran_order, dtype = read_header(f)
+            arrays[name] = np.memmap(path, dtype=dtype, mode="r", offset=f.tell(), shape=shape,
+                                     order="F" if fortran_order else "C")
+    return arrays
+
+
+class KerasPredictor:
+    """
+    Runs a saved Keras model; imports TensorFlow only when constructed.
+
+    The forward pass, including any preprocessing layers saved in the model, is
+    traced once into a single graph with a variable batch dimension, so every
+    batch runs as one fused call instead of layer by layer in eager mode.
+    """
+
+    def __init__(self, path: str):
+        import tensorflow as tf
+
+        self.model = tf.keras.models.load_model(path)
+        self.num_features = self.model.input_shape[-1]
+        normalizer = self.model.layers[0] if self.model.layers else None
+        self.feature_mean = (np.asarray(normalizer.mean, dtype=np.float32).reshape(-1)
+                             if isinstance(normalizer, tf.keras.layers.Normalization) else None)
+        signature = [tf.TensorSpec([None, self.num_features], tf.float32)]
+        self._forward = tf.function(lambda instances: self.model(instances, training=False), input_signature=signature)
+        self._gradients = tf.function(_gradient_fn(lambda instances: self.model(instances, training=False)),
+                                      input_signature=signature)
+
+    def predict(self, instances: np.ndarray) -> np.ndarray:
+        return self._forward(np.asarray(instances, dtype=np.float32)).numpy().reshape(-1)
+
+    def gradients(self, instances: np.ndarray):
+        """(n,) predictions and (n, features) input gradients, from one traced forward and backward pass."""
+        predictions, gradients = self._gradients(np.asarray(instances, dtype=np.float32))
+        return predictions.numpy(), gradients.numpy()
+
+
+def _gradient_fn(forward):
+    """Wraps `forward` into a function returning its (n,) outputs and their gradients with respect to the inputs."""
+    import tensorflow as tf
+
+    def gradients(instances):
+        with tf.GradientTape() as tape:
+            tape.watch(instances)
+            predictions = tf.reshape(tf.cast(forward(instances), tf.float32), [-1])
+        # Rows are independent, so the gradient of the sum is every row's own gradient
+        return predictions, tape.gradient(predictions, instances)
+
+    return gradients
+
+
+def _fixed_batch_sizes(signature_names):
+    return sorted(int(name[len("batch_"):]) for name in signature_names if name.startswith("batch_"))
+
+
+def _split_batches(num_rows, batch_sizes):
+    """
+    Yields (start, stop, batch_size) chunks covering `num_rows` rows with the fixed
+    `batch_sizes`: full chunks of the largest size, then the remainder padded up to
+    the smallest size that holds it.
+    """
+    largest = batch_sizes[-1]
+    start = 0
+    while start < num_rows:
+        remaining = num_rows - start
+        batch_size = largest if remaining >= largest else next(n for n in batch_sizes if n >= remaining)
+        stop = min(start + batch_size, num_rows)
+        yield start, stop, batch_size
+        start = stop
+
+
+class SavedModelPredictor:
+    """
+    Runs the traced SavedModel written by training/export.py. Batches whose size
+    has its own fixed-shape signature use it; all others use serving_default.
+    """
+
+    def __init__(self, path: str):
+        import tensorflow as tf
+
+        self.model = tf.saved_model.load(path)
+        self._default = self.model.signatures["serving_default"]
+        self._fixed = {n: self.model.signatures[f"batch_{n}"] for n in _fixed_batch_sizes(self.model.signatures)}
+        self.num_features = self._default.structured_input_signature[1]["instances"].shape[-1]
+        self.feature_mean = None
+        self._gradients = tf.function(_gradient_fn(lambda instances: self._default(instances=instances)["predictions"]),
+                                      input_signature=[tf.TensorSpec([None, self.num_features], tf.float32)])
+
+    def predict(self, instances: np.ndarray) -> np.ndarray:
+        instances = np.asarray(instances, dtype=np.float32)
+        signature = self._fixed.get(len(instances), self._default)
+        return signature(instances=instances)["predictions"].numpy().reshape(-1)
+
+    def gradients(self, instances: np.ndarray):
+        """(n,) predictions and (n, features) input gradients, differentiated through the serving_default graph."""
+        predictions, gradients = self._gradients(np.asarray(instances, dtype=np.float32))
+        return predictions.numpy(), gradients.numpy()
+
+
+def _tflite_interpreter(path: str, num_threads):
+    # The standalone runtime keeps the TensorFlow import out of the serving process
+    try:
+        from tflite_runtime.interpreter import Interpreter
+    except ImportError:
+        import tensorflow as tf
+
+        Interpreter = tf.lite.Interpreter
+    return Interpreter(model_path=path, num_threads=num_threads)
+
+
+class TFLitePredictor:
+    """
+    Runs the TFLite flatbuffer written by training/export.py, which has one
+    signature per fixed batch size. Other batch sizes are split into chunks of
+    the largest size, with the last chunk zero-padded up to the nearest size.
+    """
+
+    def __init__(self, path: str, num_threads=None):
+        self.interpreter = _tflite_interpreter(path, num_threads)
+        signatures = self.interpreter.get_signature_list()
+        self.batch_sizes = _fixed_batch_sizes(signatures)
+        self._runners = {n: self.interpreter.get_signature_runner(f"batch_{n}") for n in self.batch_sizes}
+        input_details = self._runners[self.batch_sizes[0]].get_input_details()
+        self.num_features = int(input_details["instances"]["shape"][-1])
+        self.feature_mean = None
+        # A TFLite interpreter must not run two invocations at once
+        self._lock = threading.Lock()
+
+    def predict(self, instances: np.ndarray) -> np.ndarray:
+        instances = np.asarray(instances, dtype=np.float32)
+        predictions = np.empty(len(instances), dtype=np.float32)
+        with self._lock:
+            for start, stop, batch_size in _split_batches(len(instances), self.batch_sizes):
+                chunk = instances[start:stop]
+                if len(chunk) < batch_size:
+                    chunk = np.concatenate([chunk, np.zeros((batch_size - len(chunk), self.num_features), np.float32)])
+                output = self._runners[batch_size](instances=chunk)["predictions"]
+                predictions[start:stop] = output.reshape(-1)[:stop - start]
+        return predictions
+
+
+def load_predictor(model_dir: str, backend: str = "auto", mmap: bool = False):
+    """
+    Loads the model in `model_dir` with the requested backend.
+
+    backend="auto" uses the NumPy weights if they have been exported, and
+    falls back to the Keras model otherwise. "savedmodel" and "tflite" load
+    the graph artifacts written by training/export.py. `mmap` memory-maps the
+    NumPy weights (see NumpyFeedForward.from_npz); the TFLite flatbuffer is
+    always memory-mapped.
+    """
+    numpy_path = os.path.join(model_dir, NUMPY_WEIGHTS_FILE)
+    if backend == "auto":
+        backend = "numpy" if os.path.exists(numpy_path) else "keras"
+
+    if backend == "numpy":
+        return NumpyFeedForward.from_npz(numpy_path, mmap=mmap)
+    if backend == "keras":
+        return KerasPredictor(os.path.join(model_dir, KERAS_MODEL_FILE))
+    if backend == "savedmodel":
+        return SavedModelPredictor(os.path.join(model_dir, SAVED_MODEL_DIR))
+    if backend == "tflite":
+        return TFLitePredictor(os.path.join(model_dir, TFLITE_MODEL_FILE))
+    raise ValueError(f"Unknown model backend: {backend}")
+
+
+def model_fingerprint(model_dir: str) -> str:
+    """
+    Returns a short version string for the model artifacts in `model_dir`, based
+    on their names, sizes and modification times, so it is cheap to poll.
+    """
+    digest = hashlib.sha256()
+    for name in (KERAS_MODEL_FILE, NUMPY_WEIGHTS_FILE, os.path.join(SAVED_MODEL_DIR, "saved_model.pb"),
+                 TFLITE_MODEL_FILE):
+        path = os.path.join(model_dir, name)
+        if os.path.exists(path):
+            stat = os.stat(path)
+            digest.update(f"{name}:{stat.st_size}:{stat.st_mtime_ns};".encode())
+    return digest.hexdigest()[:16]
+
+
+def warmup_batches(model_dir: str, num_features: int, batch_sizes=(1,)) -> list:
+    """
+    Returns the warmup requests exported next to the model, or zero batches of
+    `batch_sizes` rows if the model has none.
+    """
+    path = os.path.join(model_dir, WARMUP_FILE)
+    if not os.path.exists(path):
+        return [np.zeros((n, num_features), dtype=np.float32) for n in sorted(set(batch_sizes))]
+    with np.load(path) as data:
+        return [data[name] for name in data.files]
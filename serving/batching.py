@@ -0,0 +1,100 @@
+import asyncio
+import time
+
+import numpy as np
+
+
+class MicroBatcher:
+    """
+    Coalesces concurrent prediction requests into a single batched forward pass.
+
+    Requests are queued and a background task drains the queue, waiting at most
+    `max_wait_ms` after the first request for more rows to arrive, or until
+    `max_batch_size` rows have been collected. The batch is run through
+    `predict_fn` on a worker thread so the event loop keeps accepting requests.
+
+    If given, `on_batch(num_rows, queue_waits, inference_seconds)` is called
+    after every forward pass with the time each request spent queued.
+    """
+
+    def __init__(self, predict_fn, max_batch_size: int = 64, max_wait_ms: float = 5.0, on_batch=None):
+        if max_batch_size < 1:
+            raise ValueError("max_batch_size must be at least 1.")
+        self.predict_fn = predict_fn
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000.0
+        self.on_batch = on_batch
+        self._queue = None
+        self._worker = None
+
+    def start(self):
+        """Starts the background batching task on the running event loop."""
+        if self._worker is None:
+            self._queue = asyncio.Queue()
+            self._worker = asyncio.create_task(self._run())
+
+    async def stop(self):
+        """Cancels the batching task; pending requests are failed."""
+        if self._worker is None:
+            return
+        self._worker.cancel()
+        try:
+            await self._worker
+        except asyncio.CancelledError:
+            pass
+        while not self._queue.empty():
+            _, future, _ = self._queue.get_nowait()
+            if not future.done():
+                future.set_exception(RuntimeError("Batcher stopped."))
+        self._worker = None
+
+    async def submit(self, instances: np.ndarray) -> np.ndarray:
+        """Queues `instances` (n, features) and waits for their predictions."""
+        if self._worker is None:
+            raise RuntimeError("Batcher is not running. Call start() first.")
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((instances, future, time.perf_counter()))
+        return await future
+
+    async def _collect(self):
+        """Blocks for the first request, then gathers more until full or timed out."""
+        batch = [await self._queue.get()]
+        rows = len(batch[0][0])
+        deadline = time.perf_counter() + self.max_wait
+        while rows < self.max_batch_size:
+            timeout = deadline - time.perf_counter()
+            if timeout <= 0:
+                break
+            try:
+                item = await asyncio.wait_for(self._queue.get(), timeout)
+            except asyncio.TimeoutError:
+                break
+            batch.append(item)
+            rows += len(item[0])
+        return batch
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = await self._collect()
+            arrays = [instances for instances, _, _ in batch]
+            started = time.perf_counter()
+            try:
+                inputs = arrays[0] if len(arrays) == 1 else np.concatenate(arrays)
+                outputs = await loop.run_in_executor(None, self.predict_fn, inputs)
+            except Exception as e:
+                for _, future, _ in batch:
+                    if not future.done():
+                        future.set_exception(e)
+                continue
+            if self.on_batch is not None:
+                queue_waits = [started - enqueued_at for _, _, enqueued_at in batch]
+                self.on_batch(len(inputs), queue_waits, time.perf_counter() - started)
+
+            # Hand each caller back the slice of the batch that belongs to it
+            start = 0
+            for instances, future, _ in batch:
+                end = start + len(instances)
+                if not future.done():
+                    future.set_result(outputs[start:end])
+                start = end
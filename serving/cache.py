@@ -0,0 +1,94 @@
+import hashlib
+import time
+from collections import OrderedDict
+
+import numpy as np
+
+
+class PredictionCache:
+    """
+    In-process LRU cache of per-instance predictions.
+
+    Keys are the model version plus a hash of the feature vector quantized to
+    `decimals` decimal places, so one cache holds the predictions of several
+    model versions side by side and never serves one version's predictions for
+    another. Entries optionally expire after `ttl_seconds`.
+    """
+
+    def __init__(self, max_entries: int = 100000, ttl_seconds: float = None, decimals: int = 4):
+        if max_entries < 1:
+            raise ValueError("max_entries must be at least 1.")
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds or None
+        self.scale = 10.0 ** decimals
+        self._entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+
+    def invalidate(self, model_version: str) -> int:
+        """Drops the entries of `model_version` once it is unloaded and returns how many there were."""
+        stale = [key for key in self._entries if key[0] == model_version]
+        for key in stale:
+            del self._entries[key]
+        self.invalidations += len(stale)
+        return len(stale)
+
+    def keys(self, instances: np.ndarray, model_version: str = "") -> list:
+        """Returns one cache key per row of `instances`, keyed to `model_version`."""
+        quantized = np.rint(np.asarray(instances, dtype=np.float64) * self.scale).astype(np.int64)
+        data = quantized.tobytes()
+        row_bytes = quantized.shape[1] * quantized.itemsize
+        return [
+            (model_version, hashlib.blake2b(data[start:start + row_bytes], digest_size=16).digest())
+            for start in range(0, len(data), row_bytes)
+        ]
+
+    def get_many(self, keys: list):
+        """
+        Looks up `keys` and returns (predictions, missing), where predictions holds
+        NaN for every miss and missing holds the indices of the misses.
+        """
+        predictions = np.full(len(keys), np.nan, dtype=np.float32)
+        missing = []
+        now = time.monotonic()
+        for i, key in enumerate(keys):
+            entry = self._entries.get(key)
+            if entry is not None and entry[1] is not None and entry[1] <= now:
+                del self._entries[key]
+                self.expirations += 1
+                entry = None
+            if entry is None:
+                missing.append(i)
+                continue
+            self._entries.move_to_end(key)
+            predictions[i] = entry[0]
+
+        self.hits += len(keys) - len(missing)
+        self.misses += len(missing)
+        return predictions, np.array(missing, dtype=np.int64)
+
+    def put_many(self, keys: list, predictions):
+        """Stores predictions, evicting the least recently used entries when full."""
+        expires_at = time.monotonic() + self.ttl_seconds if self.ttl_seconds else None
+        for key, prediction in zip(keys, predictions):
+            self._entries[key] = (float(prediction), expires_at)
+            self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+            "invalidations": self.invalidations,
+        }
@@ -0,0 +1,117 @@
+import io
+import json
+
+import numpy as np
+
+JSON_CONTENT_TYPES = {"application/json"}
+JSONL_CONTENT_TYPES = {"application/jsonlines", "application/jsonl", "application/x-ndjson"}
+RAW_CONTENT_TYPES = {"application/octet-stream"}
+NPY_CONTENT_TYPES = {"application/x-npy", "application/npy"}
+
+
+class DecodeError(ValueError):
+    """Raised when a request body cannot be decoded into an (n, features) float32 array."""
+
+
+def decode_instances(body: bytes, content_type: str, num_features: int) -> np.ndarray:
+    """
+    Decodes a /predict request body into a C-contiguous (n, num_features) float32 array.
+
+    Supported content types:
+      - application/json: {"instances": [[...], ...]} or a single flat instance
+      - application/jsonlines: one JSON record per line
+      - application/octet-stream: raw little-endian float32, row-major
+      - application/x-npy: a serialized .npy array
+    """
+    content_type = (content_type or "application/json").split(";")[0].strip().lower()
+    if content_type in RAW_CONTENT_TYPES:
+        instances = _decode_raw(body, num_features)
+    elif content_type in NPY_CONTENT_TYPES:
+        instances = _decode_npy(body, num_features)
+    elif content_type in JSONL_CONTENT_TYPES:
+        instances = _decode_jsonl(body, num_features)
+    elif content_type in JSON_CONTENT_TYPES:
+        instances = _decode_json(body, num_features)
+    else:
+        raise DecodeError(f"Unsupported content type: {content_type}")
+
+    if not np.isfinite(instances).all():
+        raise DecodeError("Instances must not contain NaN or infinite values.")
+    return instances
+
+
+def decode_instance_list(instances, num_features: int) -> np.ndarray:
+    """Converts already-parsed JSON instances, one or a list of them, into an (n, num_features) float32 array."""
+    instances = _to_array(instances, num_features)
+    if not np.isfinite(instances).all():
+        raise DecodeError("Instances must not contain NaN or infinite values.")
+    return instances
+
+
+def _decode_raw(body: bytes, num_features: int) -> np.ndarray:
+    row_bytes = 4 * num_features
+    if not body or len(body) % row_bytes:
+        raise DecodeError(f"Raw float32 body must be a non-empty multiple of {row_bytes} bytes, got {len(body)}.")
+    return np.frombuffer(body, dtype="<f4").reshape(-1, num_features)
+
+
+def _decode_npy(body: bytes, num_features: int) -> np.ndarray:
+    try:
+        array = np.load(io.BytesIO(body), allow_pickle=False)
+    except (ValueError, OSError, EOFError) as e:
+        raise DecodeError(f"Invalid .npy body: {e}") from e
+    if array.dtype.kind not in "iuf":
+        raise DecodeError(f"Instances must be numeric, got dtype {array.dtype}.")
+    return _check_shape(np.ascontiguousarray(array, dtype=np.float32), num_features)
+
+
+def _decode_json(body: bytes, num_features: int) -> np.ndarray:
+    try:
+        payload = json.loads(body)
+    except ValueError as e:
+        raise DecodeError(f"Invalid JSON body: {e}") from e
+    if not isinstance(payload, dict) or "instances" not in payload:
+        raise DecodeError("Request body must contain an 'instances' key.")
+    return _to_array(payload["instances"], num_features)
+
+
+def _decode_jsonl(body: bytes, num_features: int) -> np.ndarray:
+    rows = []
+    for line in body.splitlines():
+        if not line.strip():
+            continue
+        try:
+            record = json.loads(line)
+        except ValueError as e:
+            raise DecodeError(f"Invalid JSON line: {e}") from e
+        if isinstance(record, dict):
+            if "instances" not in record:
+                raise DecodeError("Each JSON line must contain an 'instances' key.")
+            record = record["instances"]
+        if record and isinstance(record[0], list):
+            rows.extend(record)
+        else:
+            rows.append(record)
+    return _to_array(rows, num_features)
+
+
+def _to_array(instances, num_features: int) -> np.ndarray:
+    """Converts nested lists of numbers into a (n, num_features) float32 array."""
+    if not isinstance(instances, list) or not instances:
+        raise DecodeError("'instances' must be a non-empty list.")
+    try:
+        array = np.asarray(instances)
+    except ValueError as e:
+        raise DecodeError("Instances must all have the same number of features.") from e
+    # Checking the inferred dtype keeps strings like "1.5" from being silently converted
+    if array.dtype.kind not in "iuf":
+        raise DecodeError(f"Instances must contain only numbers, got dtype {array.dtype}.")
+    return _check_shape(np.ascontiguousarray(array, dtype=np.float32), num_features)
+
+
+def _check_shape(instances: np.ndarray, num_features: int) -> np.ndarray:
+    if instances.ndim == 1:
+        instances = instances.reshape(1, -1)
+    if instances.ndim != 2 or len(instances) == 0 or instances.shape[1] != num_features:
+        raise DecodeError(f"Expected a non-empty (n, {num_features}) array, got shape {instances.shape}.")
+    return instances
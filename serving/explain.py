@@ -0,0 +1,117 @@
+import numpy as np
+
+METHODS = ["integrated_gradients", "gradient_x_input"]
+DEFAULT_METHOD = "integrated_gradients"
+# Names of the Boston Housing features, reported with attributions of 13-feature models
+FEATURE_NAMES = ["CRIM", "ZN", "INDUS", "CHAS", "NOX", "RM", "AGE", "DIS", "RAD", "TAX", "PTRATIO", "B", "LSTAT"]
+# Relative step of the finite differences used for backends that cannot differentiate
+FINITE_DIFFERENCE_STEP = 1e-3
+
+
+class ExplainError(ValueError):
+    """Raised for explain parameters that cannot be used, e.g. an unknown method or a baseline of the wrong width."""
+
+
+def finite_difference_gradients(predict, instances: np.ndarray):
+    """
+    Predictions and input gradients from forward differences, for backends
+    without gradients (TFLite): every row is repeated once per feature with
+    that feature nudged, and all of them go through `predict` as one batch.
+    ReLU networks are piecewise linear, so this is exact away from the kinks.
+    """
+    num_rows, num_features = instances.shape
+    steps = FINITE_DIFFERENCE_STEP * np.maximum(np.abs(instances), 1.0)
+    nudged = np.repeat(instances[:, None, :], num_features, axis=1)
+    nudged[:, np.arange(num_features), np.arange(num_features)] += steps
+    outputs = predict(np.concatenate([instances, nudged.reshape(-1, num_features)]))
+    predictions = outputs[:num_rows]
+    gradients = (outputs[num_rows:].reshape(num_rows, num_features) - predictions[:, None]) / steps
+    return predictions, gradients
+
+
+def batched_gradients(predictor, rows: np.ndarray, max_rows: int):
+    """Predictions and input gradients of `rows`, in chunks of at most `max_rows` rows per call."""
+    gradients_fn = getattr(predictor, "gradients", None)
+    if gradients_fn is None:
+        # Each row becomes features + 1 rows in the batch predicted
+        max_rows = max(1, max_rows // (predictor.num_features + 1))
+
+        def gradients_fn(chunk):
+            return finite_difference_gradients(predictor.predict, chunk)
+    predictions = np.empty(len(rows), dtype=np.float32)
+    gradients = np.empty(rows.shape, dtype=np.float32)
+    for start in range(0, len(rows), max_rows):
+        predictions[start:start + max_rows], gradients[start:start + max_rows] = gradients_fn(rows[start:start + max_rows])
+    return predictions, gradients
+
+
+def resolve_baseline(predictor, baseline, num_rows: int) -> np.ndarray:
+    """
+    The (num_rows, features) baseline: the one given, one row or one per
+    instance; otherwise the training feature mean when the model records it,
+    and all zeros when it does not.
+    """
+    num_features = predictor.num_features
+    if baseline is None:
+        mean = getattr(predictor, "feature_mean", None)
+        baseline = np.zeros(num_features, np.float32) if mean is None else mean
+    try:
+        baseline = np.asarray(baseline, dtype=np.float32)
+    except (TypeError, ValueError) as e:
+        raise ExplainError("'baseline' must be a list of numbers.") from e
+    if baseline.ndim == 1:
+        baseline = baseline.reshape(1, -1)
+    if baseline.ndim != 2 or baseline.shape[1] != num_features or len(baseline) not in (1, num_rows):
+        raise ExplainError(f"'baseline' must have shape ({num_features},) or ({num_rows}, {num_features}), "
+                           f"got {baseline.shape}.")
+    if not np.isfinite(baseline).all():
+        raise ExplainError("'baseline' must not contain NaN or infinite values.")
+    return np.broadcast_to(baseline, (num_rows, num_features))
+
+
+def explain(predictor, instances: np.ndarray, method: str = DEFAULT_METHOD, steps: int = 50, baseline=None,
+            max_rows: int = 16384) -> dict:
+    """
+    Attributes each prediction to the input features, relative to a baseline input.
+
+    integrated_gradients averages the gradients at `steps` points along the
+    straight line from the baseline to the instance (midpoint rule) and scales
+    them by (instance - baseline); the attributions of an instance then add up
+    to its prediction minus the baseline's, up to the `approximation_error`
+    reported, which shrinks as `steps` grows. gradient_x_input is the gradient
+    at the instance times (instance - baseline), a single step.
+
+    The interpolated points of every instance, the instances and the baselines
+    are stacked into one batch, so the gradients come from one vectorized
+    forward and backward pass (per `max_rows` rows) rather than a loop.
+    """
+    if method not in METHODS:
+        raise ExplainError(f"Unknown explain method '{method}'; expected one of {METHODS}.")
+    if method == "integrated_gradients" and steps < 1:
+        raise ExplainError("'steps' must be at least 1.")
+    instances = np.asarray(instances, dtype=np.float32)
+    num_rows = len(instances)
+    baseline = resolve_baseline(predictor, baseline, num_rows)
+    delta = instances - baseline
+
+    if method == "integrated_gradients":
+        alphas = ((np.arange(steps, dtype=np.float32) + 0.5) / steps)[None, :, None]
+        path = (baseline[:, None, :] + alphas * delta[:, None, :]).reshape(-1, predictor.num_features)
+    else:
+        # Only the gradients at the instances themselves, which are in the batch anyway
+        path = instances[:0]
+    predictions, gradients = batched_gradients(predictor, np.concatenate([path, instances, baseline]), max_rows)
+
+    if method == "integrated_gradients":
+        path_gradients = gradients[:len(path)].reshape(num_rows, steps, -1).mean(axis=1)
+    else:
+        path_gradients = gradients[:num_rows]
+    predictions = predictions[len(path):]
+    attributions = path_gradients * delta
+    instance_predictions, baseline_predictions = predictions[:num_rows], predictions[num_rows:]
+    return {
+        "attributions": attributions,
+        "predictions": instance_predictions,
+        "baseline_predictions": baseline_predictions,
+        "approximation_error": instance_predictions - baseline_predictions - attributions.sum(axis=1),
+    }
@@ -0,0 +1,119 @@
+import bisect
+import os
+import resource
+
+# Latency buckets in seconds, from 50us up to 5s
+LATENCY_BUCKETS = (0.00005, 0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+# Rows per forward pass
+BATCH_SIZE_BUCKETS = (1, 2, 4, 8, 16, 32, 64, 128, 256, 512, 1024, 4096, 16384, 65536)
+
+
+def _format_labels(labels: dict, extra: dict = None) -> str:
+    labels = {**labels, **(extra or {})}
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{key}="{value}"' for key, value in labels.items()) + "}"
+
+
+class Counter:
+    """A monotonically increasing value, either incremented or read from `fn` at scrape time."""
+    type = "counter"
+
+    def __init__(self, labels: dict, fn=None):
+        self.labels = labels
+        self.value = 0.0
+        self.fn = fn
+
+    def inc(self, amount: float = 1.0):
+        self.value += amount
+
+    def samples(self, name: str):
+        value = self.fn() if self.fn is not None else self.value
+        yield f"{name}{_format_labels(self.labels)} {value}"
+
+
+class Gauge:
+    """A value that is either set directly or read from `fn` at scrape time."""
+    type = "gauge"
+
+    def __init__(self, labels: dict, fn=None):
+        self.labels = labels
+        self.value = 0.0
+        self.fn = fn
+
+    def set(self, value: float):
+        self.value = value
+
+    def samples(self, name: str):
+        value = self.fn() if self.fn is not None else self.value
+        yield f"{name}{_format_labels(self.labels)} {value}"
+
+
+class Histogram:
+    """
+    Fixed-bucket histogram. observe() is a bisect and two additions, so it is
+    cheap enough to call on every request.
+    """
+    type = "histogram"
+
+    def __init__(self, labels: dict, buckets):
+        self.labels = labels
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def samples(self, name: str):
+        cumulative = 0
+        for bound, count in zip(self.buckets, self.counts):
+            cumulative += count
+            yield f"{name}_bucket{_format_labels(self.labels, {'le': bound})} {cumulative}"
+        yield f"{name}_bucket{_format_labels(self.labels, {'le': '+Inf'})} {self.count}"
+        yield f"{name}_sum{_format_labels(self.labels)} {self.sum}"
+        yield f"{name}_count{_format_labels(self.labels)} {self.count}"
+
+
+class Registry:
+    """Holds metrics by name and renders them in the Prometheus text exposition format."""
+
+    def __init__(self):
+        self._families = {}
+
+    def _get(self, cls, name: str, help: str, labels: dict, **kwargs):
+        family = self._families.setdefault(name, {"type": cls.type, "help": help, "series": {}})
+        key = tuple(sorted(labels.items()))
+        if key not in family["series"]:
+            family["series"][key] = cls(labels, **kwargs)
+        return family["series"][key]
+
+    def counter(self, name: str, help: str, fn=None, **labels) -> Counter:
+        return self._get(Counter, name, help, labels, fn=fn)
+
+    def gauge(self, name: str, help: str, fn=None, **labels) -> Gauge:
+        return self._get(Gauge, name, help, labels, fn=fn)
+
+    def histogram(self, name: str, help: str, buckets=LATENCY_BUCKETS, **labels) -> Histogram:
+        return self._get(Histogram, name, help, labels, buckets=buckets)
+
+    def render(self) -> str:
+        lines = []
+        for name, family in self._families.items():
+            lines.append(f"# HELP {name} {family['help']}")
+            lines.append(f"# TYPE {name} {family['type']}")
+            for metric in family["series"].values():
+                lines.extend(metric.samples(name))
+        return "\n".join(lines) + "\n"
+
+
+def resident_memory_bytes() -> int:
+    """Current RSS from /proc, falling back to the peak RSS where /proc is unavailable."""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError):
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
@@ -1,20 +1,323 @@
+import asyncio
+import json
 import os
-from fastapi import FastAPI, HTTPException, Request
-from google.cloud import storage
+import time
+from contextlib import asynccontextmanager
 
-app = FastAPI()
+import numpy as np
+from fastapi import FastAPI, HTTPException, Request, Response
+from fastapi.concurrency import run_in_threadpool
+
+from backends import load_predictor, model_fingerprint, warmup_batches
+from batching import MicroBatcher
+from cache import PredictionCache
+from decoding import DecodeError, decode_instance_list, decode_instances
+from explain import DEFAULT_METHOD, FEATURE_NAMES, ExplainError, explain
+from metrics import BATCH_SIZE_BUCKETS, Registry, resident_memory_bytes
+from registry import ModelRegistry, ModelVersion, UnknownVersionError, find_versions, read_traffic_split
 
 HEALTH_ROUTE = os.environ["AIP_HEALTH_ROUTE"]
 PREDICTIONS_ROUTE = os.environ["AIP_PREDICT_ROUTE"]
+CACHE_STATS_ROUTE = "/cache/stats"
+METRICS_ROUTE = "/metrics"
+MODELS_ROUTE = "/models"
+# Feature attributions: {"instances": [...], "parameters": {"method": ..., "steps": ..., "baseline": [...]}}
+EXPLAIN_ROUTE = os.environ.get("EXPLAIN_ROUTE", "/explain")
+# Each subdirectory of AIP_MODEL_DIR holding model artifacts is served as a version
+# named after it; artifacts directly in AIP_MODEL_DIR are served as "default"
+MODEL_DIR = os.environ.get("AIP_MODEL_DIR", "model")
+# "numpy" runs the exported weights without TensorFlow, "keras" loads model.keras,
+# "savedmodel" and "tflite" run the traced graph exports, "auto" picks numpy when
+# the exported weights are present
+MODEL_BACKEND = os.environ.get("MODEL_BACKEND", "auto")
+# Memory-map the NumPy weights instead of copying them, so worker processes share them;
+# server.py turns this on when it runs more than one worker
+MMAP_WEIGHTS = os.environ.get("MMAP_WEIGHTS", "0") == "1"
+# How often to check AIP_MODEL_DIR for new, changed or removed versions; 0 disables reloading
+MODEL_POLL_INTERVAL_S = float(os.environ.get("MODEL_POLL_INTERVAL_S", "30"))
+# Requests carrying this header are served by the named version; all others follow the
+# traffic split, e.g. "v1=90,v2=10". <AIP_MODEL_DIR>/traffic.json overrides TRAFFIC_SPLIT
+# and is re-read on every poll. Without a split, the newest version gets all traffic
+MODEL_VERSION_HEADER = os.environ.get("MODEL_VERSION_HEADER", "X-Model-Version")
+TRAFFIC_SPLIT = os.environ.get("TRAFFIC_SPLIT", "")
+
+# Micro-batching settings; set ENABLE_BATCHING=0 to run every request on its own
+ENABLE_BATCHING = os.environ.get("ENABLE_BATCHING", "1") == "1"
+MAX_BATCH_SIZE = int(os.environ.get("MAX_BATCH_SIZE", "64"))
+MAX_BATCH_WAIT_MS = float(os.environ.get("MAX_BATCH_WAIT_MS", "5"))
+
+# Prediction cache settings; CACHE_MAX_ENTRIES=0 disables the cache, CACHE_TTL_S=0 means no expiry
+CACHE_MAX_ENTRIES = int(os.environ.get("CACHE_MAX_ENTRIES", "100000"))
+CACHE_TTL_S = float(os.environ.get("CACHE_TTL_S", "0"))
+CACHE_DECIMALS = int(os.environ.get("CACHE_DECIMALS", "4"))
+
+# Explain settings: the default and largest number of integrated-gradients steps a request
+# may ask for, and the most rows (instances x steps) sent through one gradient call
+EXPLAIN_STEPS = int(os.environ.get("EXPLAIN_STEPS", "50"))
+EXPLAIN_MAX_STEPS = int(os.environ.get("EXPLAIN_MAX_STEPS", "1024"))
+EXPLAIN_MAX_ROWS = int(os.environ.get("EXPLAIN_MAX_ROWS", "16384"))
+
+state = {}
+
+registry = Registry()
+REQUESTS_OK = registry.counter("predict_requests_total", "Requests handled by the predict route.", status="ok")
+REQUESTS_ERROR = registry.counter("predict_requests_total", "Requests handled by the predict route.", status="error")
+INSTANCES = registry.counter("predict_instances_total", "Instances received by the predict route.")
+BATCH_SIZE = registry.histogram("predict_batch_size", "Rows per forward pass.", buckets=BATCH_SIZE_BUCKETS)
+STAGE_LATENCY = {
+    stage: registry.histogram("predict_stage_latency_seconds", "Time spent per request stage.", stage=stage)
+    for stage in ("decode", "queue_wait", "inference", "encode")
+}
+EXPLAIN_REQUESTS_OK = registry.counter("explain_requests_total", "Requests handled by the explain route.", status="ok")
+EXPLAIN_REQUESTS_ERROR = registry.counter("explain_requests_total", "Requests handled by the explain route.",
+                                          status="error")
+EXPLAIN_LATENCY = registry.histogram("explain_latency_seconds", "Time spent computing attributions per request.")
+MODEL_LOAD_SECONDS = registry.gauge("model_load_seconds", "Time taken to load and warm up the current model.")
+MODEL_READY = registry.gauge("model_ready", "1 once the model is loaded and warmed up.")
+registry.gauge("process_resident_memory_bytes", "Resident memory of the serving process.", fn=resident_memory_bytes)
+
+
+def record_batch(num_rows: int, queue_waits: list, inference_seconds: float):
+    BATCH_SIZE.observe(num_rows)
+    STAGE_LATENCY["inference"].observe(inference_seconds)
+    for wait in queue_waits:
+        STAGE_LATENCY["queue_wait"].observe(wait)
+
+
+def load_version(name: str, path: str) -> ModelVersion:
+    """Loads and warms up the model version in `path`; runs on a worker thread while the others keep serving."""
+    start = time.perf_counter()
+    fingerprint = model_fingerprint(path)
+    predictor = load_predictor(path, MODEL_BACKEND, mmap=MMAP_WEIGHTS)
+    # Replay the exported warmup requests (or zero batches of the sizes we expect), so
+    # the first requests do not pay for lazy initialization
+    for batch in warmup_batches(path, predictor.num_features, (1, MAX_BATCH_SIZE)):
+        predictor.predict(batch)
+    MODEL_LOAD_SECONDS.set(time.perf_counter() - start)
+    return ModelVersion(name, path, predictor, fingerprint)
+
+
+_stopping_batchers = set()
+
+
+def unload_version(version: ModelVersion):
+    # Called once no request holds the version any more, so its batcher has nothing queued
+    if version.batcher is not None:
+        task = asyncio.get_running_loop().create_task(version.batcher.stop())
+        _stopping_batchers.add(task)
+        task.add_done_callback(_stopping_batchers.discard)
+    # Its cached predictions can never be hit again, unless another loaded version has the same artifacts
+    cache = state.get("cache")
+    if cache is not None and all(other.fingerprint != version.fingerprint for other in models.versions.values()):
+        cache.invalidate(version.fingerprint)
+    print(f"Unloaded model version {version.name} ({version.fingerprint})")
+
+
+models = ModelRegistry(on_unload=unload_version)
+registry.gauge("model_versions_loaded", "Model versions currently serving.", fn=lambda: len(models.versions))
+
+
+async def sync_models():
+    """
+    Loads new and changed versions in AIP_MODEL_DIR in the background, swaps each
+    in once it is warmed up, and retires versions whose directory is gone.
+    """
+    found = find_versions(MODEL_DIR)
+    for name, path in found.items():
+        current = models.get(name)
+        if current is not None and model_fingerprint(path) == current.fingerprint:
+            continue
+        try:
+            version = await run_in_threadpool(load_version, name, path)
+        except Exception as e:
+            # Keep serving the current version, if any; the next poll retries
+            print(f"Failed to load model version {name} from {path}: {e}")
+            continue
+        if ENABLE_BATCHING:
+            version.batcher = MicroBatcher(version.predictor.predict, MAX_BATCH_SIZE, MAX_BATCH_WAIT_MS,
+                                           on_batch=record_batch)
+            version.batcher.start()
+        models.swap_in(version)
+        print(f"Serving model version {name} ({version.fingerprint}) from {path}")
+
+    for name in list(models.versions):
+        if name not in found:
+            models.remove(name)
+    try:
+        models.traffic_split = read_traffic_split(MODEL_DIR, TRAFFIC_SPLIT)
+    except ValueError as e:
+        print(f"Ignoring invalid traffic split: {e}")
+
+
+async def watch_models():
+    while True:
+        await asyncio.sleep(MODEL_POLL_INTERVAL_S)
+        await sync_models()
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    await sync_models()
+    if not models.versions:
+        raise RuntimeError(f"No model could be loaded from {MODEL_DIR}.")
+    if CACHE_MAX_ENTRIES > 0:
+        state["cache"] = PredictionCache(CACHE_MAX_ENTRIES, CACHE_TTL_S, CACHE_DECIMALS)
+        for name in ("hits", "misses", "evictions", "expirations", "invalidations"):
+            registry.counter(f"prediction_cache_{name}_total", f"Prediction cache {name}.",
+                             fn=lambda name=name: getattr(state["cache"], name))
+        registry.gauge("prediction_cache_entries", "Entries in the prediction cache.",
+                       fn=lambda: state["cache"].stats()["entries"])
+    watcher = asyncio.create_task(watch_models()) if MODEL_POLL_INTERVAL_S > 0 else None
+    state["ready"] = True
+    MODEL_READY.set(1)
+    yield
+    MODEL_READY.set(0)
+    if watcher is not None:
+        watcher.cancel()
+    for name in list(models.versions):
+        models.remove(name)
+    await asyncio.gather(*_stopping_batchers)
+    state.clear()
+
+
+app = FastAPI(lifespan=lifespan)
+
+
+async def run_inference(version: ModelVersion, instances: np.ndarray) -> np.ndarray:
+    if version.batcher is not None:
+        return await version.batcher.submit(instances)
+    start = time.perf_counter()
+    predictions = await run_in_threadpool(version.predictor.predict, instances)
+    record_batch(len(instances), [], time.perf_counter() - start)
+    return predictions
 
 
 @app.get(HEALTH_ROUTE, status_code=200)
 def health():
+    # Only report ready once the model is loaded and warmed up
+    if not state.get("ready"):
+        raise HTTPException(status_code=503, detail="Model is not loaded yet.")
     return {"Healthy Server!"}
 
 
+@app.get(METRICS_ROUTE)
+def metrics():
+    return Response(registry.render(), media_type="text/plain; version=0.0.4")
+
+
+@app.get(CACHE_STATS_ROUTE)
+def cache_stats():
+    if "cache" not in state:
+        return {"enabled": False}
+    return {"enabled": True, **state["cache"].stats()}
+
+
+@app.get(MODELS_ROUTE)
+def list_models():
+    weights = models.weights()
+    return {"versions": [
+        {"name": version.name, "fingerprint": version.fingerprint, "traffic_share": round(weights[name], 4),
+         "in_flight": version.refcount}
+        for name, version in models.versions.items()
+    ]}
+
+
 @app.post(PREDICTIONS_ROUTE)
 async def predict(request: Request):
+    body = await request.body()
+    try:
+        version = models.acquire(request.headers.get(MODEL_VERSION_HEADER))
+    except UnknownVersionError as e:
+        REQUESTS_ERROR.inc()
+        raise HTTPException(status_code=404, detail=f"Unknown model version: {e.args[0]}")
+    # The version stays loaded until this request releases it, even if it is swapped out meanwhile
+    try:
+        predictions = await predict_with(version, request, body)
+    finally:
+        models.release(version)
 
     # response
-    return {"predictions": [0.1, 0.9]}
+    start = time.perf_counter()
+    content = json.dumps({"predictions": predictions.tolist()})
+    STAGE_LATENCY["encode"].observe(time.perf_counter() - start)
+    REQUESTS_OK.inc()
+    registry.counter("predict_requests_by_version_total", "Requests served per model version.",
+                     version=version.name).inc()
+    return Response(content, media_type="application/json", headers={MODEL_VERSION_HEADER: version.name})
+
+
+def parse_explain_request(body: bytes, num_features: int):
+    """The instances and the explain() keyword arguments of an explain request body."""
+    try:
+        payload = json.loads(body)
+    except ValueError as e:
+        raise DecodeError(f"Invalid JSON body: {e}") from e
+    if not isinstance(payload, dict) or "instances" not in payload:
+        raise DecodeError("Request body must contain an 'instances' key.")
+    instances = decode_instance_list(payload["instances"], num_features)
+    parameters = payload.get("parameters") or {}
+    if not isinstance(parameters, dict):
+        raise ExplainError("'parameters' must be an object.")
+    steps = parameters.get("steps", EXPLAIN_STEPS)
+    if not isinstance(steps, int) or not 1 <= steps <= EXPLAIN_MAX_STEPS:
+        raise ExplainError(f"'steps' must be an integer from 1 to {EXPLAIN_MAX_STEPS}.")
+    return instances, {"method": parameters.get("method", DEFAULT_METHOD), "steps": steps,
+                       "baseline": parameters.get("baseline")}
+
+
+@app.post(EXPLAIN_ROUTE)
+async def explain_predictions(request: Request):
+    body = await request.body()
+    try:
+        version = models.acquire(request.headers.get(MODEL_VERSION_HEADER))
+    except UnknownVersionError as e:
+        EXPLAIN_REQUESTS_ERROR.inc()
+        raise HTTPException(status_code=404, detail=f"Unknown model version: {e.args[0]}")
+    try:
+        try:
+            instances, parameters = parse_explain_request(body, version.num_features)
+        except (DecodeError, ExplainError) as e:
+            EXPLAIN_REQUESTS_ERROR.inc()
+            raise HTTPException(status_code=400, detail=str(e))
+        # Attributions bypass the micro-batcher and the cache; every instance is already one batched call
+        start = time.perf_counter()
+        try:
+            result = await run_in_threadpool(explain, version.predictor, instances, max_rows=EXPLAIN_MAX_ROWS,
+                                             **parameters)
+        except ExplainError as e:
+            EXPLAIN_REQUESTS_ERROR.inc()
+            raise HTTPException(status_code=400, detail=str(e))
+        EXPLAIN_LATENCY.observe(time.perf_counter() - start)
+    finally:
+        models.release(version)
+
+    response = {name: values.tolist() for name, values in result.items()}
+    response.update(method=parameters["method"], steps=parameters["steps"])
+    if version.num_features == len(FEATURE_NAMES):
+        response["feature_names"] = FEATURE_NAMES
+    EXPLAIN_REQUESTS_OK.inc()
+    return Response(json.dumps(response), media_type="application/json", headers={MODEL_VERSION_HEADER: version.name})
+
+
+async def predict_with(version: ModelVersion, request: Request, body: bytes) -> np.ndarray:
+    start = time.perf_counter()
+    try:
+        instances = decode_instances(body, request.headers.get("content-type"), version.num_features)
+    except DecodeError as e:
+        REQUESTS_ERROR.inc()
+        raise HTTPException(status_code=400, detail=str(e))
+    STAGE_LATENCY["decode"].observe(time.perf_counter() - start)
+    INSTANCES.inc(len(instances))
+
+    cache = state.get("cache")
+    if cache is None:
+        return await run_inference(version, instances)
+    # Only the instances that are not cached go through the model; keys include the
+    # version's fingerprint, so versions never share or serve stale predictions
+    keys = cache.keys(instances, version.fingerprint)
+    predictions, missing = cache.get_many(keys)
+    if len(missing):
+        computed = await run_inference(version, instances[missing])
+        predictions[missing] = computed
+        cache.put_many([keys[i] for i in missing], computed)
+    return predictions
@@ -0,0 +1,177 @@
+import json
+import os
+import random
+import re
+
+from backends import KERAS_MODEL_FILE, NUMPY_WEIGHTS_FILE, SAVED_MODEL_DIR, TFLITE_MODEL_FILE
+
+# A model traffic split can be kept next to the versions, so a rollout only needs a file write
+TRAFFIC_FILE = "traffic.json"
+# Name of the version served from the files directly in the model directory
+DEFAULT_VERSION = "default"
+
+_ARTIFACTS = (KERAS_MODEL_FILE, NUMPY_WEIGHTS_FILE, SAVED_MODEL_DIR, TFLITE_MODEL_FILE)
+
+
+class UnknownVersionError(KeyError):
+    """Raised when a request asks for a model version that is not loaded."""
+
+
+def has_model(path: str) -> bool:
+    return any(os.path.exists(os.path.join(path, name)) for name in _ARTIFACTS)
+
+
+def find_versions(model_dir: str) -> dict:
+    """
+    Returns {version: path} for every subdirectory of `model_dir` that holds model
+    artifacts. Artifacts directly in `model_dir` are served as DEFAULT_VERSION.
+    """
+    versions = {DEFAULT_VERSION: model_dir} if has_model(model_dir) else {}
+    if os.path.isdir(model_dir):
+        for name in os.listdir(model_dir):
+            path = os.path.join(model_dir, name)
+            if not name.startswith(".") and os.path.isdir(path) and has_model(path):
+                versions[name] = path
+    return versions
+
+
+def version_order(name: str):
+    """Sort key that puts "10" after "9" and "v10" after "v9"."""
+    return [(0, int(part), "") if part.isdigit() else (1, 0, part) for part in re.split(r"(\d+)", name) if part]
+
+
+def parse_traffic_split(text: str) -> dict:
+    """
+    Parses a traffic split given as "v1=90,v2=10" or as a JSON object
+    {"v1": 90, "v2": 10}. Weights are relative and need not add up to 100.
+    """
+    text = (text or "").strip()
+    if not text:
+        return {}
+    if text.startswith("{"):
+        split = json.loads(text)
+    else:
+        split = {}
+        for part in text.split(","):
+            name, _, weight = part.partition("=")
+            split[name.strip()] = weight
+    split = {name: float(weight) for name, weight in split.items()}
+    if any(weight < 0 for weight in split.values()):
+        raise ValueError(f"Traffic weights must not be negative: {text}")
+    return split
+
+
+def read_traffic_split(model_dir: str, default: str = "") -> dict:
+    """The split in <model_dir>/traffic.json if there is one, otherwise `default`."""
+    path = os.path.join(model_dir, TRAFFIC_FILE)
+    if os.path.exists(path):
+        with open(path) as f:
+            return parse_traffic_split(f.read())
+    return parse_traffic_split(default)
+
+
+class ModelVersion:
+    """
+    One loaded model version. `refcount` counts the requests using it; once the
+    version is retired and the count drops to zero it is unloaded.
+    """
+
+    def __init__(self, name: str, path: str, predictor, fingerprint: str, batcher=None):
+        self.name = name
+        self.path = path
+        self.predictor = predictor
+        self.fingerprint = fingerprint
+        self.batcher = batcher
+        self.refcount = 0
+        self.retired = False
+
+    @property
+    def num_features(self) -> int:
+        return self.predictor.num_features
+
+
+class ModelRegistry:
+    """
+    The model versions being served, and the traffic split between them.
+
+    Versions are swapped in and out by replacing the whole version table, so a
+    request either sees the old version or the new one. A request holds its
+    version from acquire() to release(); a replaced or removed version keeps
+    serving the requests already holding it, and `on_unload(version)` runs once
+    the last of them has released it.
+
+    Requests without an explicit version are routed by the weighted traffic
+    split. Versions missing from the split get no traffic; without a split, all
+    traffic goes to the newest version by version_order().
+    Must only be used from the event loop thread.
+    """
+
+    def __init__(self, on_unload=None, rng=None):
+        self.on_unload = on_unload
+        self.traffic_split = {}
+        self._versions = {}
+        self._rng = rng or random.Random()
+
+    @property
+    def versions(self) -> dict:
+        return self._versions
+
+    def get(self, name: str):
+        return self._versions.get(name)
+
+    def swap_in(self, version: ModelVersion):
+        """Makes `version` serve its name, retiring the version it replaces."""
+        old = self._versions.get(version.name)
+        self._versions = {**self._versions, version.name: version}
+        if old is not None:
+            self._retire(old)
+
+    def remove(self, name: str):
+        old = self._versions.get(name)
+        if old is not None:
+            self._versions = {key: value for key, value in self._versions.items() if key != name}
+            self._retire(old)
+
+    def weights(self) -> dict:
+        """The effective share of routed traffic per loaded version."""
+        versions = self._versions
+        if not versions:
+            return {}
+        split = {name: weight for name, weight in self.traffic_split.items() if name in versions and weight > 0}
+        if not split:
+            split = {max(versions, key=version_order): 1.0}
+        total = sum(split.values())
+        return {name: split.get(name, 0.0) / total for name in versions}
+
+    def route(self, requested: str = None) -> ModelVersion:
+        """The version a request should use: `requested` if given, otherwise one picked by the traffic split."""
+        versions = self._versions
+        if requested:
+            if requested not in versions:
+                raise UnknownVersionError(requested)
+            return versions[requested]
+        weights = {name: weight for name, weight in self.weights().items() if weight > 0}
+        if not weights:
+            raise UnknownVersionError("No model version is loaded.")
+        name = self._rng.choices(list(weights), weights=list(weights.values()))[0]
+        return versions[name]
+
+    def acquire(self, requested: str = None) -> ModelVersion:
+        version = self.route(requested)
+        version.refcount += 1
+        return version
+
+    def release(self, version: ModelVersion):
+        version.refcount -= 1
+        if version.retired and version.refcount == 0:
+            self._unload(version)
+
+    def _retire(self, version: ModelVersion):
+        version.retired = True
+        if version.refcount == 0:
+            self._unload(version)
+
+    def _unload(self, version: ModelVersion):
+        if self.on_unload is not None:
+            self.on_unload(version)
+        version.predictor = None
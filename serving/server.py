@@ -0,0 +1,35 @@
+"""
+Starts the serving app with WORKERS uvicorn worker processes, so inference can
+use more than one core.
+
+Every worker loads the model itself, but the NumPy weights are memory-mapped
+read-only (MMAP_WEIGHTS) and the TFLite flatbuffer is always mapped, so the
+workers share one copy of the weights through the page cache instead of each
+holding its own. Keras and SavedModel models are copied into every worker.
+Each worker's math libraries are limited to THREADS_PER_WORKER threads, so the
+workers do not compete for the same cores.
+"""
+import os
+
+import uvicorn
+
+WORKERS = int(os.environ.get("WORKERS", "1"))
+THREADS_PER_WORKER = int(os.environ.get("THREADS_PER_WORKER", "1"))
+PORT = int(os.environ.get("AIP_HTTP_PORT", "8080"))
+
+_THREAD_VARIABLES = ("OMP_NUM_THREADS", "OPENBLAS_NUM_THREADS", "MKL_NUM_THREADS",
+                     "TF_NUM_INTRAOP_THREADS", "TF_NUM_INTEROP_THREADS")
+
+
+def main():
+    if WORKERS > 1:
+        # The workers are spawned, so they inherit these before importing NumPy or TensorFlow
+        os.environ.setdefault("MMAP_WEIGHTS", "1")
+        for variable in _THREAD_VARIABLES:
+            os.environ.setdefault(variable, str(THREADS_PER_WORKER))
+    uvicorn.run("predict:app", host="0.0.0.0", port=PORT, workers=WORKERS,
+                log_level=os.environ.get("LOG_LEVEL", "info"))
+
+
+if __name__ == "__main__":
+    main()
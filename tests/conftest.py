@@ -0,0 +1,11 @@
+import os
+import sys
+
+# The serving and training containers run their modules flat from /app, so put both on the path
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, os.path.join(ROOT, "serving"))
+sys.path.insert(0, os.path.join(ROOT, "training"))
+
+os.environ.setdefault("AIP_HEALTH_ROUTE", "/health")
+os.environ.setdefault("AIP_PREDICT_ROUTE", "/predict")
+os.environ.setdefault("AIP_MODEL_DIR", os.path.join(ROOT, "local_model_dir"))
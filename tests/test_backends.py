@@ -0,0 +1,63 @@
+import numpy as np
+import pytest
+
+from backends import NumpyFeedForward, KerasPredictor, load_predictor, NUMPY_ATOL, NUMPY_RTOL
+from training.export import export_numpy_weights
+from training.model import feed_forward_net
+
+
+@pytest.fixture
+def trained_model(tmp_path):
+    rng = np.random.default_rng(0)
+    X = rng.uniform(0, 100, size=(256, 13)).astype(np.float32)
+    y = X[:, :3].sum(axis=1)
+    model = feed_forward_net(input_shape=(13,))
+    model.fit(X, y, epochs=2, batch_size=32, verbose=0)
+    model.save(tmp_path / "model.keras")
+    export_numpy_weights(model, tmp_path / "model_weights.npz")
+    return model, tmp_path
+
+
+def test_numpy_backend_matches_keras(trained_model):
+    model, model_dir = trained_model
+    X = np.random.default_rng(1).uniform(0, 100, size=(1000, 13)).astype(np.float32)
+
+    expected = model(X, training=False).numpy().reshape(-1)
+    predictions = NumpyFeedForward.from_npz(model_dir / "model_weights.npz").predict(X)
+
+    np.testing.assert_allclose(predictions, expected, rtol=NUMPY_RTOL, atol=NUMPY_ATOL)
+
+
+def test_tampered_weights_fail_verification(trained_model, tmp_path):
+    _, model_dir = trained_model
+    with np.load(model_dir / "model_weights.npz") as data:
+        arrays = dict(data)
+    arrays["bias_2"] = arrays["bias_2"] + 1.0
+    np.savez(tmp_path / "tampered.npz", **arrays)
+
+    with pytest.raises(ValueError, match="differs from Keras"):
+        NumpyFeedForward.from_npz(tmp_path / "tampered.npz")
+
+
+def test_auto_backend_prefers_numpy_weights(trained_model):
+    _, model_dir = trained_model
+    assert isinstance(load_predictor(str(model_dir)), NumpyFeedForward)
+
+    (model_dir / "model_weights.npz").unlink()
+    assert isinstance(load_predictor(str(model_dir)), KerasPredictor)
+
+
+def test_mmap_weights_match_and_are_read_only(trained_model, tmp_path):
+    _, model_dir = trained_model
+    X = np.random.default_rng(2).uniform(0, 100, size=(100, 13)).astype(np.float32)
+    copied = NumpyFeedForward.from_npz(model_dir / "model_weights.npz")
+    mapped = NumpyFeedForward.from_npz(model_dir / "model_weights.npz", mmap=True)
+
+    np.testing.assert_array_equal(mapped.predict(X), copied.predict(X))
+    for kernel in mapped.kernels:
+        assert not kernel.flags.owndata and not kernel.flags.writeable
+
+    with np.load(model_dir / "model_weights.npz") as data:
+        np.savez_compressed(tmp_path / "compressed.npz", **dict(data))
+    with pytest.raises(ValueError, match="compressed"):
+        NumpyFeedForward.from_npz(tmp_path / "compressed.npz", mmap=True)
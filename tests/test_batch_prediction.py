@@ -0,0 +1,65 @@
+import json
+
+import numpy as np
+import pytest
+
+from scripts.run_local_batch_prediction import iter_chunks, parse_chunk, run_batch_prediction
+from training.export import export_numpy_weights
+from training.model import feed_forward_net
+
+
+@pytest.fixture
+def model_dir(tmp_path):
+    model = feed_forward_net(input_shape=(13,))
+    export_numpy_weights(model, tmp_path / "model_weights.npz")
+    return tmp_path
+
+
+@pytest.fixture
+def input_file(tmp_path):
+    rows = np.random.default_rng(0).uniform(0, 100, size=(25, 13)).round(3)
+    path = tmp_path / "input.jsonl"
+    with open(path, "w") as f:
+        for row in rows:
+            f.write(json.dumps({"instances": row.tolist()}) + "\n")
+    return path, rows
+
+
+def test_iter_chunks_splits_file(input_file):
+    path, _ = input_file
+    chunks = list(iter_chunks(path, chunk_size=10))
+    assert [len(lines) for _, lines in chunks] == [10, 10, 5]
+    assert [first_line for first_line, _ in chunks] == [1, 11, 21]
+
+
+def test_parse_chunk_accepts_repo_formats():
+    row = list(range(13))
+    lines = [
+        json.dumps({"instances": row}),
+        json.dumps({"input": row}),
+        json.dumps({"instances": [row, row]}),
+        json.dumps(row),
+    ]
+    _, instances = parse_chunk(lines, num_features=13)
+    assert instances.shape == (5, 13)
+    assert instances.dtype == np.float32
+    assert instances.flags["C_CONTIGUOUS"]
+
+
+def test_parse_chunk_reports_bad_line():
+    with pytest.raises(ValueError, match="Line 8"):
+        parse_chunk(["{not json"], num_features=13, first_line=8)
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_predictions_are_written_in_input_order(model_dir, input_file, tmp_path, workers):
+    path, rows = input_file
+    output_file = tmp_path / "predictions.jsonl"
+
+    stats = run_batch_prediction(str(model_dir), path, output_file, chunk_size=4, workers=workers)
+
+    assert stats["rows"] == len(rows)
+    with open(output_file) as f:
+        records = [json.loads(line) for line in f]
+    np.testing.assert_allclose([r["instance"] for r in records], rows)
+    assert all(isinstance(r["prediction"], float) for r in records)
@@ -0,0 +1,64 @@
+import asyncio
+
+import numpy as np
+import pytest
+
+from batching import MicroBatcher
+
+
+def test_concurrent_requests_are_coalesced():
+    batch_sizes = []
+
+    def predict_fn(instances):
+        batch_sizes.append(len(instances))
+        return instances.sum(axis=1)
+
+    async def run():
+        batcher = MicroBatcher(predict_fn, max_batch_size=64, max_wait_ms=50)
+        batcher.start()
+        requests = [np.full((2, 3), i, dtype=np.float32) for i in range(8)]
+        results = await asyncio.gather(*(batcher.submit(r) for r in requests))
+        await batcher.stop()
+        return results
+
+    results = asyncio.run(run())
+
+    # Every caller gets back exactly its own rows, in order
+    for i, result in enumerate(results):
+        np.testing.assert_allclose(result, [3 * i, 3 * i])
+    assert sum(batch_sizes) == 16
+    assert len(batch_sizes) < 8
+
+
+def test_batch_size_is_capped():
+    batch_sizes = []
+
+    def predict_fn(instances):
+        batch_sizes.append(len(instances))
+        return instances[:, 0]
+
+    async def run():
+        batcher = MicroBatcher(predict_fn, max_batch_size=4, max_wait_ms=50)
+        batcher.start()
+        await asyncio.gather(*(batcher.submit(np.ones((1, 3), dtype=np.float32)) for _ in range(10)))
+        await batcher.stop()
+
+    asyncio.run(run())
+    assert max(batch_sizes) <= 4
+    assert sum(batch_sizes) == 10
+
+
+def test_errors_propagate_to_callers():
+    def predict_fn(instances):
+        raise ValueError("bad batch")
+
+    async def run():
+        batcher = MicroBatcher(predict_fn, max_batch_size=8, max_wait_ms=1)
+        batcher.start()
+        try:
+            with pytest.raises(ValueError, match="bad batch"):
+                await batcher.submit(np.ones((1, 3), dtype=np.float32))
+        finally:
+            await batcher.stop()
+
+    asyncio.run(run())
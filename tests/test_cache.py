@@ -0,0 +1,66 @@
+import numpy as np
+
+from cache import PredictionCache
+
+ROWS = np.random.default_rng(0).uniform(0, 100, size=(4, 13)).astype(np.float32)
+
+
+def test_hits_after_store():
+    cache = PredictionCache(max_entries=10)
+    keys = cache.keys(ROWS)
+    predictions, missing = cache.get_many(keys)
+    assert list(missing) == [0, 1, 2, 3]
+    assert np.isnan(predictions).all()
+
+    cache.put_many(keys, [1.0, 2.0, 3.0, 4.0])
+    predictions, missing = cache.get_many(cache.keys(ROWS))
+    assert len(missing) == 0
+    np.testing.assert_array_equal(predictions, [1.0, 2.0, 3.0, 4.0])
+    assert cache.stats()["hits"] == 4 and cache.stats()["misses"] == 4
+
+
+def test_keys_ignore_noise_below_quantization():
+    cache = PredictionCache(max_entries=10, decimals=3)
+    rows = ROWS.round(3)
+    assert cache.keys(rows) == cache.keys(rows + 1e-4)
+    assert cache.keys(rows) != cache.keys(rows + 1e-2)
+
+
+def test_least_recently_used_entry_is_evicted():
+    cache = PredictionCache(max_entries=2)
+    keys = cache.keys(ROWS[:3])
+    cache.put_many(keys[:2], [1.0, 2.0])
+    cache.get_many([keys[0]])  # keys[0] is now more recent than keys[1]
+    cache.put_many([keys[2]], [3.0])
+
+    _, missing = cache.get_many(keys)
+    assert list(missing) == [1]
+    assert cache.stats()["evictions"] == 1
+
+
+def test_entries_expire_after_ttl(monkeypatch):
+    clock = [100.0]
+    monkeypatch.setattr("cache.time.monotonic", lambda: clock[0])
+    cache = PredictionCache(max_entries=10, ttl_seconds=5)
+    keys = cache.keys(ROWS[:1])
+    cache.put_many(keys, [1.0])
+
+    clock[0] += 4
+    assert len(cache.get_many(keys)[1]) == 0
+    clock[0] += 2
+    assert len(cache.get_many(keys)[1]) == 1
+    assert cache.stats()["expirations"] == 1
+
+
+def test_unloaded_model_version_is_invalidated():
+    cache = PredictionCache(max_entries=10)
+    keys_v1 = cache.keys(ROWS, "v1")
+    keys_v2 = cache.keys(ROWS, "v2")
+    assert keys_v1 != keys_v2
+    cache.put_many(keys_v1, [1.0] * 4)
+    cache.put_many(keys_v2, [2.0] * 4)
+
+    assert cache.invalidate("v1") == 4
+    assert cache.stats()["entries"] == 4 and cache.stats()["invalidations"] == 4
+    assert len(cache.get_many(keys_v1)[1]) == 4
+    np.testing.assert_array_equal(cache.get_many(keys_v2)[0], [2.0] * 4)
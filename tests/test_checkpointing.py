@@ -0,0 +1,76 @@
+import numpy as np
+import pytest
+import tensorflow as tf
+
+from training.checkpointing import STATE_FILE, TrainingCheckpoint
+from training.model import feed_forward_net
+
+
+@pytest.fixture
+def data():
+    rng = np.random.default_rng(0)
+    X = rng.uniform(0, 10, size=(256, 13)).astype(np.float32)
+    return X, X[:, :3].sum(axis=1)
+
+
+class StopAfterEpoch(tf.keras.callbacks.Callback):
+    def __init__(self, epoch):
+        super().__init__()
+        self.epoch = epoch
+
+    def on_epoch_end(self, epoch, logs=None):
+        if epoch + 1 == self.epoch:
+            raise RuntimeError("Preempted")
+
+
+def test_resume_restores_weights_optimizer_and_epoch(data, tmp_path):
+    X, y = data
+    model = feed_forward_net((13,))
+    with pytest.raises(RuntimeError, match="Preempted"):
+        model.fit(X, y, epochs=5, batch_size=32, verbose=0,
+                  callbacks=[TrainingCheckpoint(str(tmp_path)), StopAfterEpoch(3)])
+
+    resumed = feed_forward_net((13,))
+    initial_epoch = TrainingCheckpoint(str(tmp_path)).restore(resumed)
+
+    assert initial_epoch == 3
+    assert int(resumed.optimizer.iterations.numpy()) == int(model.optimizer.iterations.numpy()) == 3 * 8
+    for restored, saved in zip(resumed.optimizer.variables, model.optimizer.variables):
+        np.testing.assert_allclose(restored.numpy(), saved.numpy())
+    np.testing.assert_allclose(resumed.predict(X, verbose=0), model.predict(X, verbose=0), rtol=1e-6)
+
+    history = resumed.fit(X, y, epochs=5, batch_size=32, verbose=0, initial_epoch=initial_epoch)
+    assert len(history.history["loss"]) == 2
+
+
+def test_early_stopping_state_carries_over(data, tmp_path):
+    X, y = data
+    early_stopping = tf.keras.callbacks.EarlyStopping(patience=10, restore_best_weights=True)
+    model = feed_forward_net((13,))
+    model.fit(X, y, epochs=2, batch_size=32, validation_split=0.25, verbose=0,
+              callbacks=[early_stopping, TrainingCheckpoint(str(tmp_path), early_stopping=early_stopping)])
+
+    resumed_early_stopping = tf.keras.callbacks.EarlyStopping(patience=10, restore_best_weights=True)
+    checkpoint = TrainingCheckpoint(str(tmp_path), early_stopping=resumed_early_stopping)
+    resumed = feed_forward_net((13,))
+    checkpoint.restore(resumed)
+    resumed_early_stopping.set_model(resumed)
+    resumed_early_stopping.on_train_begin()
+    checkpoint.on_train_begin()
+
+    assert resumed_early_stopping.best == pytest.approx(early_stopping.best)
+    assert resumed_early_stopping.best_epoch == early_stopping.best_epoch
+    for restored, saved in zip(resumed_early_stopping.best_weights, early_stopping.best_weights):
+        np.testing.assert_array_equal(restored, saved)
+
+
+def test_only_the_newest_checkpoints_are_kept(data, tmp_path):
+    X, y = data
+    model = feed_forward_net((13,))
+    model.fit(X, y, epochs=6, batch_size=64, verbose=0,
+              callbacks=[TrainingCheckpoint(str(tmp_path), every_n_epochs=2, max_to_keep=2)])
+
+    assert sorted(path.name for path in tmp_path.iterdir()) == [
+        STATE_FILE, "epoch-00004.weights.h5", "epoch-00006.weights.h5"
+    ]
+    assert TrainingCheckpoint(str(tmp_path)).latest()["epoch"] == 6
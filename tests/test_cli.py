@@ -0,0 +1,53 @@
+import json
+import os
+import subprocess
+import sys
+
+from scripts.cli import COMMANDS, IMPORT_ENV, command_path, parse_importtime, summarize_imports
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+
+
+def test_command_modules_import_without_heavy_dependencies():
+    # Importing a command must not read config.yaml, or import the Google Cloud clients or TensorFlow
+    lazy = [name for name in COMMANDS if name not in ("train", "export", "serve")]
+    code = "import sys\n"
+    for name in lazy:
+        code += f"sys.path[:0] = {command_path(COMMANDS[name])!r}\nimport {COMMANDS[name].module}\n"
+    code += ("sys.path.insert(0, 'serving')\nimport predict\n"
+             "heavy = [m for m in ('yaml', 'tensorflow', 'kfp', 'google.cloud.aiplatform', 'google.cloud.storage')"
+             " if m in sys.modules]\nassert not heavy, heavy\n")
+    env = dict(os.environ, **IMPORT_ENV)
+    result = subprocess.run([sys.executable, "-c", code], cwd=ROOT, env=env, capture_output=True, text=True)
+    assert result.returncode == 0, result.stderr
+
+
+def test_cli_runs_the_command_with_the_remaining_arguments(tmp_path):
+    output = subprocess.run([sys.executable, "-m", "scripts.cli", "--help"], cwd=ROOT, capture_output=True,
+                            text=True, check=True).stdout
+    assert all(name in output for name in COMMANDS)
+
+    (tmp_path / "input.jsonl").write_text("[1.0, 2.0]\n[3.0, 4.0]\n")
+    subprocess.run([sys.executable, "-m", "scripts.cli", "payload", "--input_file", str(tmp_path / "input.jsonl"),
+                    "--output_file", str(tmp_path / "payload.json")], cwd=ROOT, check=True, capture_output=True)
+    assert json.loads((tmp_path / "payload.json").read_text()) == {"instances": [[1.0, 2.0], [3.0, 4.0]]}
+
+
+def test_import_profile_summary():
+    lines = [
+        "import time: self [us] | cumulative | imported package",
+        "import time:      1000 |       1000 |   numpy.core",
+        "import time:      4000 |       5000 | numpy",
+        "some other stderr line",
+        "import time:       500 |        500 |     fastapi.routing.models",
+        "import time:      2000 |       2500 |   fastapi.routing",
+        "import time:      3000 |       5500 | fastapi",
+    ]
+    imports = parse_importtime(lines)
+    assert imports[0] == ("numpy.core", 1000, 1000, 1)
+    assert imports[2] == ("fastapi.routing.models", 500, 500, 2)
+
+    summary = summarize_imports(imports, top=2)
+    assert summary["total_ms"] == 10.5
+    assert summary["packages"] == [("fastapi", 5.5), ("numpy", 5.0)]
+    assert summary["modules"] == [("numpy", 4.0, 5.0), ("fastapi", 3.0, 5.5)]
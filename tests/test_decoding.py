@@ -0,0 +1,97 @@
+import io
+import json
+
+import numpy as np
+import pytest
+
+from decoding import DecodeError, decode_instances
+
+ROWS = np.random.default_rng(0).uniform(0, 100, size=(5, 13)).round(4)
+
+
+def json_body(payload):
+    return json.dumps(payload).encode()
+
+
+def test_json_body():
+    instances = decode_instances(json_body({"instances": ROWS.tolist(), "parameters": {}}), "application/json", 13)
+    assert instances.dtype == np.float32 and instances.shape == (5, 13)
+    assert instances.flags.c_contiguous
+    np.testing.assert_allclose(instances, ROWS, rtol=1e-6)
+
+
+def test_single_flat_instance():
+    instances = decode_instances(json_body({"instances": ROWS[0].tolist()}), "application/json", 13)
+    assert instances.shape == (1, 13)
+
+
+def test_jsonlines_body():
+    body = "\n".join(json.dumps({"instances": row}) for row in ROWS.tolist()).encode()
+    instances = decode_instances(body, "application/jsonlines", 13)
+    np.testing.assert_allclose(instances, ROWS, rtol=1e-6)
+
+
+def test_jsonlines_body_with_several_instances_per_line():
+    body = b"\n".join(json_body({"instances": ROWS[i:i + 2].tolist()}) for i in range(0, 5, 2))
+    instances = decode_instances(body, "application/jsonlines", 13)
+    np.testing.assert_allclose(instances, ROWS, rtol=1e-6)
+
+
+def test_raw_float32_body():
+    body = ROWS.astype("<f4").tobytes()
+    instances = decode_instances(body, "application/octet-stream", 13)
+    np.testing.assert_array_equal(instances, ROWS.astype(np.float32))
+
+
+def test_npy_body():
+    buffer = io.BytesIO()
+    np.save(buffer, ROWS)
+    instances = decode_instances(buffer.getvalue(), "application/x-npy", 13)
+    assert instances.dtype == np.float32
+    np.testing.assert_allclose(instances, ROWS, rtol=1e-6)
+
+
+@pytest.mark.parametrize("payload", [
+    {"instances": [[1.0] * 12]},
+    {"instances": [[1.0] * 13, [1.0] * 14]},
+    {"instances": [["1.5"] * 13]},
+    {"instances": [[[1.0] * 13]]},
+    {"instances": []},
+    {"rows": [[1.0] * 13]},
+])
+def test_invalid_json_is_rejected(payload):
+    with pytest.raises(DecodeError):
+        decode_instances(json_body(payload), "application/json", 13)
+
+
+def test_invalid_binary_is_rejected():
+    with pytest.raises(DecodeError):
+        decode_instances(b"\x00" * 10, "application/octet-stream", 13)
+    with pytest.raises(DecodeError):
+        decode_instances(b"not an npy file", "application/x-npy", 13)
+
+
+def test_non_finite_values_are_rejected():
+    with pytest.raises(DecodeError, match="NaN"):
+        decode_instances(b'{"instances": [' + b"NaN, " * 12 + b"1]}", "application/json", 13)
+
+
+@pytest.mark.parametrize("payload", [
+    b"[[1,2],[3 4,]]", b"[[1,2],[3,,4]]", b"[[1,2],]", b"[[1, ,2]]",
+    b"[[+1,2]]", b"[[01,2]]", b"[[-01,2]]", b"[[1.,2]]", b"[[.5,2]]",
+    b"[[1e,2]]", b"[[1.5.5,2]]", b"[[1e5.3,2]]", b"[[1e5e3,2]]", b"[[--1,2]]", b"[[1-2,3]]",
+])
+def test_malformed_numeric_json_is_rejected(payload):
+    # These are not JSON, so they must surface as a 400 rather than be read leniently
+    with pytest.raises(DecodeError, match="Invalid JSON"):
+        decode_instances(b'{"instances": ' + payload + b"}", "application/json", 2)
+
+
+@pytest.mark.parametrize("payload, expected", [
+    (b"[[0,-0],[-1.5e-3,1E+10]]", [[0, 0], [-1.5e-3, 1e10]]),
+    (b"[[3e05,-105],[ 1, 2]]", [[3e5, -105], [1, 2]]),
+    (b"[\n  [1, 2],\n  [3, 4]\n]", [[1, 2], [3, 4]]),
+])
+def test_valid_numeric_json_edge_cases(payload, expected):
+    instances = decode_instances(b'{"instances": ' + payload + b"}", "application/json", 2)
+    np.testing.assert_allclose(instances, np.array(expected, dtype=np.float32))
@@ -0,0 +1,90 @@
+import json
+import os
+
+import numpy as np
+import pytest
+import tensorflow as tf
+
+from training.distributed import ThroughputMonitor, distributed_evaluate, distributed_fit, is_chief, launch_local_workers
+from training.model import adapt_normalizer, feed_forward_net
+from training.train import to_float32
+
+
+def make_data(rows=512):
+    rng = np.random.default_rng(0)
+    X = rng.uniform(0, 10, size=(rows, 13)).astype(np.float32)
+    return X, X[:, :3].sum(axis=1)
+
+
+def test_distributed_fit_drives_keras_callbacks():
+    X, y = make_data()
+    dataset = tf.data.Dataset.from_tensor_slices((X, y)).batch(64)
+    strategy = tf.distribute.get_strategy()
+    model = feed_forward_net((13,))
+    throughput = ThroughputMonitor(64)
+    early_stopping = tf.keras.callbacks.EarlyStopping(monitor="val_loss", patience=1)
+
+    history = distributed_fit(model, strategy, dataset, dataset, epochs=3, callbacks=[throughput, early_stopping])
+
+    assert set(history.history) == {"loss", "mae", "val_loss", "val_mae"}
+    assert len(throughput.history) == len(history.history["loss"]) > 0
+    assert all(samples_per_sec > 0 for samples_per_sec in throughput.history)
+    keras_mae = model.evaluate(X, y, verbose=0)[1]
+    assert np.isclose(distributed_evaluate(model, strategy, dataset), keras_mae, rtol=1e-4)
+
+
+@pytest.mark.parametrize("cluster, task, expected", [
+    ({}, {}, True),
+    ({"worker": ["a:1", "b:2"]}, {"type": "worker", "index": 0}, True),
+    ({"worker": ["a:1", "b:2"]}, {"type": "worker", "index": 1}, False),
+    ({"chief": ["c:0"], "worker": ["a:1", "b:2"]}, {"type": "chief", "index": 0}, True),
+    ({"chief": ["c:0"], "worker": ["a:1", "b:2"]}, {"type": "worker", "index": 0}, False),
+    ({"chief": ["c:0"], "worker": ["a:1", "b:2"]}, {"type": "worker", "index": 1}, False),
+])
+def test_is_chief(monkeypatch, cluster, task, expected):
+    monkeypatch.setenv("TF_CONFIG", json.dumps({"cluster": cluster, "task": task}))
+    assert is_chief() is expected
+
+
+def test_mixed_bfloat16_keeps_float32_output():
+    tf.keras.mixed_precision.set_global_policy("mixed_bfloat16")
+    try:
+        model = feed_forward_net((13,))
+        assert model.layers[0].compute_dtype == "bfloat16"
+        assert model.layers[0].kernel.dtype == "float32"
+        assert model(np.ones((2, 13), dtype=np.float32)).dtype == "float32"
+    finally:
+        tf.keras.mixed_precision.set_global_policy("float32")
+
+
+def test_float32_export_keeps_the_trained_architecture():
+    # A warm-started model need not match the --width/--depth defaults, so the float32 copy follows its config
+    X, y = make_data()
+    tf.keras.mixed_precision.set_global_policy("mixed_bfloat16")
+    try:
+        model = feed_forward_net((13,), width=16, depth=3, normalizer=adapt_normalizer([X]))
+        model.fit(X, y, epochs=1, batch_size=64, verbose=0)
+        float32_model = to_float32(model)
+    finally:
+        tf.keras.mixed_precision.set_global_policy("float32")
+
+    assert {layer.compute_dtype for layer in float32_model.layers} == {"float32"}
+    assert [layer.units for layer in float32_model.layers[1:]] == [16, 16, 16, 1]
+    np.testing.assert_allclose(float32_model.predict(X, verbose=0), model.predict(X, verbose=0), rtol=0.02, atol=0.1)
+
+
+def test_local_multi_worker_cluster_trains(tmp_path):
+    X, y = make_data()
+    np.savez(tmp_path / "data.npz", X_train=X, y_train=y, X_test=X[:64], y_test=y[:64])
+
+    exit_codes = launch_local_workers(2, [
+        "--model_dir", str(tmp_path / "model"), "--data_path", str(tmp_path / "data.npz"), "--epochs", "1",
+        "--batch_size", "64", "--checkpoint_every", "1", "--metrics_file", str(tmp_path / "metrics.json"),
+    ])
+
+    assert exit_codes == [0, 0]
+    with open(tmp_path / "metrics.json") as f:
+        metrics = json.load(f)
+    assert metrics["replicas"] == 2 and metrics["global_batch_size"] == 128
+    assert os.path.exists(tmp_path / "model" / "model.keras")
+    assert os.path.exists(tmp_path / "model" / "checkpoints" / "checkpoint.json")
@@ -0,0 +1,105 @@
+import json
+
+import numpy as np
+
+from training.evaluation import LogParser, evaluate_logs, list_log_files
+from training.storage import FilesystemBackend
+
+
+def write_log(path, X, predictions, labels=None):
+    with open(path, "w") as f:
+        for i, (instance, prediction) in enumerate(zip(X, predictions)):
+            record = {"instance": [round(float(v), 4) for v in instance], "prediction": float(prediction)}
+            if labels is not None:
+                record["label"] = float(labels[i])
+            f.write(json.dumps(record) + "\n")
+
+
+def test_records_are_parsed_into_columns():
+    rng = np.random.default_rng(0)
+    X = np.round(rng.normal(size=(50, 3)) * 100, 4)
+    predictions, labels = rng.normal(size=50), rng.normal(size=50)
+    lines = [json.dumps({"instance": list(x), "prediction": p, "label": l}) for x, p, l in zip(X, predictions, labels)]
+    # A null label, a missing one, a reordered record and a list-valued prediction are all valid records
+    lines[3] = json.dumps({"instance": list(X[3]), "prediction": predictions[3], "label": None})
+    lines[7] = json.dumps({"prediction": predictions[7], "instance": list(X[7])})
+    lines[9] = json.dumps({"instance": list(X[9]), "prediction": [predictions[9]], "label": labels[9]})
+    parser = LogParser(3)
+
+    instances, parsed_predictions, parsed_labels = parser.parse("\n".join(lines).encode())
+    np.testing.assert_allclose(instances, X)
+    np.testing.assert_allclose(parsed_predictions, predictions)
+    assert np.isnan(parsed_labels[[3, 7]]).all()
+    np.testing.assert_allclose(np.delete(parsed_labels, [3, 7]), np.delete(labels, [3, 7]))
+    assert parser.bad_lines == 0
+
+
+def test_malformed_lines_are_counted_as_bad():
+    good = [b'{"instance": [1.5, -2, 3e-2], "prediction": 0.5, "label": 1}'] * 3
+    bad = [
+        b'{"instance": [1, 2 3], "prediction": 0.5, "label": 1}',
+        b'{"instance": [1, 2, 3], "prediction": +1, "label": 1}',
+        b'{"instance": [1, 2, 3], "prediction": 1.5.5, "label": 1}',
+        b'{"instance": [1, 2, 3], "prediction": 1e, "label": 1}',
+        b'{"instance": [01, 2, 3], "prediction": 1, "label": 1}',
+        b'{"instance": [1, , 3], "prediction": 1, "label": 1}',
+        b'{"instance": [1, 2], "prediction": 1, "label": 1}',
+        b'{"instance": [1, 2, 3], "label": 1}',
+        b'{"instance": [1, 2, 3], "prediction": 1} {"instance": [1, 2, 3], "prediction": 1}',
+        b'{"instance": [1, "x", 3], "prediction": 1}',
+        b'[1, 2, 3]',
+    ]
+    for line in bad:
+        parser = LogParser(3)
+        # Neither silently misparsed nor an exception for the whole block
+        instances, predictions, labels = parser.parse(b"\n".join(good + [line]))
+        np.testing.assert_allclose(instances, [[1.5, -2, 0.03]] * 3)
+        np.testing.assert_allclose(predictions, [0.5] * 3)
+        assert parser.bad_lines == 1
+
+
+def test_error_metrics_match_numpy(tmp_path):
+    rng = np.random.default_rng(1)
+    X_train = rng.uniform(0, 10, size=(5000, 4))
+    y_train = X_train.sum(axis=1)
+    X = rng.uniform(0, 10, size=(3000, 4))
+    labels = X.sum(axis=1)
+    predictions = labels + rng.normal(scale=0.5, size=3000)
+    write_log(tmp_path / "a.jsonl", X[:1000], predictions[:1000], labels[:1000])
+    write_log(tmp_path / "b.jsonl", X[1000:], predictions[1000:], labels[1000:])
+
+    # Small blocks, so the statistics are accumulated over many of them
+    report = evaluate_logs(list_log_files([str(tmp_path / "*.jsonl")]), X_train, y_train, block_size=20_000)
+    assert report["rows"] == 3000
+    errors = predictions - labels
+    assert report["error"]["mae"] == round(float(np.abs(errors).mean()), 6)
+    assert report["error"]["rmse"] == round(float(np.sqrt((errors ** 2).mean())), 6)
+
+    deciles = report["error"]["per_decile"]
+    assert len(deciles) == 10 and sum(d["rows"] for d in deciles) == 3000
+    low, high = deciles[4]["label_range"]
+    in_decile = (labels >= low) & (labels < high)
+    assert deciles[4]["rows"] == in_decile.sum()
+    assert np.isclose(deciles[4]["mae"], np.abs(errors[in_decile]).mean(), atol=1e-6)
+    assert report["drifted"] == []
+    assert all(stats["psi"] < 0.05 and stats["ks"] < 0.05 for stats in report["drift"].values())
+
+
+def test_shifted_features_are_reported_as_drifted(tmp_path, monkeypatch):
+    backend = FilesystemBackend(str(tmp_path / "gcs"))
+    monkeypatch.setattr("storage._backend", backend)
+    rng = np.random.default_rng(2)
+    X_train = rng.normal(size=(5000, 3))
+    y_train = X_train.sum(axis=1)
+    X = rng.normal(size=(2000, 3))
+    X[:, 1] += 1.0
+    write_log(tmp_path / "log.jsonl", X, X.sum(axis=1))
+    backend.write("gs://bucket/logs/predictions-00000.jsonl", (tmp_path / "log.jsonl").read_bytes())
+
+    log_files = list_log_files(["gs://bucket/logs/predictions-*.jsonl"])
+    report = evaluate_logs(log_files, X_train, y_train, feature_names=["a", "b", "c"])
+    assert report["rows"] == 2000
+    assert report["drifted"] == ["b", "prediction"]
+    assert report["drift"]["b"]["ks"] > 0.3 and report["drift"]["a"]["ks"] < 0.1
+    # Without labels there is nothing to score
+    assert report["error"]["rows"] == 0 and report["error"]["mae"] is None
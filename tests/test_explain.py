@@ -0,0 +1,115 @@
+import numpy as np
+import pytest
+import tensorflow as tf
+from fastapi.testclient import TestClient
+
+import predict
+from backends import KerasPredictor, NumpyFeedForward, load_predictor
+from explain import FINITE_DIFFERENCE_STEP, ExplainError, explain, finite_difference_gradients
+from training.export import export_numpy_weights, export_saved_model
+from training.model import feed_forward_net
+
+INSTANCE = [18.0846, 0.0, 18.1, 0.0, 0.679, 6.434, 100.0, 1.8347, 24.0, 666.0, 20.2, 27.25, 29.05]
+
+
+@pytest.fixture(scope="module")
+def model_dir(tmp_path_factory):
+    model_dir = tmp_path_factory.mktemp("explain_model")
+    tf.keras.utils.set_random_seed(0)
+    rng = np.random.default_rng(0)
+    X = rng.uniform(0, 100, size=(256, 13)).astype(np.float32)
+    model = feed_forward_net(input_shape=(13,))
+    model.fit(X, X[:, :3].sum(axis=1), epochs=2, batch_size=32, verbose=0)
+    model.save(model_dir / "model.keras")
+    export_numpy_weights(model, model_dir / "model_weights.npz")
+    export_saved_model(model, str(model_dir / "saved_model"))
+    return model_dir
+
+
+@pytest.fixture
+def instances():
+    return np.random.default_rng(1).uniform(0, 100, size=(20, 13)).astype(np.float32)
+
+
+def test_backend_gradients_agree(model_dir, instances):
+    numpy_predictions, numpy_gradients = NumpyFeedForward.from_npz(model_dir / "model_weights.npz").gradients(instances)
+    keras_predictions, keras_gradients = KerasPredictor(str(model_dir / "model.keras")).gradients(instances)
+    saved_predictions, saved_gradients = load_predictor(str(model_dir), backend="savedmodel").gradients(instances)
+
+    np.testing.assert_allclose(numpy_predictions, keras_predictions, rtol=1e-4, atol=1e-3)
+    np.testing.assert_allclose(numpy_gradients, keras_gradients, rtol=1e-4, atol=1e-5)
+    np.testing.assert_allclose(saved_gradients, keras_gradients, rtol=1e-4, atol=1e-5)
+    np.testing.assert_allclose(saved_predictions, keras_predictions, rtol=1e-4, atol=1e-3)
+
+
+def test_finite_differences_match_analytic_gradients(model_dir, instances):
+    predictor = NumpyFeedForward.from_npz(model_dir / "model_weights.npz")
+    instances = instances.astype(np.float64)
+    predictions, gradients = finite_difference_gradients(predictor.predict, instances)
+    expected_predictions, start_gradients = predictor.gradients(instances)
+    # The network is piecewise linear, so a forward difference is the mean slope over its step: the gradient
+    # at either end, or between the two where the step crosses a ReLU kink
+    steps = FINITE_DIFFERENCE_STEP * np.maximum(np.abs(instances), 1.0)
+    end_gradients = np.empty_like(gradients)
+    for feature in range(instances.shape[1]):
+        nudged = instances.copy()
+        nudged[:, feature] += steps[:, feature]
+        end_gradients[:, feature] = predictor.gradients(nudged)[1][:, feature]
+    # The backend predicts in float32, and its rounding error is divided by the step
+    tolerance = 8 * np.finfo(np.float32).eps * np.abs(expected_predictions)[:, None] / steps
+
+    np.testing.assert_allclose(predictions, expected_predictions, rtol=1e-5)
+    assert (gradients >= np.minimum(start_gradients, end_gradients) - tolerance).all()
+    assert (gradients <= np.maximum(start_gradients, end_gradients) + tolerance).all()
+
+
+@pytest.mark.parametrize("method", ["integrated_gradients", "gradient_x_input"])
+def test_attributions_are_batched_per_instance(model_dir, instances, method):
+    predictor = NumpyFeedForward.from_npz(model_dir / "model_weights.npz")
+    result = explain(predictor, instances, method=method, steps=32)
+    # Chunking the batch and explaining one instance at a time give the same attributions
+    chunked = explain(predictor, instances, method=method, steps=32, max_rows=7)
+    single = explain(predictor, instances[3:4], method=method, steps=32)
+
+    assert result["attributions"].shape == (20, 13)
+    np.testing.assert_allclose(result["predictions"], predictor.predict(instances), rtol=1e-5)
+    np.testing.assert_allclose(chunked["attributions"], result["attributions"], rtol=1e-5, atol=1e-6)
+    np.testing.assert_allclose(single["attributions"][0], result["attributions"][3], rtol=1e-5, atol=1e-6)
+
+
+def test_integrated_gradients_add_up_to_the_prediction_difference(model_dir, instances):
+    predictor = NumpyFeedForward.from_npz(model_dir / "model_weights.npz")
+    baseline = instances.mean(axis=0)
+    result = explain(predictor, instances, steps=256, baseline=baseline.tolist())
+    difference = result["predictions"] - result["baseline_predictions"]
+
+    np.testing.assert_allclose(result["baseline_predictions"], predictor.predict(baseline[None])[0], rtol=1e-5)
+    np.testing.assert_allclose(result["attributions"].sum(axis=1), difference,
+                               atol=0.01 * np.abs(difference).max())
+
+
+def test_invalid_explain_parameters(model_dir, instances):
+    predictor = NumpyFeedForward.from_npz(model_dir / "model_weights.npz")
+    with pytest.raises(ExplainError, match="Unknown explain method"):
+        explain(predictor, instances, method="shap")
+    with pytest.raises(ExplainError, match="baseline"):
+        explain(predictor, instances, baseline=[0.0] * 5)
+
+
+def test_explain_route():
+    with TestClient(predict.app) as client:
+        response = client.post("/explain", json={"instances": [INSTANCE, INSTANCE], "parameters": {"steps": 16}})
+        predictions = client.post("/predict", json={"instances": [INSTANCE]}).json()["predictions"]
+        bad_method = client.post("/explain", json={"instances": [INSTANCE], "parameters": {"method": "shap"}})
+        bad_steps = client.post("/explain", json={"instances": [INSTANCE], "parameters": {"steps": 0}})
+        bad_instance = client.post("/explain", json={"instances": [INSTANCE[:5]]})
+        metrics = client.get("/metrics").text
+
+    assert response.status_code == 200
+    body = response.json()
+    assert np.array(body["attributions"]).shape == (2, 13)
+    assert body["method"] == "integrated_gradients" and body["steps"] == 16
+    assert body["feature_names"][-1] == "LSTAT"
+    assert body["predictions"][0] == pytest.approx(predictions[0], rel=1e-4)
+    assert [bad_method.status_code, bad_steps.status_code, bad_instance.status_code] == [400, 400, 400]
+    assert 'explain_requests_total{status="ok"}' in metrics
@@ -0,0 +1,54 @@
+import os
+import subprocess
+import sys
+
+import numpy as np
+
+from training.incremental import REPLAY_FILE, ReplaySample
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+
+
+def test_replay_sample_is_bounded_and_uniform():
+    counts = np.zeros(1000)
+    for seed in range(200):
+        sample = ReplaySample.empty(1, capacity=100)
+        rng = np.random.default_rng(seed)
+        for start in range(0, 1000, 250):
+            rows = np.arange(start, start + 250, dtype=np.float32)
+            sample.add(rows[:, None], rows, rng)
+        assert len(sample) == 100 and sample.seen == 1000
+        assert len(np.unique(sample.y)) == 100
+        np.testing.assert_array_equal(sample.X[:, 0], sample.y)
+        counts[sample.y.astype(int)] += 1
+
+    # Every row is kept with probability 100 / 1000; early and late rows alike
+    assert abs(counts[:500].mean() - 20) < 2 and abs(counts[500:].mean() - 20) < 2
+
+
+def test_incremental_run_warm_starts_from_the_previous_model(tmp_path):
+    rng = np.random.default_rng(0)
+
+    def write(path, rows):
+        X = rng.uniform(0, 10, size=(rows, 13)).astype(np.float32)
+        y = X[:, :3].sum(axis=1)
+        np.savez(path, X_train=X, y_train=y, X_test=X[:20], y_test=y[:20])
+
+    write(tmp_path / "base.npz", 300)
+    write(tmp_path / "day-1.npz", 100)
+    write(tmp_path / "day-2.npz", 50)
+    model_dir = tmp_path / "model"
+    common = ["--model_dir", str(model_dir), "--epochs", "1", "--checkpoint_every", "0",
+              "--export_formats", "numpy", "--replay_size", "200"]
+    train = [sys.executable, os.path.join(ROOT, "training", "train.py")]
+
+    subprocess.run([*train, "--data_path", str(tmp_path / "base.npz"), *common], check=True)
+    with np.load(model_dir / REPLAY_FILE) as replay:
+        assert replay["X"].shape == (200, 13) and int(replay["seen"]) == 300
+    modified = os.path.getmtime(model_dir / "model.keras")
+
+    subprocess.run([*train, "--training_mode", "incremental", "--new_data_path", str(tmp_path / "day-*.npz"),
+                    *common], check=True)
+    with np.load(model_dir / REPLAY_FILE) as replay:
+        assert replay["X"].shape == (200, 13) and int(replay["seen"]) == 450
+    assert os.path.getmtime(model_dir / "model.keras") > modified
@@ -0,0 +1,61 @@
+import numpy as np
+import pytest
+
+from training.input_pipeline import InputStallMonitor, count_rows, make_dataset, write_tfrecord_shards
+from training.model import feed_forward_net
+
+
+@pytest.fixture
+def npz_shards(tmp_path):
+    rng = np.random.default_rng(0)
+    paths = []
+    for shard in range(3):
+        X = rng.uniform(0, 100, size=(100 + shard, 13)).astype(np.float32)
+        np.savez(tmp_path / f"part-{shard}.npz", X_train=X, y_train=X[:, 0], X_test=X[:10], y_test=X[:10, 0])
+        paths.append(str(tmp_path / f"part-{shard}.npz"))
+    return paths
+
+
+def collect(dataset):
+    batches = list(dataset.as_numpy_iterator())
+    return np.concatenate([X for X, _ in batches]), np.concatenate([y for _, y in batches])
+
+
+def test_npz_shards_yield_every_row_once(npz_shards):
+    dataset = make_dataset(npz_shards, batch_size=32, shuffle_buffer=64, cache=True, seed=0)
+    assert dataset.cardinality().numpy() == int(np.ceil(303 / 32))
+
+    for _ in range(2):
+        X, y = collect(dataset)
+        assert X.shape == (303, 13)
+        np.testing.assert_array_equal(y, X[:, 0])
+
+    X_test, _ = collect(make_dataset(npz_shards, batch_size=32, split="test"))
+    assert X_test.shape == (30, 13)
+
+
+def test_tfrecord_shards_round_trip(tmp_path):
+    X = np.random.default_rng(1).uniform(0, 100, size=(50, 13)).astype(np.float32)
+    paths = write_tfrecord_shards(X, X[:, 1], str(tmp_path / "train"), num_shards=2)
+    assert count_rows(paths) == 50
+
+    X_read, y_read = collect(make_dataset(paths, batch_size=16))
+    order = np.argsort(y_read)
+    np.testing.assert_allclose(X_read[order], X[np.argsort(X[:, 1])])
+
+
+def test_mixed_shard_types_are_rejected(npz_shards):
+    with pytest.raises(ValueError, match="all be .npz or all be .tfrecord"):
+        make_dataset(npz_shards + ["train.tfrecord"])
+
+
+def test_stall_monitor_records_every_epoch(npz_shards):
+    monitor = InputStallMonitor()
+    dataset = make_dataset(npz_shards, batch_size=32, stall_monitor=monitor)
+    model = feed_forward_net(input_shape=(13,))
+    history = model.fit(dataset, epochs=3, callbacks=[monitor], verbose=0)
+
+    assert [entry["epoch"] for entry in monitor.history] == [1, 2, 3]
+    for entry in monitor.history:
+        assert 0.0 <= entry["stall_seconds"] <= entry["epoch_seconds"]
+    assert len(history.history["input_stall_seconds"]) == 3
@@ -0,0 +1,66 @@
+import asyncio
+import json
+
+import httpx
+import numpy as np
+import pytest
+
+from scripts.load_test import encode_bodies, read_rows, run_load_test, synthetic_rows
+
+
+def fake_server(fail_every=0):
+    requests = []
+
+    async def handler(request):
+        requests.append(request)
+        if fail_every and len(requests) % fail_every == 0:
+            return httpx.Response(500)
+        instances = np.asarray(json.loads(request.content)["instances"])
+        return httpx.Response(200, json={"predictions": [0.0] * len(instances)})
+
+    return httpx.MockTransport(handler), requests
+
+
+def test_read_rows_accepts_flat_and_nested_instances(tmp_path):
+    path = tmp_path / "input.jsonl"
+    path.write_text(json.dumps({"instances": list(range(13))}) + "\n\n" +
+                    json.dumps({"instances": [list(range(13)), list(range(13))]}) + "\n")
+
+    assert read_rows(str(path)).shape == (3, 13)
+
+
+def test_bodies_cycle_through_the_rows():
+    rows = synthetic_rows(5)
+    bodies = encode_bodies(rows, batch_size=2, encoding="json")
+
+    assert [len(json.loads(body)["instances"]) for body in bodies] == [2, 2, 2]
+    np.testing.assert_allclose(json.loads(bodies[2])["instances"][1], rows[0], rtol=1e-6)
+    assert len(encode_bodies(rows, batch_size=2, encoding="octet-stream")[0]) == 2 * 13 * 4
+
+
+def test_closed_loop_counts_requests_and_errors():
+    transport, requests = fake_server(fail_every=4)
+    report = asyncio.run(run_load_test("http://test/predict", synthetic_rows(100), batch_size=8, concurrency=4,
+                                       num_requests=100, warmup_requests=0, transport=transport))
+
+    assert len(requests) == 100
+    assert report["requests"] == 100 and report["errors"] == 25
+    assert report["error_rate"] == pytest.approx(0.25)
+    assert report["errors_by_type"] == {"http_500": 25}
+    assert report["rows_per_sec"] == pytest.approx(report["throughput_rps"] * 8, rel=0.01)
+    assert report["latency_ms"]["p50"] <= report["latency_ms"]["p95"] <= report["latency_ms"]["p99"]
+
+
+def test_open_loop_holds_the_target_rate():
+    transport, requests = fake_server()
+    report = asyncio.run(run_load_test("http://test/predict", synthetic_rows(100), rps=200, duration=0.5,
+                                       warmup_requests=2, transport=transport))
+
+    assert report["mode"] == "rps" and report["errors"] == 0
+    assert report["requests"] == 100
+    assert report["throughput_rps"] == pytest.approx(200, rel=0.1)
+
+
+def test_load_model_must_be_chosen():
+    with pytest.raises(ValueError, match="exactly one"):
+        asyncio.run(run_load_test("http://test/predict", synthetic_rows(1), num_requests=1))
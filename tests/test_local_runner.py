@@ -0,0 +1,75 @@
+import os
+import subprocess
+import sys
+
+import pytest
+
+from pipelines.local_runner import STEP_FILE, Step, run_pipeline
+from pipelines.local_steps import deploy_model
+
+
+def write_step(name, source, inputs=(), cache=True):
+    # Writes the contents of `source` plus the upstream outputs into <output>/out.txt
+    script = ("import sys; parts = [open(sys.argv[2]).read()] + [open(p + '/out.txt').read() for p in sys.argv[3:]]; "
+              "open(sys.argv[1] + '/out.txt', 'w').write('+'.join(parts))")
+    return Step(name, lambda inp, out: [sys.executable, "-c", script, out, source, *(inp[i] for i in inputs)],
+                inputs=inputs, files=[source], cache=cache)
+
+
+@pytest.fixture
+def graph(tmp_path):
+    (tmp_path / "a.txt").write_text("a")
+    (tmp_path / "b.txt").write_text("b")
+    steps = [write_step("first", str(tmp_path / "a.txt")),
+             write_step("second", str(tmp_path / "b.txt"), inputs=["first"])]
+    return steps, tmp_path
+
+
+def test_unchanged_steps_are_skipped(graph):
+    steps, tmp_path = graph
+    first = run_pipeline(steps, tmp_path / "cache")
+    second = run_pipeline(list(reversed(steps)), tmp_path / "cache")
+
+    assert not any(result["cached"] for result in first.values())
+    assert all(result["cached"] for result in second.values())
+    assert open(os.path.join(second["second"]["output_dir"], "out.txt")).read() == "b+a"
+
+
+def test_changed_file_reruns_the_step_and_its_consumers(graph):
+    steps, tmp_path = graph
+    before = run_pipeline(steps, tmp_path / "cache")
+    (tmp_path / "a.txt").write_text("changed")
+    after = run_pipeline(steps, tmp_path / "cache")
+
+    assert not after["first"]["cached"] and not after["second"]["cached"]
+    assert after["second"]["key"] != before["second"]["key"]
+    assert open(os.path.join(after["second"]["output_dir"], "out.txt")).read() == "b+changed"
+
+
+def test_failed_step_leaves_no_cache_entry(tmp_path):
+    failing = Step("broken", lambda inp, out: [sys.executable, "-c", "raise SystemExit(1)"])
+    with pytest.raises(subprocess.CalledProcessError):
+        run_pipeline([failing], tmp_path / "cache")
+
+    assert not list((tmp_path / "cache" / "broken").glob(f"*/{STEP_FILE}"))
+
+
+def test_uncached_steps_always_run(graph):
+    steps, tmp_path = graph
+    steps[1].cache = False
+    run_pipeline(steps, tmp_path / "cache")
+
+    assert not run_pipeline(steps, tmp_path / "cache")["second"]["cached"]
+
+
+def test_deploy_replaces_the_served_model(tmp_path):
+    model_dir, deploy_dir = tmp_path / "model", tmp_path / "deployed"
+    (model_dir / "checkpoints").mkdir(parents=True)
+    (model_dir / "model.keras").write_text("v1")
+    (model_dir / STEP_FILE).write_text("{}")
+    deploy_model(str(model_dir), str(deploy_dir))
+    (model_dir / "model.keras").write_text("v2")
+    deploy_model(str(model_dir), str(deploy_dir))
+
+    assert (deploy_dir / "model.keras").read_text() == "v2"
+    assert sorted(path.name for path in deploy_dir.iterdir()) == ["deployment.json", "model.keras"]
@@ -0,0 +1,35 @@
+from metrics import Registry
+
+
+def test_histogram_renders_cumulative_buckets():
+    registry = Registry()
+    histogram = registry.histogram("latency_seconds", "Latency.", buckets=(0.1, 1.0), stage="decode")
+    for value in (0.05, 0.5, 0.5, 5.0):
+        histogram.observe(value)
+
+    lines = registry.render().splitlines()
+    assert "# TYPE latency_seconds histogram" in lines
+    assert 'latency_seconds_bucket{stage="decode",le="0.1"} 1' in lines
+    assert 'latency_seconds_bucket{stage="decode",le="1.0"} 3' in lines
+    assert 'latency_seconds_bucket{stage="decode",le="+Inf"} 4' in lines
+    assert 'latency_seconds_count{stage="decode"} 4' in lines
+
+
+def test_series_with_the_same_name_share_one_family():
+    registry = Registry()
+    registry.counter("requests_total", "Requests.", status="ok").inc()
+    registry.counter("requests_total", "Requests.", status="error").inc(2)
+    registry.counter("requests_total", "Requests.", status="ok").inc()
+
+    body = registry.render()
+    assert body.count("# TYPE requests_total counter") == 1
+    assert 'requests_total{status="ok"} 2.0' in body
+    assert 'requests_total{status="error"} 2.0' in body
+
+
+def test_gauge_reads_function_at_scrape_time():
+    registry = Registry()
+    value = [1]
+    registry.gauge("queue_depth", "Depth.", fn=lambda: value[0])
+    value[0] = 7
+    assert "queue_depth 7" in registry.render()
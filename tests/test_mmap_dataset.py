@@ -0,0 +1,52 @@
+import json
+
+import numpy as np
+import pytest
+
+from training.input_pipeline import make_array_dataset
+from training.mmap_dataset import MANIFEST_FILE, is_mmap_dataset, open_mmap_dataset, write_mmap_dataset
+
+
+@pytest.fixture
+def splits():
+    rng = np.random.default_rng(0)
+    X = rng.uniform(0, 100, size=(120, 13)).astype(np.float32)
+    y = X[:, 0] * 2
+    return {"train": (X[:100], y[:100]), "test": (X[100:], y[100:])}
+
+
+def test_round_trip_is_memory_mapped(splits, tmp_path):
+    write_mmap_dataset(tmp_path, splits)
+    assert is_mmap_dataset(tmp_path)
+
+    opened = open_mmap_dataset(tmp_path)
+    assert set(opened) == {"train", "test"}
+    for name, (X, y) in splits.items():
+        assert isinstance(opened[name][0], np.memmap)
+        np.testing.assert_array_equal(opened[name][0], X)
+        np.testing.assert_array_equal(opened[name][1], y)
+
+
+def test_manifest_mismatch_is_rejected(splits, tmp_path):
+    write_mmap_dataset(tmp_path, splits)
+    manifest = json.loads((tmp_path / MANIFEST_FILE).read_text())
+    manifest["arrays"]["X"]["shape"] = [999, 13]
+    (tmp_path / MANIFEST_FILE).write_text(json.dumps(manifest))
+
+    with pytest.raises(ValueError, match="manifest expects"):
+        open_mmap_dataset(tmp_path)
+
+
+def test_array_dataset_yields_every_row_once(splits, tmp_path):
+    write_mmap_dataset(tmp_path, splits)
+    X, y = open_mmap_dataset(tmp_path)["train"]
+
+    dataset = make_array_dataset(X, y, batch_size=32, shuffle=True, seed=0)
+    assert dataset.cardinality().numpy() == 4
+    batches = list(dataset.as_numpy_iterator())
+    X_read = np.concatenate([X_batch for X_batch, _ in batches])
+    y_read = np.concatenate([y_batch for _, y_batch in batches])
+
+    order = np.argsort(X_read[:, 0])
+    np.testing.assert_array_equal(X_read[order], X[np.argsort(X[:, 0])])
+    np.testing.assert_array_equal(y_read, X_read[:, 0] * 2)
@@ -0,0 +1,37 @@
+import numpy as np
+import pytest
+
+from backends import KerasPredictor, NumpyFeedForward, NUMPY_ATOL, NUMPY_RTOL
+from training.export import export_numpy_weights
+from training.model import adapt_normalizer, feed_forward_net
+
+
+@pytest.fixture
+def raw_features():
+    # Features on very different scales, like the Boston Housing columns
+    rng = np.random.default_rng(0)
+    return np.column_stack([rng.uniform(0, 1, 2000), rng.uniform(200, 700, 2000),
+                            rng.uniform(0, 100, (2000, 11))]).astype(np.float32)
+
+
+def test_streaming_adapt_matches_full_statistics(raw_features):
+    normalizer = adapt_normalizer(raw_features[i:i + 300] for i in range(0, len(raw_features), 300))
+
+    np.testing.assert_allclose(np.asarray(normalizer.mean).reshape(-1), raw_features.mean(axis=0), rtol=1e-5)
+    np.testing.assert_allclose(np.asarray(normalizer.variance).reshape(-1), raw_features.var(axis=0), rtol=1e-4)
+
+
+def test_saved_model_carries_its_normalization(raw_features, tmp_path):
+    model = feed_forward_net((13,), normalizer=adapt_normalizer([raw_features]))
+    model.fit(raw_features, raw_features[:, 1] / 100, epochs=1, batch_size=64, verbose=0)
+    model.save(tmp_path / "model.keras")
+    export_numpy_weights(model, tmp_path / "model_weights.npz")
+
+    expected = model(raw_features, training=False).numpy().reshape(-1)
+    keras_predictions = KerasPredictor(str(tmp_path / "model.keras")).predict(raw_features)
+    numpy_backend = NumpyFeedForward.from_npz(tmp_path / "model_weights.npz")
+
+    np.testing.assert_allclose(keras_predictions, expected, rtol=1e-5, atol=1e-5)
+    # The normalization is folded into the first kernel, so the NumPy backend has only the Dense layers
+    assert len(numpy_backend.kernels) == 3
+    np.testing.assert_allclose(numpy_backend.predict(raw_features), expected, rtol=NUMPY_RTOL, atol=NUMPY_ATOL)
@@ -0,0 +1,41 @@
+import numpy as np
+import pytest
+
+from training.model import feed_forward_net
+from training.optimize import VARIANTS, build_variants, compare_variants, kernel_sparsity, prune_model
+
+
+@pytest.fixture(scope="module")
+def data():
+    rng = np.random.default_rng(0)
+    X = rng.uniform(0, 10, size=(1024, 13)).astype(np.float32)
+    return X, X[:, :3].sum(axis=1)
+
+
+def test_pruning_reaches_the_target_sparsity(data):
+    X, y = data
+    model = feed_forward_net((13,))
+    model.fit(X, y, epochs=2, batch_size=64, verbose=0)
+
+    prune_model(model, X, y, target_sparsity=0.75, epochs=3, batch_size=64)
+
+    assert kernel_sparsity(model) == pytest.approx(0.75, abs=0.01)
+
+
+def test_variants_are_compared_against_the_keras_model(data, tmp_path):
+    X, y = data
+    model = feed_forward_net((13,))
+    model.fit(X, y, epochs=3, batch_size=64, verbose=0)
+    model.save(tmp_path / "model.keras")
+    baseline_mae = float(np.mean(np.abs(model.predict(X, verbose=0).reshape(-1) - y)))
+
+    paths = build_variants(str(tmp_path / "model.keras"), str(tmp_path / "optimized"), X, y, prune_epochs=3)
+    report = compare_variants(paths, X, y, baseline_mae, repeats=5, mae_budget=0.05)
+
+    rows = {row["variant"]: row for row in report["variants"]}
+    assert list(rows) == VARIANTS
+    assert abs(rows["float32"]["mae_delta"]) < 1e-3
+    assert abs(rows["float16"]["mae_delta"]) < 0.05
+    assert rows["int8_dynamic"]["size_bytes"] < rows["float32"]["size_bytes"]
+    assert rows["pruned"]["gzip_bytes"] < rows["float32"]["gzip_bytes"]
+    assert rows[report["recommended"]]["mae_delta"] <= 0.05
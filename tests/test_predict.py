@@ -0,0 +1,133 @@
+import shutil
+
+import numpy as np
+import pytest
+from fastapi.testclient import TestClient
+
+import predict
+
+INSTANCE = [18.0846, 0.0, 18.1, 0.0, 0.679, 6.434, 100.0, 1.8347, 24.0, 666.0, 20.2, 27.25, 29.05]
+
+
+@pytest.fixture
+def client():
+    with TestClient(predict.app) as client:
+        yield client
+
+
+def test_health(client):
+    assert client.get("/health").status_code == 200
+
+
+def test_predict_returns_one_prediction_per_instance(client):
+    response = client.post("/predict", json={"instances": [INSTANCE, INSTANCE, INSTANCE]})
+    assert response.status_code == 200
+    predictions = response.json()["predictions"]
+    assert len(predictions) == 3
+    assert predictions[0] == pytest.approx(predictions[1])
+
+
+def test_predict_accepts_single_flat_instance(client):
+    response = client.post("/predict", json={"instances": INSTANCE})
+    assert response.status_code == 200
+    assert len(response.json()["predictions"]) == 1
+
+
+def test_predict_rejects_wrong_feature_count(client):
+    response = client.post("/predict", json={"instances": [INSTANCE[:5]]})
+    assert response.status_code == 400
+
+
+def test_predict_accepts_raw_float32_body(client):
+    json_response = client.post("/predict", json={"instances": [INSTANCE]})
+    body = np.array([INSTANCE], dtype="<f4").tobytes()
+    raw_response = client.post("/predict", content=body, headers={"Content-Type": "application/octet-stream"})
+
+    assert raw_response.status_code == 200
+    assert raw_response.json()["predictions"] == pytest.approx(json_response.json()["predictions"])
+
+
+def test_repeated_instances_are_served_from_cache(client):
+    before = client.get("/cache/stats").json()
+    first = client.post("/predict", json={"instances": [INSTANCE]}).json()["predictions"]
+    second = client.post("/predict", json={"instances": [INSTANCE]}).json()["predictions"]
+    after = client.get("/cache/stats").json()
+
+    assert first == pytest.approx(second)
+    assert after["hits"] - before["hits"] >= 1
+
+
+def test_metrics_expose_stage_latencies(client):
+    client.post("/predict", json={"instances": [INSTANCE]})
+    body = client.get("/metrics").text
+
+    for stage in ("decode", "queue_wait", "inference", "encode"):
+        assert f'predict_stage_latency_seconds_count{{stage="{stage}"}}' in body
+    assert 'predict_requests_total{status="ok"}' in body
+    assert "predict_batch_size_bucket" in body
+    assert "process_resident_memory_bytes" in body
+    assert "model_ready 1" in body
+
+
+def test_health_is_unavailable_before_model_is_loaded():
+    # Without entering the client context the lifespan, and so the model load, never runs
+    assert TestClient(predict.app).get("/health").status_code == 503
+
+
+@pytest.fixture
+def versioned_model_dir(tmp_path, monkeypatch):
+    # Two versions whose single-layer models predict the constants 1 and 2
+    for name, value in (("1", 1.0), ("2", 2.0)):
+        write_constant_model(tmp_path / name, value)
+    monkeypatch.setattr(predict, "MODEL_DIR", str(tmp_path))
+    return tmp_path
+
+
+def write_constant_model(path, value):
+    path.mkdir()
+    np.savez(path / "model_weights.npz", num_layers=1, activations=np.array(["linear"]),
+             probe_inputs=np.zeros((1, 13), np.float32), probe_outputs=np.array([value], np.float32),
+             kernel_0=np.zeros((13, 1), np.float32), bias_0=np.array([value], np.float32))
+
+
+def test_versions_are_routed_by_header_and_traffic_split(versioned_model_dir):
+    with TestClient(predict.app) as client:
+        default = client.post("/predict", json={"instances": [INSTANCE]})
+        pinned = client.post("/predict", json={"instances": [INSTANCE]}, headers={"X-Model-Version": "1"})
+        unknown = client.post("/predict", json={"instances": [INSTANCE]}, headers={"X-Model-Version": "9"})
+
+        (versioned_model_dir / "traffic.json").write_text('{"1": 100}')
+        client.portal.call(predict.sync_models)
+        split = client.post("/predict", json={"instances": [INSTANCE]})
+
+    assert default.json()["predictions"] == [2.0] and default.headers["X-Model-Version"] == "2"
+    assert pinned.json()["predictions"] == [1.0]
+    assert unknown.status_code == 404
+    assert split.json()["predictions"] == [1.0]
+
+
+def test_new_version_is_swapped_in_without_a_restart(versioned_model_dir):
+    with TestClient(predict.app) as client:
+        assert client.post("/predict", json={"instances": [INSTANCE]}).json()["predictions"] == [2.0]
+        write_constant_model(versioned_model_dir / "3", 3.0)
+        client.portal.call(predict.sync_models)
+        after = client.post("/predict", json={"instances": [INSTANCE]}).json()["predictions"]
+        versions = client.get("/models").json()["versions"]
+
+    assert after == [3.0]
+    assert {version["name"]: version["traffic_share"] for version in versions} == {"1": 0.0, "2": 0.0, "3": 1.0}
+
+
+def test_unloaded_version_is_dropped_from_the_cache(versioned_model_dir):
+    with TestClient(predict.app) as client:
+        client.post("/predict", json={"instances": [INSTANCE]}, headers={"X-Model-Version": "1"})
+        client.post("/predict", json={"instances": [INSTANCE]})
+        before = client.get("/cache/stats").json()
+        shutil.rmtree(versioned_model_dir / "1")
+        client.portal.call(predict.sync_models)
+        after = client.get("/cache/stats").json()
+        cached = client.post("/predict", json={"instances": [INSTANCE]})
+
+    assert before["entries"] - after["entries"] == 1
+    assert after["invalidations"] - before["invalidations"] == 1
+    assert cached.json()["predictions"] == [2.0]
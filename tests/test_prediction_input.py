@@ -0,0 +1,50 @@
+import json
+
+import numpy as np
+import pytest
+
+from scripts.create_prediction_input import format_rows, resample_rows, write_prediction_input
+from scripts.json_payload import convert_jsonl_to_payload
+from scripts.load_test import read_rows
+
+
+def test_format_rows_round_trips_through_json():
+    rows = np.array([[0.00004, -0.00006, 0.0, 5.0, -123.5],
+                     [1234.56789, -0.5, 7.0, 0.1, 99.99999]])
+    lines = format_rows(rows, decimals=4).tobytes().decode().splitlines()
+
+    assert len({len(line) for line in lines}) == 1
+    np.testing.assert_allclose([json.loads(line) for line in lines], np.round(rows, 4), atol=1e-9)
+    assert json.loads(format_rows(rows[:1], decimals=0).tobytes()) == [0, 0, 0, 5, -124]
+
+    with pytest.raises(ValueError, match="NaN"):
+        format_rows(np.array([[1.0, np.nan]]))
+
+
+def test_jsonl_and_npy_shards(tmp_path):
+    rows = resample_rows(np.random.default_rng(0).uniform(0, 100, size=(50, 13)).astype(np.float32), 1000, noise=0.1)
+
+    paths = write_prediction_input(rows, str(tmp_path / "input.jsonl"), "jsonl", rows_per_shard=300)
+    assert [p.rsplit("/", 1)[1] for p in paths] == [f"input-0000{i}-of-00004.jsonl" for i in range(4)]
+    np.testing.assert_allclose(np.concatenate([read_rows(p) for p in paths]), rows, atol=1e-4)
+    np.testing.assert_allclose(convert_jsonl_to_payload(paths[0])["instances"], rows[:300], atol=1e-4)
+
+    paths = write_prediction_input(rows, str(tmp_path / "input.npy"), "npy", rows_per_shard=600)
+    np.testing.assert_array_equal(np.concatenate([np.load(p) for p in paths]), rows)
+
+
+def test_payloads_stay_under_max_request_bytes(tmp_path):
+    rows = np.random.default_rng(0).uniform(-50, 700, size=(2000, 13))
+
+    paths = write_prediction_input(rows, str(tmp_path / "payload.json"), "payload", max_request_bytes=20000)
+    assert len(paths) > 1
+    instances = []
+    for path in paths:
+        with open(path, "rb") as f:
+            body = f.read()
+        assert len(body) <= 20000
+        instances.extend(json.loads(body)["instances"])
+    np.testing.assert_allclose(instances, np.round(rows, 4), atol=1e-9)
+
+    with pytest.raises(ValueError, match="max_request_bytes"):
+        write_prediction_input(rows, str(tmp_path / "tiny.json"), "payload", max_request_bytes=50)
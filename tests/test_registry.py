@@ -0,0 +1,74 @@
+import random
+
+import pytest
+
+from registry import (DEFAULT_VERSION, ModelRegistry, ModelVersion, UnknownVersionError, find_versions,
+                      parse_traffic_split, read_traffic_split, version_order)
+
+
+class FakePredictor:
+    num_features = 13
+
+
+def make_version(name, fingerprint="f"):
+    return ModelVersion(name, f"/models/{name}", FakePredictor(), fingerprint)
+
+
+def test_find_versions_serves_subdirectories_and_top_level_artifacts(tmp_path):
+    (tmp_path / "model_weights.npz").write_bytes(b"")
+    for name in ("1", "2", "empty"):
+        (tmp_path / name).mkdir()
+    (tmp_path / "1" / "model.keras").write_bytes(b"")
+    (tmp_path / "2" / "model.tflite").write_bytes(b"")
+
+    assert find_versions(str(tmp_path)) == {
+        DEFAULT_VERSION: str(tmp_path), "1": str(tmp_path / "1"), "2": str(tmp_path / "2")
+    }
+    assert sorted(["v10", "v9", "v2"], key=version_order) == ["v2", "v9", "v10"]
+
+
+def test_traffic_split_formats(tmp_path):
+    assert parse_traffic_split("v1=90, v2=10") == {"v1": 90.0, "v2": 10.0}
+    assert parse_traffic_split('{"a": 1}') == {"a": 1.0}
+    with pytest.raises(ValueError):
+        parse_traffic_split("v1=-1")
+
+    (tmp_path / "traffic.json").write_text('{"v2": 100}')
+    assert read_traffic_split(str(tmp_path), default="v1=100") == {"v2": 100.0}
+
+
+def test_routing_by_header_and_weighted_split():
+    models = ModelRegistry(rng=random.Random(0))
+    for name in ("v1", "v2", "v10"):
+        models.swap_in(make_version(name))
+
+    # Without a split the newest version gets everything
+    assert {models.route().name for _ in range(20)} == {"v10"}
+    assert models.route("v1").name == "v1"
+    with pytest.raises(UnknownVersionError):
+        models.route("v3")
+
+    models.traffic_split = {"v1": 75, "v2": 25, "missing": 50}
+    names = [models.route().name for _ in range(4000)]
+    assert models.weights() == {"v1": 0.75, "v2": 0.25, "v10": 0.0}
+    assert names.count("v1") / len(names) == pytest.approx(0.75, abs=0.03)
+    assert "v10" not in names
+
+
+def test_swapped_out_version_is_unloaded_after_its_last_request():
+    unloaded = []
+    models = ModelRegistry(on_unload=lambda version: unloaded.append(version.fingerprint))
+    models.swap_in(make_version("v1", "old"))
+
+    in_flight = models.acquire("v1")
+    models.swap_in(make_version("v1", "new"))
+
+    # New requests get the new version at once, while the old one finishes its request
+    assert models.acquire("v1").fingerprint == "new"
+    assert unloaded == [] and in_flight.retired
+    models.release(in_flight)
+    assert unloaded == ["old"]
+
+    models.remove("v1")
+    assert models.versions == {}
+    assert unloaded == ["old"]  # the new version is still held by a request
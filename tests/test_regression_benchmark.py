@@ -0,0 +1,51 @@
+import json
+
+import pytest
+
+from benchmarks.benchmark_regression import (DEFAULT_TOLERANCES, compare, parse_metric_tolerances, resolve_tolerances,
+                                             save_baseline)
+
+
+def test_compare_flags_only_regressions_beyond_tolerance():
+    baseline = {
+        "predict_p50_ms_1": {"value": 1.0},
+        "predict_p50_ms_1024": {"value": 10.0},
+        "train_samples_per_sec": {"value": 1000.0},
+        "serving_throughput_rps": {"value": 100.0},
+    }
+    results = {
+        "predict_p50_ms_1": 1.2,           # 20% slower, within 0.25
+        "predict_p50_ms_1024": 13.0,       # 30% slower
+        "train_samples_per_sec": 1500.0,   # 50% faster
+        "serving_throughput_rps": 70.0,    # 30% fewer requests
+        "build_time_s": 0.5,               # not in the baseline yet
+    }
+    tolerances = resolve_tolerances(baseline, tolerance=0.25)
+    report = compare(results, baseline, tolerances)
+
+    statuses = {name: row["status"] for name, row in report["metrics"].items()}
+    assert statuses == {"predict_p50_ms_1": "ok", "predict_p50_ms_1024": "regressed",
+                        "train_samples_per_sec": "improved", "serving_throughput_rps": "regressed",
+                        "build_time_s": "new"}
+    assert report["regressions"] == ["predict_p50_ms_1024", "serving_throughput_rps"]
+    assert report["metrics"]["predict_p50_ms_1024"]["change"] == -0.3
+
+    # A per-metric tolerance lets a known-noisy metric through
+    tolerances = resolve_tolerances(baseline, 0.25, parse_metric_tolerances(["predict_p50_ms_1024=0.4"]))
+    assert compare(results, baseline, tolerances)["regressions"] == ["serving_throughput_rps"]
+
+
+def test_baseline_round_trip_keeps_tolerances_and_unmeasured_metrics(tmp_path):
+    path = tmp_path / "baselines" / "baseline.json"
+    existing = {"build_time_s": {"value": 0.2, "higher_is_better": False, "tolerance": 0.3}}
+    tolerances = dict(DEFAULT_TOLERANCES, load_time_s=0.75)
+    save_baseline(str(path), {"load_time_s": 0.01}, tolerances, existing)
+
+    stored = json.loads(path.read_text())
+    assert stored["metrics"]["build_time_s"] == existing["build_time_s"]
+    assert stored["metrics"]["load_time_s"] == {"value": 0.01, "higher_is_better": False, "tolerance": 0.75}
+    assert "cpu_count" in stored["environment"]
+    assert resolve_tolerances(stored["metrics"])["load_time_s"] == 0.75
+
+    with pytest.raises(ValueError):
+        parse_metric_tolerances(["unknown_metric=0.1"])
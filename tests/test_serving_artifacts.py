@@ -0,0 +1,49 @@
+import numpy as np
+import pytest
+
+from backends import SavedModelPredictor, TFLitePredictor, _split_batches, load_predictor, warmup_batches
+from training.export import SERVING_BATCH_SIZES, export_serving_artifacts
+from training.model import adapt_normalizer, feed_forward_net
+
+
+@pytest.fixture(scope="module")
+def exported_model(tmp_path_factory):
+    model_dir = tmp_path_factory.mktemp("model")
+    rng = np.random.default_rng(0)
+    X = rng.uniform(0, 100, size=(512, 13)).astype(np.float32)
+    model = feed_forward_net((13,), normalizer=adapt_normalizer([X]))
+    model.fit(X, X[:, :3].sum(axis=1), epochs=1, batch_size=64, verbose=0)
+    export_serving_artifacts(model, str(model_dir))
+    return model, model_dir
+
+
+@pytest.mark.parametrize("backend, predictor_class", [("savedmodel", SavedModelPredictor),
+                                                      ("tflite", TFLitePredictor)])
+@pytest.mark.parametrize("num_rows", [1, 5, 64, 1000, 2100])
+def test_graph_exports_match_keras(exported_model, backend, predictor_class, num_rows):
+    model, model_dir = exported_model
+    X = np.random.default_rng(num_rows).uniform(0, 100, size=(num_rows, 13)).astype(np.float32)
+
+    predictor = load_predictor(str(model_dir), backend)
+
+    assert isinstance(predictor, predictor_class)
+    assert predictor.num_features == 13
+    np.testing.assert_allclose(predictor.predict(X), model(X, training=False).numpy().reshape(-1),
+                               rtol=1e-4, atol=1e-4)
+
+
+def test_split_batches_covers_every_row_with_fixed_sizes():
+    chunks = list(_split_batches(2100, list(SERVING_BATCH_SIZES)))
+
+    assert chunks == [(0, 1024, 1024), (1024, 2048, 1024), (2048, 2100, 64)]
+    assert list(_split_batches(0, [1, 16])) == []
+
+
+def test_warmup_requests_cover_the_serving_batch_sizes(exported_model, tmp_path):
+    _, model_dir = exported_model
+
+    assert [len(batch) for batch in warmup_batches(str(model_dir), 13)] == list(SERVING_BATCH_SIZES)
+    # Without exported requests, zero batches of the given sizes are used
+    batches = warmup_batches(str(tmp_path), 13, (64, 1, 64))
+    assert [batch.shape for batch in batches] == [(1, 13), (64, 13)]
+    assert not any(batch.any() for batch in batches)
@@ -0,0 +1,71 @@
+import os
+
+import numpy as np
+import pytest
+
+from training.storage import (FilesystemBackend, download, download_dir, fetch, iter_lines, upload, upload_dir)
+
+
+@pytest.fixture
+def backend(tmp_path):
+    return FilesystemBackend(str(tmp_path / "gcs"))
+
+
+def test_chunked_download_and_composite_upload(backend, tmp_path):
+    data = np.random.default_rng(0).bytes(100_003)
+    local = tmp_path / "local.bin"
+    local.write_bytes(data)
+
+    upload(str(local), "gs://bucket/a/blob.bin", chunk_size=4096, backend=backend)
+    assert backend.list("gs://bucket/") == [backend.stat("gs://bucket/a/blob.bin")]
+
+    download("gs://bucket/a/blob.bin", str(tmp_path / "copy.bin"), chunk_size=1000, backend=backend)
+    assert (tmp_path / "copy.bin").read_bytes() == data
+
+    with pytest.raises(FileNotFoundError):
+        download("gs://bucket/missing", str(tmp_path / "missing"), backend=backend)
+
+
+def test_iter_lines_across_chunk_boundaries(backend):
+    lines = [f'{{"instances": [{i}, {i * 2}]}}\n' for i in range(500)]
+    backend.write("gs://bucket/input.jsonl", "".join(lines).encode() + b'{"last": true}')
+
+    streamed = list(iter_lines("gs://bucket/input.jsonl", chunk_size=37, prefetch=3, backend=backend))
+    assert streamed == lines + ['{"last": true}']
+
+
+def test_fetch_caches_by_generation(backend, tmp_path):
+    cache_dir = str(tmp_path / "cache")
+    backend.write("gs://bucket/data.npz", b"first")
+
+    first = fetch("gs://bucket/data.npz", cache_dir, backend=backend)
+    assert open(first, "rb").read() == b"first"
+    assert fetch("gs://bucket/data.npz", cache_dir, backend=backend) == first
+
+    path = backend._path("gs://bucket/data.npz")
+    backend.write("gs://bucket/data.npz", b"second")
+    os.utime(path, ns=(os.stat(path).st_atime_ns, os.stat(path).st_mtime_ns + 10 ** 9))
+    second = fetch("gs://bucket/data.npz", cache_dir, backend=backend)
+    assert second != first and open(second, "rb").read() == b"second"
+    assert fetch(str(tmp_path), cache_dir, backend=backend) == str(tmp_path)
+
+
+def test_directories_round_trip_and_train_reads_gcs(backend, tmp_path, monkeypatch):
+    from training.train import load_arrays
+
+    rng = np.random.default_rng(0)
+    arrays = {name: rng.normal(size=(8, 13) if name.startswith("X") else 8).astype(np.float32)
+              for name in ("X_train", "y_train", "X_test", "y_test")}
+    source = tmp_path / "source"
+    (source / "nested").mkdir(parents=True)
+    np.savez(source / "data.npz", **arrays)
+    (source / "nested" / "notes.txt").write_text("hello")
+
+    upload_dir(str(source), "gs://bucket/datasets/v1", backend=backend)
+    download_dir("gs://bucket/datasets/v1", str(tmp_path / "copy"), backend=backend)
+    assert (tmp_path / "copy" / "nested" / "notes.txt").read_text() == "hello"
+
+    monkeypatch.setattr("storage._backend", backend)
+    monkeypatch.setattr("storage.CACHE_DIR", str(tmp_path / "cache"))
+    for loaded, name in zip(load_arrays("gs://bucket/datasets/v1/data.npz"), arrays):
+        np.testing.assert_array_equal(loaded, arrays[name])
@@ -0,0 +1,60 @@
+import csv
+
+import numpy as np
+import pytest
+
+from training.model import feed_forward_net
+from training.sweep import RESULT_FIELDS, SEARCH_SPACE, run_sweep, sample_configs, successive_halving, write_results
+
+
+def test_feed_forward_net_hyperparameters():
+    model = feed_forward_net((13,), width=8, depth=3, learning_rate=0.01)
+    assert [layer.units for layer in model.layers] == [8, 8, 8, 1]
+    assert np.isclose(float(model.optimizer.learning_rate), 0.01)
+
+
+@pytest.mark.parametrize("width, depth", [(8, 0), (8, -1), (0, 2)])
+def test_feed_forward_net_rejects_empty_layers(width, depth):
+    with pytest.raises(ValueError, match="at least 1"):
+        feed_forward_net((13,), width=width, depth=depth)
+
+
+def test_sample_configs_is_seeded_and_in_range():
+    configs = sample_configs(20, seed=3)
+    assert configs == sample_configs(20, seed=3)
+    low, high = SEARCH_SPACE["learning_rate"]
+    for config in configs:
+        assert config["width"] in SEARCH_SPACE["width"]
+        assert config["depth"] in SEARCH_SPACE["depth"]
+        assert low <= config["learning_rate"] <= high
+
+
+def test_successive_halving_promotes_the_best_trials():
+    def evaluate(trials):
+        # Wider is better here, and more epochs help
+        return [{**trial, "mae": 1000.0 / trial["width"] / trial["epochs"]} for trial in trials]
+
+    configs = [{"width": width, "depth": 1, "learning_rate": 0.001, "batch_size": 32} for width in range(1, 10)]
+    results = successive_halving(configs, evaluate, min_epochs=1, max_epochs=9, eta=3)
+
+    rungs = [[result for result in results if result["rung"] == rung] for rung in range(3)]
+    assert [len(rung) for rung in rungs] == [9, 3, 1]
+    assert {result["width"] for result in rungs[1]} == {7, 8, 9}
+    assert [result["epochs"] for result in (rungs[0][0], rungs[1][0], rungs[2][0])] == [1, 3, 9]
+    assert rungs[2][0]["width"] == 9
+
+
+def test_random_sweep_records_every_trial(tmp_path):
+    rng = np.random.default_rng(0)
+    X = rng.uniform(0, 10, size=(300, 13)).astype(np.float32)
+    y = X[:, :3].sum(axis=1)
+    np.savez(tmp_path / "data.npz", X_train=X, y_train=y, X_test=X[:10], y_test=y[:10])
+
+    results = run_sweep(str(tmp_path / "data.npz"), "random", num_trials=2, workers=1, epochs=1)
+    write_results(results, tmp_path / "results.csv")
+
+    with open(tmp_path / "results.csv") as f:
+        rows = list(csv.DictReader(f))
+    assert len(rows) == 2 and list(rows[0]) == RESULT_FIELDS
+    for row in rows:
+        assert float(row["mae"]) > 0 and float(row["samples_per_sec"]) > 0
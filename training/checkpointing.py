@@ -0,0 +1,110 @@
+# training/checkpointing.py
+
+import io
+import json
+import os
+import numpy as np
+import tensorflow as tf
+
+CHECKPOINT_DIR = "checkpoints"
+STATE_FILE = "checkpoint.json"
+BEST_WEIGHTS_FILE = "best_weights.npz"
+
+
+class TrainingCheckpoint(tf.keras.callbacks.Callback):
+    """
+    Saves the training state every `every_n_epochs` epochs so a preempted job can resume.
+
+    Each checkpoint holds the model and optimizer variables (Keras' save_weights
+    includes the optimizer), and checkpoint.json records the number of completed
+    epochs plus the state of `early_stopping`, if given, so its patience and best
+    weights carry over. checkpoint.json is written last, so it only ever points to
+    a complete checkpoint. Only the newest `max_to_keep` checkpoints are kept.
+    Paths may be local or gs://.
+    """
+
+    def __init__(self, checkpoint_dir, every_n_epochs=1, max_to_keep=3, early_stopping=None):
+        super().__init__()
+        self.checkpoint_dir = checkpoint_dir
+        self.every_n_epochs = every_n_epochs
+        self.max_to_keep = max_to_keep
+        self.early_stopping = early_stopping
+        self._restored_early_stopping = None
+        self._restored_dir = None
+
+    def _path(self, name, checkpoint_dir=None):
+        return os.path.join(checkpoint_dir or self.checkpoint_dir, name)
+
+    def latest(self, checkpoint_dir=None):
+        """Returns the state of the newest checkpoint, or None if there is none."""
+        if not tf.io.gfile.exists(self._path(STATE_FILE, checkpoint_dir)):
+            return None
+        with tf.io.gfile.GFile(self._path(STATE_FILE, checkpoint_dir), "r") as f:
+            return json.load(f)
+
+    def restore(self, model, checkpoint_dir=None):
+        """
+        Loads the newest checkpoint into `model` and returns the number of epochs it completed.
+        `checkpoint_dir` restores from another directory than the one this callback saves to.
+        """
+        checkpoint_dir = checkpoint_dir or self.checkpoint_dir
+        state = self.latest(checkpoint_dir)
+        if state is None:
+            print(f"No checkpoint in {checkpoint_dir}; starting from scratch.")
+            return 0
+        if model.optimizer is not None and not model.optimizer.built:
+            # The optimizer variables have to exist before their values can be loaded
+            model.optimizer.build(model.trainable_variables)
+        model.load_weights(self._path(state["weights"], checkpoint_dir))
+        self._restored_early_stopping = state.get("early_stopping")
+        self._restored_dir = checkpoint_dir
+        print(f"Resumed from {state['weights']} after epoch {state['epoch']}")
+        return state["epoch"]
+
+    def on_train_begin(self, logs=None):
+        # EarlyStopping resets itself in on_train_begin, so its restored state is applied
+        # afterwards; this callback has to come after it in the callback list
+        if self.early_stopping is None or self._restored_early_stopping is None:
+            return
+        saved = self._restored_early_stopping
+        self.early_stopping.wait = saved["wait"]
+        self.early_stopping.best = saved["best"]
+        self.early_stopping.best_epoch = saved["best_epoch"]
+        if saved.get("best_weights"):
+            with tf.io.gfile.GFile(self._path(saved["best_weights"], self._restored_dir), "rb") as f, \
+                    np.load(f) as data:
+                self.early_stopping.best_weights = [data[f"arr_{i}"] for i in range(len(data.files))]
+
+    def on_epoch_end(self, epoch, logs=None):
+        if self.every_n_epochs > 0 and (epoch + 1) % self.every_n_epochs == 0:
+            self.save(epoch + 1)
+
+    def save(self, epoch):
+        tf.io.gfile.makedirs(self.checkpoint_dir)
+        weights_file = f"epoch-{epoch:05d}.weights.h5"
+        self.model.save_weights(self._path(weights_file), overwrite=True)
+        state = {"epoch": epoch, "weights": weights_file}
+
+        if self.early_stopping is not None:
+            early_stopping = {
+                "wait": self.early_stopping.wait,
+                "best": None if self.early_stopping.best is None else float(self.early_stopping.best),
+                "best_epoch": self.early_stopping.best_epoch,
+                "best_weights": None,
+            }
+            if self.early_stopping.best_weights is not None:
+                buffer = io.BytesIO()
+                np.savez(buffer, *self.early_stopping.best_weights)
+                with tf.io.gfile.GFile(self._path(BEST_WEIGHTS_FILE), "wb") as f:
+                    f.write(buffer.getvalue())
+                early_stopping["best_weights"] = BEST_WEIGHTS_FILE
+            state["early_stopping"] = early_stopping
+
+        # Write the state next to its final name and rename it, so a preemption never leaves it half written
+        with tf.io.gfile.GFile(self._path(STATE_FILE + ".tmp"), "w") as f:
+            json.dump(state, f)
+        tf.io.gfile.rename(self._path(STATE_FILE + ".tmp"), self._path(STATE_FILE), overwrite=True)
+
+        old = sorted(name for name in tf.io.gfile.listdir(self.checkpoint_dir) if name.endswith(".weights.h5"))
+        for name in old[:-self.max_to_keep]:
+            tf.io.gfile.remove(self._path(name))
@@ -0,0 +1,197 @@
+# training/distributed.py
+
+import argparse
+import json
+import os
+import socket
+import subprocess
+import sys
+import time
+import tensorflow as tf
+
+STRATEGIES = ["none", "multiworker"]
+PRECISIONS = ["float32", "mixed_bfloat16"]
+
+
+def configure_runtime(intra_op_threads=0, inter_op_threads=0, precision="float32"):
+    """
+    Sets the TensorFlow thread pools and the Keras dtype policy. Must run before
+    any TensorFlow op or model is created; 0 keeps TensorFlow's default pool size.
+    """
+    if intra_op_threads > 0:
+        tf.config.threading.set_intra_op_parallelism_threads(intra_op_threads)
+    if inter_op_threads > 0:
+        tf.config.threading.set_inter_op_parallelism_threads(inter_op_threads)
+    # With mixed_bfloat16 the layers compute in bfloat16 but keep float32 variables
+    tf.keras.mixed_precision.set_global_policy(precision)
+
+
+def make_strategy(name):
+    """
+    Returns the tf.distribute strategy for `name`. "multiworker" reads the cluster
+    from TF_CONFIG, which Vertex AI sets for multi-replica jobs and
+    launch_local_workers() sets for local processes.
+    """
+    if name == "multiworker":
+        return tf.distribute.MultiWorkerMirroredStrategy()
+    return tf.distribute.get_strategy()
+
+
+def is_chief():
+    """True for the worker that should write the model, checkpoints and metrics."""
+    tf_config = json.loads(os.environ.get("TF_CONFIG", "{}"))
+    task = tf_config.get("task", {})
+    if task.get("type", "chief") == "chief":
+        return True
+    # Worker 0 only stands in for the chief in clusters that do not have one
+    return task.get("type") == "worker" and task.get("index", 0) == 0 and "chief" not in tf_config.get("cluster", {})
+
+
+class ThroughputMonitor(tf.keras.callbacks.Callback):
+    """Logs training samples/sec per epoch, counting the global batch across all workers."""
+
+    def __init__(self, global_batch_size):
+        super().__init__()
+        self.global_batch_size = global_batch_size
+        self.history = []
+        self._epoch_start = 0.0
+        self._steps = 0
+
+    def on_epoch_begin(self, epoch, logs=None):
+        self._steps = 0
+        self._epoch_start = time.perf_counter()
+
+    def on_train_batch_end(self, batch, logs=None):
+        self._steps += 1
+
+    def on_epoch_end(self, epoch, logs=None):
+        elapsed = time.perf_counter() - self._epoch_start
+        samples_per_sec = self._steps * self.global_batch_size / elapsed if elapsed > 0 else 0.0
+        self.history.append(samples_per_sec)
+        print(f"Epoch {epoch + 1}: {samples_per_sec:.0f} samples/sec")
+
+
+def _errors(model, X, y, training):
+    predictions = tf.reshape(tf.cast(model(X, training=training), tf.float32), [-1])
+    error = predictions - tf.cast(y, tf.float32)
+    return tf.square(error), tf.abs(error)
+
+
+def _error_sums(squared, absolute):
+    """Sum of squared errors, sum of absolute errors and the row count, to be summed across workers."""
+    return tf.stack([tf.reduce_sum(squared), tf.reduce_sum(absolute), tf.cast(tf.size(squared), tf.float32)])
+
+
+def _run_epoch(dataset, step_fn, on_batch_begin=None, on_batch_end=None):
+    totals = tf.zeros([3])
+    for index, batch in enumerate(dataset):
+        if on_batch_begin is not None:
+            on_batch_begin(index)
+        totals += step_fn(batch)
+        if on_batch_end is not None:
+            on_batch_end(index)
+    squared, absolute, count = totals.numpy()
+    return {"loss": float(squared / max(count, 1.0)), "mae": float(absolute / max(count, 1.0))}
+
+
+def _make_test_step(model, strategy):
+    @tf.function
+    def test_step(batch):
+        per_replica = strategy.run(lambda X, y: _error_sums(*_errors(model, X, y, training=False)), args=batch)
+        return strategy.reduce("SUM", per_replica, axis=None)
+    return test_step
+
+
+def distributed_fit(model, strategy, train_ds, val_ds=None, epochs=1, initial_epoch=0, callbacks=()):
+    """
+    Data-parallel training loop for MultiWorkerMirroredStrategy.
+
+    Keras 3's fit() cannot build a model from multi-worker distributed batches
+    (it tries to reduce the whole (X, y) batch across workers), so the train step
+    runs under strategy.run here and the optimizer all-reduces the gradients.
+    The Keras callbacks get the same hooks and logs fit() would give them.
+    `train_ds` and `val_ds` yield global batches; each worker gets its share.
+    """
+    train_dist = strategy.experimental_distribute_dataset(train_ds)
+    val_dist = strategy.experimental_distribute_dataset(val_ds) if val_ds is not None else None
+    if not model.optimizer.built:
+        with strategy.scope():
+            model.optimizer.build(model.trainable_variables)
+
+    @tf.function
+    def train_step(batch):
+        def step(X, y):
+            with tf.GradientTape() as tape:
+                squared, absolute = _errors(model, X, y, training=True)
+                loss = tf.nn.compute_average_loss(squared)
+            gradients = tape.gradient(loss, model.trainable_variables)
+            model.optimizer.apply_gradients(zip(gradients, model.trainable_variables))
+            return _error_sums(squared, absolute)
+        return strategy.reduce("SUM", strategy.run(step, args=batch), axis=None)
+
+    test_step = _make_test_step(model, strategy)
+    callback_list = tf.keras.callbacks.CallbackList(list(callbacks), add_history=True, model=model,
+                                                    epochs=epochs, verbose=0)
+    model.stop_training = False
+    callback_list.on_train_begin()
+    for epoch in range(initial_epoch, epochs):
+        callback_list.on_epoch_begin(epoch)
+        logs = _run_epoch(train_dist, train_step, callback_list.on_train_batch_begin,
+                          callback_list.on_train_batch_end)
+        if val_dist is not None:
+            logs.update({f"val_{key}": value for key, value in _run_epoch(val_dist, test_step).items()})
+        print(f"Epoch {epoch + 1}/{epochs}: " + " - ".join(f"{key}: {value:.4f}" for key, value in logs.items()))
+        callback_list.on_epoch_end(epoch, logs)
+        if model.stop_training:
+            break
+    callback_list.on_train_end()
+    return model.history
+
+
+def distributed_evaluate(model, strategy, dataset):
+    """Returns the MAE of `model` over `dataset`, with each worker scoring its share of the batches."""
+    logs = _run_epoch(strategy.experimental_distribute_dataset(dataset), _make_test_step(model, strategy))
+    return logs["mae"]
+
+
+def _free_ports(count):
+    sockets = [socket.socket() for _ in range(count)]
+    for s in sockets:
+        s.bind(("localhost", 0))
+    ports = [s.getsockname()[1] for s in sockets]
+    for s in sockets:
+        s.close()
+    return ports
+
+
+def launch_local_workers(num_workers, train_args, train_script=None):
+    """
+    Runs `num_workers` copies of train.py as a local multi-worker cluster, standing
+    in for a multi-replica Vertex AI job, and returns their exit codes.
+    """
+    train_script = train_script or os.path.join(os.path.dirname(os.path.abspath(__file__)), "train.py")
+    workers = [f"localhost:{port}" for port in _free_ports(num_workers)]
+    processes = []
+    for index in range(num_workers):
+        tf_config = {"cluster": {"worker": workers}, "task": {"type": "worker", "index": index}}
+        env = dict(os.environ, TF_CONFIG=json.dumps(tf_config))
+        command = [sys.executable, train_script, "--distribute", "multiworker", *train_args]
+        processes.append(subprocess.Popen(command, env=env))
+    return [process.wait() for process in processes]
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Run train.py as a local multi-worker cluster. Arguments after -- are passed to train.py."
+    )
+    parser.add_argument("--num_workers", type=int, default=2)
+    parser.add_argument("train_args", nargs=argparse.REMAINDER)
+    args = parser.parse_args()
+
+    train_args = args.train_args[1:] if args.train_args[:1] == ["--"] else args.train_args
+    exit_codes = launch_local_workers(args.num_workers, train_args)
+    sys.exit(max(exit_codes))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,268 @@
+# training/evaluation.py
+
+import argparse
+import json
+import time
+
+import numpy as np
+
+from mmap_dataset import is_mmap_dataset, open_mmap_dataset
+from storage import fetch, glob, iter_blocks
+
+FEATURE_NAMES = ["CRIM", "ZN", "INDUS", "CHAS", "NOX", "RM", "AGE", "DIS", "RAD", "TAX", "PTRATIO", "B", "LSTAT"]
+PSI_BINS = 10
+KS_QUANTILES = 1000
+# PSI above 0.2 is commonly read as a significant shift
+DEFAULT_PSI_THRESHOLD = 0.2
+# Keeps empty bins from making PSI infinite
+_EPSILON = 1e-6
+_DECODER = json.JSONDecoder()
+
+
+def load_training_data(path):
+    """X_train and y_train of an .npz or a memory-mapped dataset directory, local or gs://."""
+    path = fetch(path)
+    if is_mmap_dataset(path):
+        return open_mmap_dataset(path)["train"]
+    with np.load(path) as data:
+        return data["X_train"], data["y_train"]
+
+
+class LogParser:
+    """
+    Parses blocks of JSONL log records into (instances, predictions, labels).
+
+    The block is decoded to text once and every line is read with raw_decode(),
+    which skips json.loads' per-call overhead; the instances are then converted
+    to an array in one call. Labels are NaN where a record has none, and lines
+    that are not a valid record are skipped and counted in `bad_lines`.
+    """
+
+    def __init__(self, num_features, label_key="label"):
+        self.num_features = num_features
+        self.label_key = label_key
+        self.bad_lines = 0
+
+    def parse(self, block: bytes):
+        decode = _DECODER.raw_decode
+        instances, predictions, labels = [], [], []
+        for line in block.decode("utf-8", errors="replace").splitlines():
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                record, end = decode(line)
+                if end != len(line):
+                    raise ValueError("Extra data after the record")
+                instance = record["instance"] if "instance" in record else record["instances"]
+                prediction = record["prediction"]
+                prediction = float(prediction[0] if isinstance(prediction, list) else prediction)
+                label = record.get(self.label_key)
+                label = np.nan if label is None else float(label)
+            except (ValueError, TypeError, KeyError, IndexError, AttributeError):
+                self.bad_lines += 1
+                continue
+            instances.append(instance)
+            predictions.append(prediction)
+            labels.append(label)
+
+        try:
+            instances = np.array(instances, dtype=np.float64).reshape(len(predictions), self.num_features)
+        except (ValueError, TypeError):
+            # Some instance has the wrong length or is not numeric; find and drop those rows one by one
+            instances, predictions, labels = self._valid_rows(instances, predictions, labels)
+        return instances, np.array(predictions, dtype=np.float64), np.array(labels, dtype=np.float64)
+
+    def _valid_rows(self, instances, predictions, labels):
+        rows, keep = [], []
+        for i, instance in enumerate(instances):
+            try:
+                instance = np.asarray(instance, dtype=np.float64)
+            except (ValueError, TypeError):
+                instance = None
+            if instance is None or instance.size != self.num_features:
+                self.bad_lines += 1
+                continue
+            rows.append(instance.reshape(-1))
+            keep.append(i)
+        instances = np.array(rows, dtype=np.float64).reshape(-1, self.num_features)
+        return instances, [predictions[i] for i in keep], [labels[i] for i in keep]
+
+
+class ErrorStats:
+    """Running MAE, RMSE and bias of predictions against labels, overall and per bucket of the label."""
+
+    def __init__(self, bucket_edges):
+        # Inner edges; bucket i holds labels in [edges[i - 1], edges[i])
+        self.bucket_edges = np.asarray(bucket_edges, dtype=np.float64)
+        num_buckets = len(self.bucket_edges) + 1
+        self.count = np.zeros(num_buckets)
+        self.abs_error = np.zeros(num_buckets)
+        self.squared_error = np.zeros(num_buckets)
+        self.error = np.zeros(num_buckets)
+
+    def update(self, predictions, labels):
+        labelled = ~np.isnan(labels)
+        predictions, labels = predictions[labelled], labels[labelled]
+        errors = predictions - labels
+        buckets = np.searchsorted(self.bucket_edges, labels, side="right")
+        size = len(self.count)
+        self.count += np.bincount(buckets, minlength=size)
+        self.abs_error += np.bincount(buckets, np.abs(errors), minlength=size)
+        self.squared_error += np.bincount(buckets, errors * errors, minlength=size)
+        self.error += np.bincount(buckets, errors, minlength=size)
+
+    @staticmethod
+    def _summary(count, abs_error, squared_error, error):
+        if not count:
+            return {"rows": 0, "mae": None, "rmse": None, "bias": None}
+        return {"rows": int(count), "mae": round(float(abs_error / count), 6),
+                "rmse": round(float(np.sqrt(squared_error / count)), 6), "bias": round(float(error / count), 6)}
+
+    def report(self):
+        overall = self._summary(self.count.sum(), self.abs_error.sum(), self.squared_error.sum(), self.error.sum())
+        edges = np.concatenate([[-np.inf], self.bucket_edges, [np.inf]])
+        overall["per_decile"] = [
+            {"label_range": [float(edges[i]), float(edges[i + 1])],
+             **self._summary(self.count[i], self.abs_error[i], self.squared_error[i], self.error[i])}
+            for i in range(len(self.count))
+        ]
+        return overall
+
+
+class DriftStats:
+    """
+    Running histograms of each column on bins taken from the training data's
+    quantiles. The logged rows' histograms are compared with the training rows'
+    to give the PSI and the KS statistic of every column.
+    """
+
+    def __init__(self, reference, names):
+        reference = np.asarray(reference, dtype=np.float64)
+        self.names = names
+        quantiles = np.quantile(reference, np.linspace(0, 1, KS_QUANTILES + 1), axis=0)
+        self.ks_edges = [np.unique(column) for column in quantiles.T]
+        # The PSI edges are every (KS_QUANTILES / PSI_BINS)th KS edge, so PSI bins are unions of KS bins and
+        # only the KS histogram needs to be counted
+        step = KS_QUANTILES // PSI_BINS
+        self.psi_edges = [np.unique(column[step:-step:step]) for column in quantiles.T]
+        self.psi_of_ks_bin = [np.searchsorted(psi, np.concatenate([[-np.inf], ks]), side="right")
+                              for psi, ks in zip(self.psi_edges, self.ks_edges)]
+        self.reference_ks = [self._histogram(column, edges) for column, edges in zip(reference.T, self.ks_edges)]
+        self.reference_mean = reference.mean(axis=0)
+        self.ks_counts = [np.zeros(len(edges) + 1) for edges in self.ks_edges]
+        self.total = np.zeros(reference.shape[1])
+        self.count = 0
+
+    @staticmethod
+    def _histogram(values, edges):
+        return np.bincount(np.searchsorted(edges, values, side="right"), minlength=len(edges) + 1).astype(np.float64)
+
+    def _psi_histogram(self, i, ks_counts):
+        return np.bincount(self.psi_of_ks_bin[i], ks_counts, minlength=len(self.psi_edges[i]) + 1)
+
+    def update(self, columns):
+        columns = np.asarray(columns, dtype=np.float64)
+        for i, column in enumerate(columns.T):
+            self.ks_counts[i] += self._histogram(column, self.ks_edges[i])
+        self.total += columns.sum(axis=0)
+        self.count += len(columns)
+
+    def report(self):
+        report = {}
+        for i, name in enumerate(self.names):
+            if not self.count:
+                report[name] = {"psi": None, "ks": None, "training_mean": float(self.reference_mean[i]), "mean": None}
+                continue
+            reference_psi = self._psi_histogram(i, self.reference_ks[i])
+            expected = np.maximum(reference_psi / reference_psi.sum(), _EPSILON)
+            actual = np.maximum(self._psi_histogram(i, self.ks_counts[i]) / self.count, _EPSILON)
+            psi = float(np.sum((actual - expected) * np.log(actual / expected)))
+            # Both CDFs at every edge: the share of rows at or below it
+            reference_cdf = np.cumsum(self.reference_ks[i])[:-1] / self.reference_ks[i].sum()
+            cdf = np.cumsum(self.ks_counts[i])[:-1] / self.count
+            ks = float(np.max(np.abs(cdf - reference_cdf))) if len(cdf) else 0.0
+            report[name] = {"psi": round(psi, 6), "ks": round(ks, 6),
+                            "training_mean": round(float(self.reference_mean[i]), 6),
+                            "mean": round(float(self.total[i] / self.count), 6)}
+        return report
+
+
+def list_log_files(patterns):
+    files = [path for pattern in patterns for path in glob(pattern)]
+    if not files:
+        raise ValueError(f"No log files match: {patterns}")
+    return files
+
+
+def evaluate_logs(log_files, X_train, y_train, label_key="label", block_size=16 * 1024 * 1024,
+                  psi_threshold=DEFAULT_PSI_THRESHOLD, feature_names=None):
+    """
+    Streams JSONL prediction logs, {"instance": [...], "prediction": p} records
+    as batch prediction writes them plus the true value under `label_key` once
+    it is known, and returns the error and drift report.
+
+    The logs are parsed a block of whole lines at a time and every statistic is
+    kept as running sums and histogram counts, so memory stays flat however many
+    rows are logged:
+      - MAE, RMSE and bias of the labelled rows, overall and per decile of `y_train`
+      - for every feature against `X_train`, and the predictions against `y_train`:
+        the PSI over ten training-quantile bins, and the KS statistic at 1000
+        training quantiles
+    """
+    start = time.perf_counter()
+    num_features = X_train.shape[1]
+    feature_names = list(feature_names or (FEATURE_NAMES if num_features == len(FEATURE_NAMES)
+                                           else [f"feature_{i}" for i in range(num_features)]))
+    y_train = np.asarray(y_train, dtype=np.float64)
+    parser = LogParser(num_features, label_key)
+    errors = ErrorStats(np.quantile(y_train, np.linspace(0, 1, 11)[1:-1]))
+    reference = np.column_stack([np.asarray(X_train, dtype=np.float64), y_train])
+    drift = DriftStats(reference, feature_names + ["prediction"])
+
+    num_rows = 0
+    for path in log_files:
+        for block in iter_blocks(path, block_size):
+            instances, predictions, labels = parser.parse(block)
+            errors.update(predictions, labels)
+            drift.update(np.column_stack([instances, predictions]))
+            num_rows += len(predictions)
+
+    drift_report = drift.report()
+    elapsed = time.perf_counter() - start
+    return {
+        "rows": num_rows,
+        "bad_lines": parser.bad_lines,
+        "seconds": round(elapsed, 3),
+        "rows_per_sec": round(num_rows / elapsed, 1) if elapsed > 0 else 0.0,
+        "error": errors.report(),
+        "drift": drift_report,
+        "drifted": [name for name, stats in drift_report.items()
+                    if stats["psi"] is not None and stats["psi"] > psi_threshold],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Evaluate prediction logs and check them for drift.")
+    parser.add_argument("--log_files", type=str, nargs="+", required=True,
+                        help="JSONL prediction logs; local or gs:// globs")
+    parser.add_argument("--training_data", type=str, required=True,
+                        help=".npz with X_train and y_train, or a memory-mapped dataset directory")
+    parser.add_argument("--label_key", type=str, default="label", help="Record key of the true value, if logged")
+    parser.add_argument("--psi_threshold", type=float, default=DEFAULT_PSI_THRESHOLD,
+                        help="Columns with a PSI above this are listed as drifted")
+    parser.add_argument("--block_mb", type=int, default=16, help="Size of the blocks the logs are parsed in")
+    parser.add_argument("--output_file", type=str, default="", help="Also write the JSON report here")
+    args = parser.parse_args()
+
+    X_train, y_train = load_training_data(args.training_data)
+    report = evaluate_logs(list_log_files(args.log_files), X_train, y_train, args.label_key,
+                           args.block_mb * 1024 * 1024, args.psi_threshold)
+    if args.output_file:
+        with open(args.output_file, "w") as f:
+            json.dump(report, f, indent=2)
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,169 @@
+# training/export.py
+
+import argparse
+import io
+import os
+import numpy as np
+import tensorflow as tf
+
+NUMPY_WEIGHTS_FILE = "model_weights.npz"
+SAVED_MODEL_DIR = "saved_model"
+TFLITE_MODEL_FILE = "model.tflite"
+WARMUP_FILE = "warmup_requests.npz"
+EXPORT_FORMATS = ["numpy", "savedmodel", "tflite"]
+
+# Batch sizes that get their own fixed-shape signature in the SavedModel and TFLite
+# exports; serving splits or pads other batch sizes onto these
+SERVING_BATCH_SIZES = (1, 16, 64, 256, 1024)
+
+
+def _feature_stats(model):
+    """Mean and standard deviation of the features, from a leading Normalization layer if there is one."""
+    num_features = model.input_shape[-1]
+    layer = model.layers[0] if model.layers else None
+    if not isinstance(layer, tf.keras.layers.Normalization):
+        return np.zeros(num_features), np.ones(num_features)
+    mean = np.asarray(layer.mean, dtype=np.float64).reshape(-1)
+    std = np.maximum(np.sqrt(np.asarray(layer.variance, dtype=np.float64).reshape(-1)), tf.keras.backend.epsilon())
+    return mean, std
+
+
+def _sample_inputs(model, num_rows, seed):
+    # Draw around the feature distribution the model was adapted to, so checks and warmup see realistic inputs
+    mean, std = _feature_stats(model)
+    rows = np.random.default_rng(seed).normal(size=(num_rows, len(mean))) * std + mean
+    return rows.astype(np.float32)
+
+
+def export_numpy_weights(model, path, num_probes=64, seed=0):
+    """
+    Writes the Dense kernels, biases and activations of `model` to an
+    uncompressed .npz file that serving/backends.py can run without TensorFlow.
+
+    A leading Normalization layer is folded into the first Dense layer, so the
+    NumPy backend runs the preprocessing as part of the first matrix product.
+
+    A handful of probe inputs and the matching Keras outputs are stored as well,
+    so the NumPy backend can check it reproduces the model when it loads, and
+    so is the normalizer's feature mean, which /explain uses as its baseline.
+    """
+    layers = list(model.layers)
+    mean, std = _feature_stats(model)
+    if layers and isinstance(layers[0], tf.keras.layers.Normalization):
+        layers.pop(0)
+        arrays = {"feature_mean": mean.astype(np.float32)}
+    else:
+        arrays = {}
+
+    activations = []
+    for i, layer in enumerate(layers):
+        if not isinstance(layer, tf.keras.layers.Dense):
+            raise ValueError(f"Cannot export layer '{layer.name}' ({type(layer).__name__}); only Dense layers are supported.")
+        kernel, bias = layer.get_weights()
+        if i == 0:
+            # (x - mean) / std @ W + b == x @ (W / std) + (b - (mean / std) @ W)
+            kernel, bias = kernel / std[:, None], bias - (mean / std) @ kernel
+        arrays[f"kernel_{i}"] = kernel.astype(np.float32)
+        arrays[f"bias_{i}"] = bias.astype(np.float32)
+        activations.append(layer.activation.__name__)
+
+    probe_inputs = _sample_inputs(model, num_probes, seed)
+    probe_outputs = model(probe_inputs, training=False).numpy().reshape(-1)
+
+    np.savez(
+        path,
+        num_layers=len(activations),
+        activations=np.array(activations),
+        probe_inputs=probe_inputs,
+        probe_outputs=probe_outputs,
+        **arrays,
+    )
+    return path
+
+
+def export_saved_model(model, path, batch_sizes=SERVING_BATCH_SIZES):
+    """
+    Writes `model` as a SavedModel whose forward pass is traced into a graph.
+
+    "serving_default" takes any batch size; "batch_<n>" takes exactly n rows, so
+    runtimes that specialize on static shapes get one graph per batch size.
+    Every signature maps "instances" (n, features) float32 to "predictions" (n,).
+    """
+    num_features = model.input_shape[-1]
+
+    def forward(instances):
+        return {"predictions": tf.reshape(tf.cast(model(instances, training=False), tf.float32), [-1])}
+
+    archive = tf.keras.export.ExportArchive()
+    archive.track(model)
+    for batch_size in [None, *batch_sizes]:
+        name = "serving_default" if batch_size is None else f"batch_{batch_size}"
+        archive.add_endpoint(name, forward,
+                             input_signature=[tf.TensorSpec([batch_size, num_features], tf.float32, name="instances")])
+    archive.write_out(path, verbose=False)
+    return path
+
+
+def export_tflite(saved_model_path, path, batch_sizes=SERVING_BATCH_SIZES, quantization=None):
+    """
+    Converts the fixed batch-size signatures of a SavedModel written by
+    export_saved_model() into one TFLite flatbuffer.
+
+    quantization="int8_dynamic" stores the weights as int8 and quantizes
+    activations on the fly; "float16" stores the weights as float16.
+    """
+    converter = tf.lite.TFLiteConverter.from_saved_model(
+        saved_model_path, signature_keys=[f"batch_{batch_size}" for batch_size in batch_sizes]
+    )
+    if quantization in ("int8_dynamic", "float16"):
+        converter.optimizations = [tf.lite.Optimize.DEFAULT]
+    if quantization == "float16":
+        converter.target_spec.supported_types = [tf.float16]
+    elif quantization not in (None, "int8_dynamic"):
+        raise ValueError(f"Unknown quantization: {quantization}")
+    flatbuffer = converter.convert()
+    with tf.io.gfile.GFile(path, "wb") as f:
+        f.write(flatbuffer)
+    return path
+
+
+def write_warmup_requests(model, path, batch_sizes=SERVING_BATCH_SIZES, seed=1):
+    """
+    Writes one sample batch per serving batch size, which the serving container
+    replays through the model at startup before it reports healthy.
+    """
+    buffer = io.BytesIO()
+    np.savez(buffer, **{f"batch_{n}": _sample_inputs(model, n, seed + i) for i, n in enumerate(batch_sizes)})
+    with tf.io.gfile.GFile(path, "wb") as f:
+        f.write(buffer.getvalue())
+    return path
+
+
+def export_serving_artifacts(model, model_dir, formats=EXPORT_FORMATS):
+    """Writes the serving artifacts in `formats` plus the warmup requests next to model.keras."""
+    saved_model_path = os.path.join(model_dir, SAVED_MODEL_DIR)
+    paths = {}
+    if "numpy" in formats:
+        paths["numpy"] = export_numpy_weights(model, os.path.join(model_dir, NUMPY_WEIGHTS_FILE))
+    if "savedmodel" in formats or "tflite" in formats:
+        paths["savedmodel"] = export_saved_model(model, saved_model_path)
+    if "tflite" in formats:
+        paths["tflite"] = export_tflite(saved_model_path, os.path.join(model_dir, TFLITE_MODEL_FILE))
+    paths["warmup"] = write_warmup_requests(model, os.path.join(model_dir, WARMUP_FILE))
+    return paths
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Export model.keras for the NumPy, SavedModel and TFLite serving backends.")
+    parser.add_argument("--model_dir", type=str, required=True,
+                        help="Directory containing model.keras; the artifacts are written next to it")
+    parser.add_argument("--formats", type=str, nargs="+", choices=EXPORT_FORMATS, default=EXPORT_FORMATS)
+    args = parser.parse_args()
+
+    model = tf.keras.models.load_model(os.path.join(args.model_dir, "model.keras"))
+    for name, path in export_serving_artifacts(model, args.model_dir, args.formats).items():
+        print(f"Exported {name} to: {path}")
+
+
+if __name__ == "__main__":
+    main()
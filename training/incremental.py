@@ -0,0 +1,101 @@
+# training/incremental.py
+
+import io
+import os
+import numpy as np
+import tensorflow as tf
+
+TRAINING_MODES = ["full", "incremental"]
+# A uniform sample of all rows trained on so far, kept next to model.keras
+REPLAY_FILE = "replay_sample.npz"
+DEFAULT_REPLAY_SIZE = 10000
+
+
+class ReplaySample:
+    """
+    A reservoir sample of at most `capacity` training rows, uniform over the
+    `seen` rows offered to it so far. Incremental runs train on the new rows plus
+    this sample, so earlier data keeps shaping the model without being reread.
+    """
+
+    def __init__(self, X, y, seen, capacity):
+        self.X = np.asarray(X, dtype=np.float32)
+        self.y = np.asarray(y, dtype=np.float32)
+        self.seen = int(seen)
+        self.capacity = capacity
+
+    @classmethod
+    def empty(cls, num_features, capacity):
+        return cls(np.empty((0, num_features), np.float32), np.empty(0, np.float32), 0, capacity)
+
+    def __len__(self):
+        return len(self.X)
+
+    def add(self, X, y, rng=None):
+        """
+        Offers rows to the reservoir (Vitter's algorithm R): row number i of
+        everything seen is kept with probability capacity / (i + 1), replacing
+        a random slot. The draws are made for all rows at once; only the rows
+        that are kept are then applied in order.
+        """
+        rng = rng or np.random.default_rng()
+        X, y = np.asarray(X, dtype=np.float32), np.asarray(y, dtype=np.float32)
+
+        # Fill the free slots first
+        free = max(0, min(self.capacity - len(self), len(X)))
+        self.X = np.concatenate([self.X, X[:free]])
+        self.y = np.concatenate([self.y, y[:free]])
+
+        positions = self.seen + free + np.arange(len(X) - free)
+        slots = (rng.random(len(positions)) * (positions + 1)).astype(np.int64)
+        kept = np.flatnonzero(slots < self.capacity)
+        # With repeated slots the later row wins, as in the sequential algorithm
+        _, last = np.unique(slots[kept][::-1], return_index=True)
+        kept = kept[::-1][last]
+        self.X[slots[kept]] = X[free + kept]
+        self.y[slots[kept]] = y[free + kept]
+        self.seen += len(X)
+        return self
+
+    def save(self, path):
+        buffer = io.BytesIO()
+        np.savez(buffer, X=self.X, y=self.y, seen=self.seen)
+        with tf.io.gfile.GFile(path, "wb") as f:
+            f.write(buffer.getvalue())
+
+    @classmethod
+    def load(cls, path, capacity):
+        """The sample at `path`, cut down to `capacity` rows if it was kept larger."""
+        with np.load(path) as data:
+            sample = cls(data["X"], data["y"], data["seen"], capacity)
+        if len(sample) > capacity:
+            keep = np.random.default_rng(0).choice(len(sample), capacity, replace=False)
+            sample.X, sample.y = sample.X[keep], sample.y[keep]
+        return sample
+
+
+def warm_start_model(model_path, learning_rate):
+    """
+    Loads the previous model with its optimizer state to continue training, at
+    `learning_rate`. Warm-started runs keep the model's architecture and its
+    adapted normalizer, so --width, --depth and --normalize do not apply.
+    """
+    model = tf.keras.models.load_model(model_path)
+    if model.optimizer is None:
+        model.compile(optimizer=tf.keras.optimizers.Adam(learning_rate=learning_rate), loss="mse", metrics=["mae"])
+    else:
+        model.optimizer.learning_rate.assign(learning_rate)
+    print(f"Warm-starting from: {model_path}")
+    return model
+
+
+def previous_artifacts(warm_start_dir, fetch):
+    """Local paths of the previous model.keras and replay sample (None if missing) in `warm_start_dir`."""
+    model_path = fetch(os.path.join(warm_start_dir, "model.keras"))
+    try:
+        replay_path = fetch(os.path.join(warm_start_dir, REPLAY_FILE))
+    except FileNotFoundError:
+        replay_path = None
+    if replay_path is not None and not os.path.exists(replay_path):
+        replay_path = None
+    return model_path, replay_path
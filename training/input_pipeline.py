@@ -0,0 +1,212 @@
+# training/input_pipeline.py
+
+import time
+import zipfile
+import numpy as np
+import tensorflow as tf
+
+AUTOTUNE = tf.data.AUTOTUNE
+NUM_FEATURES = 13
+
+
+def list_shards(pattern):
+    """Returns the sorted files matching a local or gs:// glob pattern."""
+    files = sorted(tf.io.gfile.glob(pattern))
+    if not files:
+        raise ValueError(f"No data shards match: {pattern}")
+    return files
+
+
+def _npz_keys(names, split):
+    """Picks the split-specific keys (X_train, y_train) when present, else X and y."""
+    x_key = f"X_{split}" if f"X_{split}" in names else "X"
+    y_key = f"y_{split}" if f"y_{split}" in names else "y"
+    return x_key, y_key
+
+
+def _npz_arrays(path, split):
+    with tf.io.gfile.GFile(path, "rb") as f, np.load(f) as data:
+        x_key, y_key = _npz_keys(data.files, split)
+        return data[x_key].astype(np.float32), data[y_key].astype(np.float32)
+
+
+def _npz_rows(path, split):
+    """Reads the row count from the .npy header inside the archive, without loading the data."""
+    with tf.io.gfile.GFile(path, "rb") as f, zipfile.ZipFile(f) as archive:
+        names = [name[:-len(".npy")] for name in archive.namelist()]
+        x_key, _ = _npz_keys(names, split)
+        with archive.open(f"{x_key}.npy") as member:
+            version = np.lib.format.read_magic(member)
+            read_header = np.lib.format.read_array_header_1_0 if version == (1, 0) else np.lib.format.read_array_header_2_0
+            shape, _, _ = read_header(member)
+    return shape[0]
+
+
+def count_rows(files, split="train"):
+    """
+    Counts the rows in a set of shards. Keras needs the dataset cardinality to
+    run every epoch in full; .npz shards only have their headers read, while
+    .tfrecord shards have to be scanned once.
+    """
+    if all(f.endswith(".npz") for f in files):
+        return sum(_npz_rows(f, split) for f in files)
+    return int(tf.data.TFRecordDataset(files).reduce(np.int64(0), lambda count, _: count + 1))
+
+
+def _npz_dataset(files, split, num_features, cycle_length):
+    def load(path):
+        return _npz_arrays(path.decode(), split)
+
+    def shard_dataset(path):
+        X, y = tf.numpy_function(load, [path], (tf.float32, tf.float32))
+        X.set_shape([None, num_features])
+        y.set_shape([None])
+        return tf.data.Dataset.from_tensor_slices((X, y))
+
+    return tf.data.Dataset.from_tensor_slices(files).interleave(
+        shard_dataset, cycle_length=cycle_length, num_parallel_calls=AUTOTUNE, deterministic=False
+    )
+
+
+def _tfrecord_dataset(files, num_features, cycle_length):
+    feature_spec = {
+        "x": tf.io.FixedLenFeature([num_features], tf.float32),
+        "y": tf.io.FixedLenFeature([], tf.float32),
+    }
+
+    def parse(record):
+        example = tf.io.parse_single_example(record, feature_spec)
+        return example["x"], example["y"]
+
+    return tf.data.Dataset.from_tensor_slices(files).interleave(
+        tf.data.TFRecordDataset, cycle_length=cycle_length, num_parallel_calls=AUTOTUNE, deterministic=False
+    ).map(parse, num_parallel_calls=AUTOTUNE)
+
+
+def make_dataset(files, batch_size=32, split="train", shuffle_buffer=0, cache=False, cache_path="",
+                 num_features=NUM_FEATURES, cycle_length=4, stall_monitor=None, seed=None):
+    """
+    Streams (X, y) batches from .npz or .tfrecord shards.
+
+    Shards are read with a parallel interleave, decoded rows are optionally
+    cached (in memory, or on disk at `cache_path`) so later epochs skip the
+    reads, then shuffled, batched and prefetched.
+    """
+    if all(f.endswith(".npz") for f in files):
+        dataset = _npz_dataset(files, split, num_features, cycle_length)
+    elif all(f.endswith((".tfrecord", ".tfrecords")) for f in files):
+        dataset = _tfrecord_dataset(files, num_features, cycle_length)
+    else:
+        raise ValueError("Data shards must all be .npz or all be .tfrecord files.")
+    dataset = dataset.apply(tf.data.experimental.assert_cardinality(count_rows(files, split)))
+
+    if cache:
+        dataset = dataset.cache(cache_path)
+    if shuffle_buffer > 0:
+        dataset = dataset.shuffle(shuffle_buffer, seed=seed, reshuffle_each_iteration=True)
+    dataset = dataset.batch(batch_size)
+    if stall_monitor is not None:
+        dataset = stall_monitor.attach(dataset)
+    return dataset.prefetch(AUTOTUNE)
+
+
+def make_array_dataset(X, y, batch_size=32, shuffle=False, seed=None):
+    """
+    Batches (X, y) arrays, typically np.memmap views, without copying them into a tensor.
+
+    Keras converts array inputs to one in-memory tensor, so memory-mapped arrays
+    would be read in full. Here every batch is sliced from the arrays on demand;
+    shuffling permutes the order of the contiguous batches, like Keras'
+    shuffle="batch", so reads stay sequential within a batch.
+    """
+    num_rows = len(X)
+    num_batches = -(-num_rows // batch_size)
+
+    def load(batch_index):
+        start = batch_index * batch_size
+        stop = min(start + batch_size, num_rows)
+        return np.asarray(X[start:stop], dtype=np.float32), np.asarray(y[start:stop], dtype=np.float32)
+
+    def load_batch(batch_index):
+        X_batch, y_batch = tf.numpy_function(load, [batch_index], (tf.float32, tf.float32))
+        X_batch.set_shape([None] + list(X.shape[1:]))
+        y_batch.set_shape([None] + list(y.shape[1:]))
+        return X_batch, y_batch
+
+    dataset = tf.data.Dataset.range(num_batches)
+    if shuffle:
+        dataset = dataset.shuffle(num_batches, seed=seed, reshuffle_each_iteration=True)
+    return dataset.map(load_batch, num_parallel_calls=AUTOTUNE).prefetch(AUTOTUNE)
+
+
+def write_tfrecord_shards(X, y, output_prefix, num_shards=1):
+    """Writes X/y as `num_shards` TFRecord files named <output_prefix>-00000-of-0000N.tfrecord."""
+    paths = []
+    for shard, indices in enumerate(np.array_split(np.arange(len(X)), num_shards)):
+        path = f"{output_prefix}-{shard:05d}-of-{num_shards:05d}.tfrecord"
+        with tf.io.TFRecordWriter(path) as writer:
+            for i in indices:
+                example = tf.train.Example(features=tf.train.Features(feature={
+                    "x": tf.train.Feature(float_list=tf.train.FloatList(value=X[i])),
+                    "y": tf.train.Feature(float_list=tf.train.FloatList(value=[y[i]])),
+                }))
+                writer.write(example.SerializeToString())
+        paths.append(path)
+    return paths
+
+
+class InputStallMonitor(tf.keras.callbacks.Callback):
+    """
+    Logs how long each epoch's training steps waited on the input pipeline.
+
+    attach() stamps every batch with the time the pipeline finished producing
+    it, just before the prefetch buffer. A step that starts before its batch
+    was ready stalled for the difference; if batches are always ready ahead of
+    time the stall is zero and training is compute bound.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self._ready_times = []
+        self._step = 0
+        self._step_start = 0.0
+        self._epoch_start = 0.0
+        self._stall = 0.0
+        self.history = []
+
+    def _mark_ready(self):
+        self._ready_times.append(time.perf_counter())
+        return np.int64(0)
+
+    def attach(self, dataset):
+        def stamp(X, y):
+            marker = tf.numpy_function(self._mark_ready, [], tf.int64)
+            with tf.control_dependencies([marker]):
+                return tf.identity(X), tf.identity(y)
+
+        return dataset.map(stamp)
+
+    def on_epoch_begin(self, epoch, logs=None):
+        self._ready_times.clear()
+        self._step = 0
+        self._stall = 0.0
+        self._epoch_start = time.perf_counter()
+
+    def on_train_batch_begin(self, batch, logs=None):
+        self._step_start = time.perf_counter()
+
+    def on_train_batch_end(self, batch, logs=None):
+        if self._step < len(self._ready_times):
+            self._stall += max(0.0, self._ready_times[self._step] - self._step_start)
+        self._step += 1
+
+    def on_epoch_end(self, epoch, logs=None):
+        epoch_time = time.perf_counter() - self._epoch_start
+        fraction = self._stall / epoch_time if epoch_time > 0 else 0.0
+        self.history.append({"epoch": epoch + 1, "epoch_seconds": epoch_time,
+                             "stall_seconds": self._stall, "stall_fraction": fraction})
+        bound = "input" if fraction > 0.2 else "compute"
+        print(f"Epoch {epoch + 1}: input pipeline stall {self._stall:.3f}s of {epoch_time:.3f}s "
+              f"({fraction:.1%}), {bound} bound")
+        if logs is not None:
+            logs["input_stall_seconds"] = self._stall
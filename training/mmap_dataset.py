@@ -0,0 +1,78 @@
+# training/mmap_dataset.py
+
+import json
+import os
+import numpy as np
+
+MANIFEST_FILE = "manifest.json"
+FORMAT_VERSION = 1
+
+
+def write_mmap_dataset(output_dir, splits):
+    """
+    Writes a dataset as uncompressed per-array .npy files that can be memory-mapped.
+
+    `splits` maps a split name to its (X, y) arrays, e.g. {"train": (X_train, y_train)}.
+    The splits are stored back to back in X.npy and y.npy, and manifest.json records
+    each array's shape and dtype plus the [start, stop) rows of every split.
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    num_rows = sum(len(X) for X, _ in splits.values())
+    first_X, first_y = next(iter(splits.values()))
+
+    manifest = {"format_version": FORMAT_VERSION, "arrays": {}, "splits": {}}
+    outputs = {}
+    for name, sample in (("X", first_X), ("y", first_y)):
+        shape = (num_rows,) + sample.shape[1:]
+        outputs[name] = np.lib.format.open_memmap(
+            os.path.join(output_dir, f"{name}.npy"), mode="w+", dtype=sample.dtype, shape=shape
+        )
+        manifest["arrays"][name] = {"file": f"{name}.npy", "shape": list(shape), "dtype": sample.dtype.str}
+
+    # Copy split by split into the mapped files, so the splits are never concatenated in memory
+    start = 0
+    for split, (X, y) in splits.items():
+        if len(X) != len(y):
+            raise ValueError(f"Split '{split}' has {len(X)} rows in X but {len(y)} in y.")
+        outputs["X"][start:start + len(X)] = X
+        outputs["y"][start:start + len(y)] = y
+        manifest["splits"][split] = [start, start + len(X)]
+        start += len(X)
+    for array in outputs.values():
+        array.flush()
+
+    with open(os.path.join(output_dir, MANIFEST_FILE), "w") as f:
+        json.dump(manifest, f, indent=2)
+    return output_dir
+
+
+def is_mmap_dataset(path):
+    return os.path.isfile(os.path.join(path, MANIFEST_FILE))
+
+
+def open_mmap_dataset(path, mmap_mode="r"):
+    """
+    Opens a dataset written by write_mmap_dataset() and returns {split: (X, y)}.
+
+    The arrays are np.memmap views, so rows are only read from disk when they are
+    accessed. Shapes and dtypes are checked against the manifest.
+    """
+    with open(os.path.join(path, MANIFEST_FILE)) as f:
+        manifest = json.load(f)
+    if manifest.get("format_version") != FORMAT_VERSION:
+        raise ValueError(f"Unsupported dataset format version: {manifest.get('format_version')}")
+
+    arrays = {}
+    for name, spec in manifest["arrays"].items():
+        array = np.load(os.path.join(path, spec["file"]), mmap_mode=mmap_mode)
+        if list(array.shape) != spec["shape"] or array.dtype.str != spec["dtype"]:
+            raise ValueError(
+                f"{spec['file']} has shape {array.shape} and dtype {array.dtype.str}, "
+                f"but the manifest expects {tuple(spec['shape'])} and {spec['dtype']}."
+            )
+        arrays[name] = array
+
+    return {
+        split: (arrays["X"][start:stop], arrays["y"][start:stop])
+        for split, (start, stop) in manifest["splits"].items()
+    }
@@ -1,12 +1,29 @@
 import tensorflow as tf
 
 
-def feed_forward_net(input_shape):
-    # Simple feed forward neural net with regression output
-    model = tf.keras.Sequential([
-        tf.keras.layers.Dense(64, activation='relu', input_shape=input_shape),  # ReLU for non-linearity
-        tf.keras.layers.Dense(64, activation='relu'),
-        tf.keras.layers.Dense(1)  # Regression output
-    ])
-    model.compile(optimizer='adam', loss='mse', metrics=['mae'])
+def feed_forward_net(input_shape, width=64, depth=2, learning_rate=0.001, normalizer=None):
+    # Simple feed forward neural net with regression output: `depth` hidden layers of `width` units.
+    # An adapted `normalizer` (see adapt_normalizer) is put in front, so the model scales raw features itself
+    if width < 1 or depth < 1:
+        raise ValueError(f"width and depth must be at least 1, got width={width} and depth={depth}")
+    layers = [tf.keras.Input(shape=input_shape)]
+    if normalizer is not None:
+        layers.append(normalizer)
+    layers.append(tf.keras.layers.Dense(width, activation='relu'))  # ReLU for non-linearity
+    layers += [tf.keras.layers.Dense(width, activation='relu') for _ in range(depth - 1)]
+    layers.append(tf.keras.layers.Dense(1, dtype='float32'))  # Regression output, kept float32 under mixed precision
+    model = tf.keras.Sequential(layers)
+    model.compile(optimizer=tf.keras.optimizers.Adam(learning_rate=learning_rate), loss='mse', metrics=['mae'])
     return model
+
+
+def adapt_normalizer(batches):
+    """
+    Returns a Normalization layer whose per-feature mean and variance are computed
+    in one streaming pass over `batches`, an iterable or tf.data.Dataset of (n, features)
+    feature batches. It runs in float32 even under mixed precision, since raw
+    features lose too much precision in bfloat16.
+    """
+    normalizer = tf.keras.layers.Normalization(axis=-1, dtype='float32')
+    normalizer.adapt(batches)
+    return normalizer
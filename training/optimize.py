@@ -0,0 +1,186 @@
+# training/optimize.py
+
+import argparse
+import gzip
+import json
+import os
+import sys
+import tempfile
+import time
+import numpy as np
+import tensorflow as tf
+from export import SERVING_BATCH_SIZES, export_saved_model, export_tflite
+from train import load_arrays
+
+# The variants are checked with the serving container's own TFLite backend
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "serving"))
+from backends import TFLitePredictor  # noqa: E402
+
+OPTIMIZED_DIR = "optimized"
+REPORT_FILE = "report.json"
+VARIANTS = ["float32", "int8_dynamic", "float16", "pruned"]
+REPORT_FIELDS = ["variant", "test_mae", "mae_delta", "size_bytes", "gzip_bytes",
+                 "latency_1_p50_ms", "latency_1_p99_ms", "latency_1024_p50_ms", "latency_1024_p99_ms"]
+
+
+class MagnitudePruning(tf.keras.callbacks.Callback):
+    """
+    Zeroes the smallest-magnitude weights of every Dense kernel while the model
+    fine-tunes. Sparsity ramps up to `target_sparsity` over `ramp_epochs` epochs
+    along a cubic schedule, so most weights are removed early while the model
+    can still recover; the masks are re-applied after every batch so pruned
+    weights stay zero.
+    """
+
+    def __init__(self, target_sparsity, ramp_epochs):
+        super().__init__()
+        self.target_sparsity = target_sparsity
+        self.ramp_epochs = max(ramp_epochs, 1)
+        self._masks = []
+
+    def _kernels(self):
+        return [layer.kernel for layer in self.model.layers if isinstance(layer, tf.keras.layers.Dense)]
+
+    def on_epoch_begin(self, epoch, logs=None):
+        progress = min(1.0, (epoch + 1) / self.ramp_epochs)
+        sparsity = self.target_sparsity * (1 - (1 - progress) ** 3)
+        self._masks = []
+        for kernel in self._kernels():
+            values = np.abs(kernel.numpy())
+            threshold = np.quantile(values, sparsity)
+            self._masks.append((values >= threshold).astype(values.dtype))
+        self._apply()
+
+    def on_train_batch_end(self, batch, logs=None):
+        self._apply()
+
+    def _apply(self):
+        for kernel, mask in zip(self._kernels(), self._masks):
+            kernel.assign(kernel * mask)
+
+
+def kernel_sparsity(model):
+    """Fraction of zero weights across the Dense kernels of `model`."""
+    kernels = [layer.kernel.numpy() for layer in model.layers if isinstance(layer, tf.keras.layers.Dense)]
+    return float(sum((k == 0).sum() for k in kernels) / sum(k.size for k in kernels))
+
+
+def prune_model(model, X_train, y_train, target_sparsity=0.8, epochs=10, batch_size=32, learning_rate=1e-4):
+    """Magnitude-prunes `model` in place, fine-tuning it on the training split as the sparsity ramps up."""
+    model.compile(optimizer=tf.keras.optimizers.Adam(learning_rate=learning_rate), loss="mse", metrics=["mae"])
+    model.fit(X_train, y_train, epochs=epochs, batch_size=batch_size, verbose=0,
+              callbacks=[MagnitudePruning(target_sparsity, ramp_epochs=max(epochs - 2, 1))])
+    return model
+
+
+def _latency_ms(fn, repeats):
+    fn()
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    return [round(float(p), 4) for p in np.percentile(timings, [50, 99]) * 1000]
+
+
+def evaluate_tflite(path, X_test, y_test, num_threads=1, repeats=200):
+    """Returns the test MAE, file sizes and single-row and 1024-row latency of a TFLite variant."""
+    predictor = TFLitePredictor(path, num_threads)
+    with open(path, "rb") as f:
+        content = f.read()
+    rng = np.random.default_rng(0)
+    single = X_test[rng.integers(len(X_test), size=1)]
+    batch = X_test[rng.integers(len(X_test), size=SERVING_BATCH_SIZES[-1])]
+    result = {
+        "test_mae": float(np.mean(np.abs(predictor.predict(X_test) - y_test))),
+        "size_bytes": len(content),
+        # Pruned zeros are stored densely in the flatbuffer, so they only pay off once compressed
+        "gzip_bytes": len(gzip.compress(content)),
+    }
+    result["latency_1_p50_ms"], result["latency_1_p99_ms"] = _latency_ms(lambda: predictor.predict(single), repeats)
+    result["latency_1024_p50_ms"], result["latency_1024_p99_ms"] = _latency_ms(lambda: predictor.predict(batch),
+                                                                                repeats)
+    return result
+
+
+def build_variants(model_path, output_dir, X_train, y_train, target_sparsity=0.8, prune_epochs=10):
+    """Writes one TFLite flatbuffer per variant in VARIANTS to `output_dir` and returns their paths."""
+    tf.io.gfile.makedirs(output_dir)
+    paths = {}
+    with tempfile.TemporaryDirectory() as scratch:
+        saved_model = export_saved_model(tf.keras.models.load_model(model_path), os.path.join(scratch, "float32"))
+        for quantization in [None, "int8_dynamic", "float16"]:
+            name = quantization or "float32"
+            paths[name] = export_tflite(saved_model, os.path.join(output_dir, f"{name}.tflite"),
+                                        quantization=quantization)
+
+        pruned = prune_model(tf.keras.models.load_model(model_path), X_train, y_train, target_sparsity, prune_epochs)
+        print(f"Pruned Dense kernels to {kernel_sparsity(pruned):.0%} sparsity")
+        pruned_saved_model = export_saved_model(pruned, os.path.join(scratch, "pruned"))
+        paths["pruned"] = export_tflite(pruned_saved_model, os.path.join(output_dir, "pruned.tflite"))
+    return paths
+
+
+def compare_variants(paths, X_test, y_test, baseline_mae, num_threads=1, repeats=200, mae_budget=None):
+    """
+    Evaluates every variant and returns the report. The recommended variant is
+    the smallest compressed file whose MAE is within `mae_budget` of the
+    baseline Keras model.
+    """
+    rows = []
+    for name, path in paths.items():
+        row = {"variant": name, **evaluate_tflite(path, X_test, y_test, num_threads, repeats)}
+        row["mae_delta"] = row["test_mae"] - baseline_mae
+        rows.append({field: row[field] for field in REPORT_FIELDS})
+
+    within_budget = [row for row in rows if mae_budget is None or row["mae_delta"] <= mae_budget]
+    recommended = min(within_budget, key=lambda row: row["gzip_bytes"])["variant"] if within_budget else None
+    return {"baseline_mae": baseline_mae, "mae_budget": mae_budget, "recommended": recommended, "variants": rows}
+
+
+def format_table(rows):
+    lines = ["  ".join(f"{field:>20}" for field in REPORT_FIELDS)]
+    for row in rows:
+        lines.append("  ".join(f"{row[field]:>20.4f}" if isinstance(row[field], float) else f"{row[field]:>20}"
+                               for field in REPORT_FIELDS))
+    return "\n".join(lines)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Build int8, float16 and pruned TFLite variants of model.keras and compare them on the test split."
+    )
+    parser.add_argument("--model_dir", type=str, required=True,
+                        help="Directory containing model.keras; the variants are written to <model_dir>/optimized")
+    parser.add_argument("--data_path", type=str,
+                        help="The .npz or memory-mapped dataset train.py used; defaults to the built-in Boston data")
+    parser.add_argument("--target_sparsity", type=float, default=0.8,
+                        help="Fraction of Dense kernel weights the pruned variant sets to zero")
+    parser.add_argument("--prune_epochs", type=int, default=10, help="Fine-tuning epochs while pruning")
+    parser.add_argument("--mae_budget", type=float, default=None,
+                        help="Largest acceptable MAE increase over model.keras for the recommended variant")
+    parser.add_argument("--num_threads", type=int, default=1, help="TFLite interpreter threads for the latency runs")
+    parser.add_argument("--repeats", type=int, default=200)
+    args = parser.parse_args()
+
+    X_train, y_train, X_test, y_test = load_arrays(args.data_path)
+    X_train, y_train = np.asarray(X_train, dtype=np.float32), np.asarray(y_train, dtype=np.float32)
+    X_test, y_test = np.asarray(X_test, dtype=np.float32), np.asarray(y_test, dtype=np.float32)
+
+    model_path = os.path.join(args.model_dir, "model.keras")
+    baseline = tf.keras.models.load_model(model_path)
+    baseline_mae = float(np.mean(np.abs(baseline.predict(X_test, verbose=0).reshape(-1) - y_test)))
+
+    output_dir = os.path.join(args.model_dir, OPTIMIZED_DIR)
+    paths = build_variants(model_path, output_dir, X_train, y_train, args.target_sparsity, args.prune_epochs)
+    report = compare_variants(paths, X_test, y_test, baseline_mae, args.num_threads, args.repeats, args.mae_budget)
+
+    with tf.io.gfile.GFile(os.path.join(output_dir, REPORT_FILE), "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"model.keras test MAE: {baseline_mae:.4f}")
+    print(format_table(report["variants"]))
+    print(f"Recommended variant: {report['recommended']} (report at {os.path.join(output_dir, REPORT_FILE)})")
+
+
+if __name__ == "__main__":
+    main()
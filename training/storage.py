@@ -0,0 +1,364 @@
+# training/storage.py
+
+import fnmatch
+import glob as local_glob
+import hashlib
+import os
+import re
+import shutil
+import tempfile
+import threading
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from typing import NamedTuple
+
+# Objects are moved in ranges of this size, several at a time
+CHUNK_SIZE = 16 * 1024 * 1024
+MAX_WORKERS = 8
+# GCS composes at most 32 objects in one request
+MAX_COMPOSE_SOURCES = 32
+CACHE_DIR = os.environ.get("STORAGE_CACHE_DIR", os.path.join(os.path.expanduser("~"), ".cache", "boston-mlops"))
+# Points gs:// paths at a local directory instead of Cloud Storage, e.g. for tests
+FAKE_GCS_ROOT_ENV = "FAKE_GCS_ROOT"
+
+
+class ObjectInfo(NamedTuple):
+    name: str
+    size: int
+    generation: int
+
+
+def is_remote(path) -> bool:
+    return str(path).startswith("gs://")
+
+
+def split_uri(uri: str):
+    """gs://bucket/a/b -> ("bucket", "a/b")"""
+    if not is_remote(uri):
+        raise ValueError(f"Not a gs:// URI: {uri}")
+    bucket, _, name = uri[len("gs://"):].partition("/")
+    return bucket, name
+
+
+class GCSBackend:
+    """Cloud Storage through google-cloud-storage, imported on first use."""
+
+    def __init__(self, project=None):
+        from google.cloud import storage
+
+        self.client = storage.Client(project=project)
+
+    def _blob(self, uri, generation=None):
+        bucket, name = split_uri(uri)
+        return self.client.bucket(bucket).blob(name, generation=generation)
+
+    def stat(self, uri) -> ObjectInfo:
+        from google.api_core.exceptions import NotFound
+
+        blob = self._blob(uri)
+        try:
+            blob.reload()
+        except NotFound:
+            raise FileNotFoundError(uri) from None
+        return ObjectInfo(split_uri(uri)[1], blob.size, blob.generation)
+
+    def list(self, uri) -> list:
+        bucket, prefix = split_uri(uri)
+        return [ObjectInfo(blob.name, blob.size, blob.generation)
+                for blob in self.client.list_blobs(bucket, prefix=prefix)]
+
+    def read_range(self, uri, start, stop, generation=None) -> bytes:
+        # Pinning the generation makes every range come from the same version of the object
+        return self._blob(uri, generation).download_as_bytes(start=start, end=stop - 1, checksum=None)
+
+    def write(self, uri, data: bytes):
+        self._blob(uri).upload_from_string(data)
+
+    def compose(self, uris, uri):
+        self._blob(uri).compose([self._blob(source) for source in uris])
+
+    def delete(self, uri):
+        self._blob(uri).delete()
+
+
+class FilesystemBackend:
+    """
+    Stands in for Cloud Storage with a local directory: gs://bucket/name is
+    <root>/bucket/name. Generations come from the file modification time.
+    """
+
+    def __init__(self, root):
+        self.root = root
+
+    def _path(self, uri):
+        bucket, name = split_uri(uri)
+        return os.path.join(self.root, bucket, name)
+
+    def stat(self, uri) -> ObjectInfo:
+        path = self._path(uri)
+        if not os.path.isfile(path):
+            raise FileNotFoundError(uri)
+        stat = os.stat(path)
+        return ObjectInfo(split_uri(uri)[1], stat.st_size, stat.st_mtime_ns)
+
+    def list(self, uri) -> list:
+        bucket, prefix = split_uri(uri)
+        bucket_dir = os.path.join(self.root, bucket)
+        objects = []
+        for directory, _, files in os.walk(bucket_dir):
+            for file in files:
+                name = os.path.relpath(os.path.join(directory, file), bucket_dir).replace(os.sep, "/")
+                if name.startswith(prefix):
+                    objects.append(self.stat(f"gs://{bucket}/{name}"))
+        return sorted(objects)
+
+    def read_range(self, uri, start, stop, generation=None) -> bytes:
+        if generation is not None and self.stat(uri).generation != generation:
+            raise FileNotFoundError(f"{uri} has no generation {generation}")
+        with open(self._path(uri), "rb") as f:
+            f.seek(start)
+            return f.read(stop - start)
+
+    def write(self, uri, data: bytes):
+        path = self._path(uri)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        temporary = f"{path}.{uuid.uuid4().hex}.tmp"
+        with open(temporary, "wb") as f:
+            f.write(data)
+        os.replace(temporary, path)
+
+    def compose(self, uris, uri):
+        self.write(uri, b"".join(self.read_range(source, 0, self.stat(source).size) for source in uris))
+
+    def delete(self, uri):
+        os.remove(self._path(uri))
+
+
+_backend = None
+_backend_lock = threading.Lock()
+
+
+def get_backend():
+    """The GCS client, or a FilesystemBackend when FAKE_GCS_ROOT is set."""
+    global _backend
+    with _backend_lock:
+        if _backend is None:
+            root = os.environ.get(FAKE_GCS_ROOT_ENV)
+            _backend = FilesystemBackend(root) if root else GCSBackend()
+        return _backend
+
+
+def set_backend(backend):
+    global _backend
+    _backend = backend
+
+
+def glob(pattern, backend=None):
+    """The sorted local paths or gs:// URIs matching `pattern`."""
+    if not is_remote(pattern):
+        return sorted(local_glob.glob(pattern))
+    bucket, name = split_uri(pattern)
+    # List everything under the part of the pattern before its first wildcard
+    prefix = re.split(r"[*?\[]", name, maxsplit=1)[0]
+    objects = (backend or get_backend()).list(f"gs://{bucket}/{prefix}")
+    return sorted(f"gs://{bucket}/{info.name}" for info in objects if fnmatch.fnmatchcase(info.name, name))
+
+
+def _ranges(size, chunk_size):
+    return [(start, min(start + chunk_size, size)) for start in range(0, size, chunk_size)] or [(0, 0)]
+
+
+def download(uri, path, chunk_size=CHUNK_SIZE, max_workers=MAX_WORKERS, backend=None):
+    """
+    Downloads one object to `path` in `chunk_size` ranges fetched in parallel and
+    written at their offsets. The file only appears under `path` once complete.
+    """
+    backend = backend or get_backend()
+    info = backend.stat(uri)
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    temporary = f"{path}.{uuid.uuid4().hex}.tmp"
+    try:
+        with open(temporary, "wb") as f:
+            f.truncate(info.size)
+
+            def fetch(span):
+                start, stop = span
+                os.pwrite(f.fileno(), backend.read_range(uri, start, stop, info.generation), start)
+
+            with ThreadPoolExecutor(max_workers) as pool:
+                list(pool.map(fetch, _ranges(info.size, chunk_size)))
+        os.replace(temporary, path)
+    finally:
+        if os.path.exists(temporary):
+            os.remove(temporary)
+    return path
+
+
+def upload(path, uri, chunk_size=CHUNK_SIZE, max_workers=MAX_WORKERS, backend=None):
+    """
+    Uploads one file. Files larger than `chunk_size` are uploaded as parts in
+    parallel and composed into `uri` (a parallel composite upload); the parts
+    are deleted afterwards.
+    """
+    backend = backend or get_backend()
+    size = os.path.getsize(path)
+    if size <= chunk_size:
+        with open(path, "rb") as f:
+            backend.write(uri, f.read())
+        return uri
+
+    # Grow the parts if needed, so one compose request takes all of them
+    chunk_size = max(chunk_size, -(-size // MAX_COMPOSE_SOURCES))
+    spans = _ranges(size, chunk_size)
+    parts = [f"{uri}.part-{uuid.uuid4().hex[:8]}-{index:02d}" for index in range(len(spans))]
+    with open(path, "rb") as f:
+
+        def send(part_and_span):
+            part, (start, stop) = part_and_span
+            backend.write(part, os.pread(f.fileno(), stop - start, start))
+
+        try:
+            with ThreadPoolExecutor(max_workers) as pool:
+                list(pool.map(send, zip(parts, spans)))
+            backend.compose(parts, uri)
+        finally:
+            for part in parts:
+                try:
+                    backend.delete(part)
+                except (FileNotFoundError, OSError):
+                    pass
+    return uri
+
+
+def download_dir(uri, local_dir, max_workers=MAX_WORKERS, backend=None):
+    """Downloads every object under the `uri` prefix into `local_dir`, keeping the relative paths."""
+    backend = backend or get_backend()
+    bucket, prefix = split_uri(uri.rstrip("/") + "/")
+    objects = backend.list(f"gs://{bucket}/{prefix}")
+    if not objects:
+        raise FileNotFoundError(uri)
+    with ThreadPoolExecutor(max_workers) as pool:
+        list(pool.map(lambda info: download(f"gs://{bucket}/{info.name}",
+                                            os.path.join(local_dir, *info.name[len(prefix):].split("/")),
+                                            max_workers=max_workers, backend=backend), objects))
+    return local_dir
+
+
+def upload_dir(local_dir, uri, max_workers=MAX_WORKERS, backend=None):
+    """Uploads every file under `local_dir` to the `uri` prefix, keeping the relative paths."""
+    backend = backend or get_backend()
+    uris = []
+    for directory, _, files in os.walk(local_dir):
+        for file in files:
+            path = os.path.join(directory, file)
+            relative = os.path.relpath(path, local_dir).replace(os.sep, "/")
+            uris.append((path, uri.rstrip("/") + "/" + relative))
+    with ThreadPoolExecutor(max_workers) as pool:
+        list(pool.map(lambda item: upload(*item, max_workers=max_workers, backend=backend), uris))
+    return uri
+
+
+def _read_ahead(path, chunk_size, prefetch, backend):
+    """Yields the ranges of a remote object in order, with up to `prefetch` of them fetched ahead."""
+    info = backend.stat(path)
+    spans = iter(_ranges(info.size, chunk_size))
+    with ThreadPoolExecutor(max(1, prefetch)) as pool:
+        pending = [pool.submit(backend.read_range, path, *span, info.generation)
+                   for span in (next(spans, None) for _ in range(max(1, prefetch))) if span]
+        while pending:
+            data = pending.pop(0).result()
+            span = next(spans, None)
+            if span:
+                pending.append(pool.submit(backend.read_range, path, *span, info.generation))
+            yield data
+
+
+def _read_local(path, chunk_size):
+    with open(path, "rb") as f:
+        yield from iter(lambda: f.read(chunk_size), b"")
+
+
+def iter_blocks(path, chunk_size=CHUNK_SIZE, prefetch=4, backend=None):
+    """
+    Yields a local or gs:// file as bytes blocks of about `chunk_size` that hold
+    whole lines: every block but the last ends with a newline. Remote files are
+    read with up to `prefetch` ranges fetched ahead of the block being yielded.
+    """
+    if is_remote(path):
+        chunks = _read_ahead(path, chunk_size, prefetch, backend or get_backend())
+    else:
+        chunks = _read_local(path, chunk_size)
+    remainder = b""
+    for data in chunks:
+        data = remainder + data
+        cut = data.rfind(b"\n") + 1
+        if cut:
+            yield data[:cut]
+        remainder = data[cut:]
+    if remainder:
+        yield remainder
+
+
+def iter_lines(path, chunk_size=CHUNK_SIZE, prefetch=4, backend=None):
+    """Yields the lines of a local or gs:// text file without reading it whole."""
+    if not is_remote(path):
+        with open(path, "r") as f:
+            yield from f
+        return
+
+    for block in iter_blocks(path, chunk_size, prefetch, backend):
+        lines = block.split(b"\n")
+        last = lines.pop()
+        for line in lines:
+            yield line.decode() + "\n"
+        if last:
+            yield last.decode()
+
+
+def fetch(path, cache_dir=None, backend=None):
+    """
+    Returns a local path for `path`. Local paths are returned as they are; a
+    gs:// object or prefix is downloaded into `cache_dir` under a key made of
+    its URI and object generations, so later calls reuse the copy until the
+    remote object changes.
+    """
+    if not is_remote(path):
+        return path
+    backend = backend or get_backend()
+    cache_dir = cache_dir or CACHE_DIR
+    try:
+        objects = [backend.stat(path)]
+        is_dir = False
+    except FileNotFoundError:
+        bucket, prefix = split_uri(path.rstrip("/") + "/")
+        objects = backend.list(f"gs://{bucket}/{prefix}")
+        is_dir = True
+        if not objects:
+            raise FileNotFoundError(path) from None
+
+    key = hashlib.sha256(path.rstrip("/").encode())
+    for info in objects:
+        key.update(f"{info.name}:{info.generation};".encode())
+    target = os.path.join(cache_dir, key.hexdigest()[:24], os.path.basename(path.rstrip("/")))
+    if os.path.exists(target):
+        return target
+
+    # Download next to the cache entry and rename, so a half-written entry is never reused
+    os.makedirs(cache_dir, exist_ok=True)
+    staging = tempfile.mkdtemp(dir=cache_dir)
+    try:
+        staged = os.path.join(staging, os.path.basename(target))
+        if is_dir:
+            download_dir(path, staged, backend=backend)
+        else:
+            download(path, staged, backend=backend)
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+        try:
+            os.replace(staged, target)
+        except OSError:
+            # Another process filled the same entry first
+            if not os.path.exists(target):
+                raise
+    finally:
+        shutil.rmtree(staging, ignore_errors=True)
+    return target
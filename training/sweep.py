@@ -0,0 +1,177 @@
+# training/sweep.py
+
+import argparse
+import csv
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+SEARCH_SPACE = {
+    "width": [16, 32, 64, 128, 256],
+    "depth": [1, 2, 3, 4],
+    "learning_rate": (1e-4, 1e-2),  # sampled log-uniformly
+    "batch_size": [16, 32, 64, 128],
+}
+RESULT_FIELDS = ["trial", "rung", "width", "depth", "learning_rate", "batch_size", "epochs",
+                 "mae", "wall_time_s", "samples_per_sec"]
+
+# Set in each worker process by _init_worker
+_worker_data = {}
+
+
+def sample_configs(num_trials, seed=0):
+    """Draws `num_trials` random hyperparameter configurations from SEARCH_SPACE."""
+    rng = np.random.default_rng(seed)
+    low, high = SEARCH_SPACE["learning_rate"]
+    return [
+        {
+            "width": int(rng.choice(SEARCH_SPACE["width"])),
+            "depth": int(rng.choice(SEARCH_SPACE["depth"])),
+            "learning_rate": float(np.exp(rng.uniform(np.log(low), np.log(high)))),
+            "batch_size": int(rng.choice(SEARCH_SPACE["batch_size"])),
+        }
+        for _ in range(num_trials)
+    ]
+
+
+def _init_worker(data_path, threads_per_trial, validation_fraction):
+    # Pin the worker to a few threads so parallel trials do not oversubscribe the cores
+    os.environ["OMP_NUM_THREADS"] = str(threads_per_trial)
+    import tensorflow as tf
+    tf.config.threading.set_intra_op_parallelism_threads(threads_per_trial)
+    tf.config.threading.set_inter_op_parallelism_threads(threads_per_trial)
+
+    from train import load_arrays
+    X_train, y_train, _, _ = load_arrays(data_path)
+    num_fit = len(X_train) - int(len(X_train) * validation_fraction)
+    _worker_data["fit"] = (X_train[:num_fit], y_train[:num_fit])
+    _worker_data["val"] = (np.asarray(X_train[num_fit:]), np.asarray(y_train[num_fit:]))
+
+
+def run_trial(trial):
+    """Trains one configuration in a worker and returns its validation MAE and throughput."""
+    import tensorflow as tf
+    from model import feed_forward_net
+    from input_pipeline import make_array_dataset
+
+    tf.keras.utils.set_random_seed(trial["trial"])
+    X, y = _worker_data["fit"]
+    X_val, y_val = _worker_data["val"]
+
+    model = feed_forward_net((X.shape[1],), trial["width"], trial["depth"], trial["learning_rate"])
+    start = time.perf_counter()
+    if isinstance(X, np.memmap):
+        dataset = make_array_dataset(X, y, trial["batch_size"], shuffle=True, seed=trial["trial"])
+        model.fit(dataset, epochs=trial["epochs"], verbose=0)
+    else:
+        model.fit(X, y, epochs=trial["epochs"], batch_size=trial["batch_size"], verbose=0)
+    wall_time = time.perf_counter() - start
+
+    _, mae = model.evaluate(X_val, y_val, batch_size=1024, verbose=0)
+    return {**trial, "mae": float(mae), "wall_time_s": wall_time,
+            "samples_per_sec": len(X) * trial["epochs"] / wall_time}
+
+
+def random_search(configs, evaluate, epochs):
+    """Trains every configuration for `epochs` epochs."""
+    trials = [{"trial": i, "rung": 0, **config, "epochs": epochs} for i, config in enumerate(configs)]
+    return evaluate(trials)
+
+
+def successive_halving(configs, evaluate, min_epochs, max_epochs, eta=3):
+    """
+    Trains all configurations for `min_epochs`, keeps the best 1/eta by MAE and
+    retrains them with eta times the epochs, until one configuration is left or
+    `max_epochs` is reached. Cheap early rungs weed out bad configurations so the
+    large budgets go only to promising ones.
+    """
+    results = []
+    survivors = [{"trial": i, **config} for i, config in enumerate(configs)]
+    epochs, rung = min_epochs, 0
+    while True:
+        rung_results = evaluate([{**config, "rung": rung, "epochs": epochs} for config in survivors])
+        results.extend(rung_results)
+        if len(survivors) <= 1 or epochs >= max_epochs:
+            return results
+        keep = max(1, len(survivors) // eta)
+        best = sorted(rung_results, key=lambda result: result["mae"])[:keep]
+        survivors = [{key: result[key] for key in ("trial", *SEARCH_SPACE)} for result in best]
+        epochs, rung = min(epochs * eta, max_epochs), rung + 1
+
+
+def write_results(results, path):
+    with open(path, "w", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=RESULT_FIELDS)
+        writer.writeheader()
+        for result in results:
+            writer.writerow({field: result[field] for field in RESULT_FIELDS})
+
+
+def format_table(results):
+    rows = sorted(results, key=lambda result: (-result["rung"], result["mae"]))
+    lines = [" ".join(f"{field:>15}" for field in RESULT_FIELDS)]
+    for result in rows:
+        lines.append(" ".join(
+            f"{result[field]:>15.4g}" if isinstance(result[field], float) else f"{result[field]:>15}"
+            for field in RESULT_FIELDS
+        ))
+    return "\n".join(lines)
+
+
+def run_sweep(data_path, strategy="random", num_trials=8, workers=2, threads_per_trial=1, epochs=5,
+              min_epochs=1, max_epochs=9, eta=3, validation_fraction=0.1, seed=0):
+    """
+    Runs a hyperparameter sweep on a local process pool and returns one result per trial.
+
+    Workers are spawned (TensorFlow is not fork-safe), load the data once and are
+    limited to `threads_per_trial` threads each.
+    """
+    configs = sample_configs(num_trials, seed)
+    context = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(workers, mp_context=context, initializer=_init_worker,
+                             initargs=(data_path, threads_per_trial, validation_fraction)) as pool:
+        def evaluate(trials):
+            return list(pool.map(run_trial, trials))
+
+        if strategy == "halving":
+            return successive_halving(configs, evaluate, min_epochs, max_epochs, eta)
+        return random_search(configs, evaluate, epochs)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run a local hyperparameter sweep for feed_forward_net.")
+    parser.add_argument("--data_path", type=str,
+                        help="Data for train.py; the last --validation_fraction of the training rows is used for MAE")
+    parser.add_argument("--strategy", type=str, choices=["random", "halving"], default="random")
+    parser.add_argument("--num_trials", type=int, default=8)
+    parser.add_argument("--workers", type=int, default=max(1, (os.cpu_count() or 1) // 2))
+    parser.add_argument("--threads_per_trial", type=int, default=1)
+    parser.add_argument("--epochs", type=int, default=5, help="Epochs per trial (random search)")
+    parser.add_argument("--min_epochs", type=int, default=1, help="Epochs in the first rung (halving)")
+    parser.add_argument("--max_epochs", type=int, default=9, help="Epoch cap for the last rung (halving)")
+    parser.add_argument("--eta", type=int, default=3, help="Keep 1/eta of the trials per rung (halving)")
+    parser.add_argument("--validation_fraction", type=float, default=0.1)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", type=str, default="sweep_results.csv")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    results = run_sweep(args.data_path, args.strategy, args.num_trials, args.workers, args.threads_per_trial,
+                        args.epochs, args.min_epochs, args.max_epochs, args.eta, args.validation_fraction,
+                        args.seed)
+    write_results(results, args.output)
+    print(format_table(results))
+
+    best = min((result for result in results if result["rung"] == max(r["rung"] for r in results)),
+               key=lambda result: result["mae"])
+    print(f"\nSweep took {time.perf_counter() - start:.1f}s; results written to {args.output}")
+    print(f"Best configuration (MAE {best['mae']:.4f}):")
+    print(f"  python training/train.py --width {best['width']} --depth {best['depth']} "
+          f"--learning_rate {best['learning_rate']:.3g} --batch_size {best['batch_size']} --epochs {best['epochs']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,52 +1,309 @@
 # training/train.py
 
 import argparse
+import json
 import os
+import tempfile
 import numpy as np
 import tensorflow as tf
-from model import feed_forward_net
+from model import adapt_normalizer, feed_forward_net
+from export import EXPORT_FORMATS, export_serving_artifacts
+from input_pipeline import InputStallMonitor, list_shards, make_array_dataset, make_dataset
+from mmap_dataset import is_mmap_dataset, open_mmap_dataset
+from checkpointing import CHECKPOINT_DIR, TrainingCheckpoint
+from storage import fetch, is_remote, upload_dir
+from incremental import (DEFAULT_REPLAY_SIZE, REPLAY_FILE, TRAINING_MODES, ReplaySample, previous_artifacts,
+                         warm_start_model)
+from distributed import (PRECISIONS, STRATEGIES, ThroughputMonitor, configure_runtime, distributed_evaluate,
+                         distributed_fit, is_chief, make_strategy)
 
 
-def main():
+def parse_args():
     parser = argparse.ArgumentParser()
     parser.add_argument("--model_dir", type=str, required=True,
                         help="Local or GCS path to save the model")
     parser.add_argument("--data_path", type=str,
-                        help="Local or GCS path to .npz file with X_train, y_train, X_test, y_test")
-    args = parser.parse_args()
-
-    # Load data
-    if args.data_path:
-        print(f"Loading data from: {args.data_path}")
-        # If data_path is on GCS, the container should have gcsfuse or you need to download it
-        # For local example, just assume it's a local .npz
-        data = np.load(args.data_path)
-        X_train = data["X_train"]
-        y_train = data["y_train"]
-        X_test = data["X_test"]
-        y_test = data["y_test"]
+                        help="Local or GCS path to .npz file with X_train, y_train, X_test, y_test, "
+                             "or a memory-mapped dataset directory with manifest.json")
+    parser.add_argument("--training_mode", type=str, choices=TRAINING_MODES, default="full",
+                        help="'full' trains a new model on --data_path; 'incremental' continues training the model "
+                             "in --warm_start_dir on --new_data_path plus the replay sample of earlier data")
+    parser.add_argument("--new_data_path", type=str,
+                        help="Glob of new .npz files or dataset directories, in the --data_path format "
+                             "(incremental mode)")
+    parser.add_argument("--warm_start_dir", type=str, default="",
+                        help="Model directory with the previous model.keras and replay sample; "
+                             "defaults to --model_dir (incremental mode)")
+    parser.add_argument("--replay_size", type=int, default=DEFAULT_REPLAY_SIZE,
+                        help="Rows in the uniform sample of all data trained on so far, saved next to the model "
+                             "and mixed into incremental runs")
+    parser.add_argument("--data_mode", type=str, choices=["memory", "tfdata"], default="memory",
+                        help="'memory' loads --data_path into RAM; 'tfdata' streams --train_files through tf.data")
+    parser.add_argument("--train_files", type=str,
+                        help="Glob of .npz or .tfrecord training shards (tfdata mode)")
+    parser.add_argument("--eval_files", type=str,
+                        help="Glob of evaluation shards (tfdata mode); defaults to the test split of --train_files")
+    parser.add_argument("--batch_size", type=int, default=32,
+                        help="Batch size per replica; with --distribute multiworker the global batch is "
+                             "batch_size * number of workers")
+    parser.add_argument("--epochs", type=int, default=5)
+    parser.add_argument("--width", type=int, default=64, help="Units per hidden layer")
+    parser.add_argument("--depth", type=int, default=2, help="Number of hidden layers")
+    parser.add_argument("--learning_rate", type=float, default=0.001)
+    parser.add_argument("--normalize", action="store_true",
+                        help="Put a Normalization layer adapted on the training features in front of the model, "
+                             "so the saved model scales raw features itself")
+    parser.add_argument("--early_stopping_patience", type=int, default=0,
+                        help="Stop after this many epochs without a lower validation loss and keep the best "
+                             "weights; 0 (the default) disables early stopping")
+    parser.add_argument("--checkpoint_every", type=int, default=0,
+                        help="Save a checkpoint to <model_dir>/checkpoints every N epochs; 0 (the default) disables "
+                             "checkpoints")
+    parser.add_argument("--resume", action="store_true",
+                        help="Continue from the latest checkpoint in <model_dir>/checkpoints, "
+                             "including the optimizer state and epoch counter")
+    parser.add_argument("--shuffle_buffer", type=int, default=10000,
+                        help="Rows held in the shuffle buffer (tfdata mode)")
+    parser.add_argument("--cache", action="store_true",
+                        help="Cache decoded rows after the first epoch (tfdata mode)")
+    parser.add_argument("--cache_path", type=str, default="",
+                        help="File to cache to instead of memory (tfdata mode)")
+    parser.add_argument("--distribute", type=str, choices=STRATEGIES, default="none",
+                        help="'multiworker' trains data parallel across the workers in TF_CONFIG")
+    parser.add_argument("--intra_op_threads", type=int, default=0,
+                        help="Threads used within one op; 0 uses the TensorFlow default")
+    parser.add_argument("--inter_op_threads", type=int, default=0,
+                        help="Ops run in parallel; 0 uses the TensorFlow default")
+    parser.add_argument("--precision", type=str, choices=PRECISIONS, default="float32",
+                        help="'mixed_bfloat16' computes in bfloat16 with float32 weights; "
+                             "the saved model is float32 either way")
+    parser.add_argument("--metrics_file", type=str, default="",
+                        help="Write the test MAE and per-epoch samples/sec to this JSON file")
+    parser.add_argument("--export_formats", type=str, nargs="+", choices=EXPORT_FORMATS, default=EXPORT_FORMATS,
+                        help="Serving artifacts to write next to model.keras")
+    return parser.parse_args()
+
+
+def load_arrays(data_path):
+    # A gs:// file or dataset directory is downloaded in parallel ranges and cached by object generation
+    data_path = fetch(data_path) if data_path else data_path
+    if data_path and is_mmap_dataset(data_path):
+        print(f"Memory-mapping data from: {data_path}")
+        splits = open_mmap_dataset(data_path)
+        (X_train, y_train), (X_test, y_test) = splits["train"], splits["test"]
+        return X_train, y_train, X_test, y_test
+
+    if data_path:
+        print(f"Loading data from: {data_path}")
+        data = np.load(data_path)
+        return data["X_train"], data["y_train"], data["X_test"], data["y_test"]
+
+    print("No data_path provided. Using built-in Boston Housing dataset.")
+    (X_train, y_train), (X_test, y_test) = tf.keras.datasets.boston_housing.load_data()
+    return X_train, y_train, X_test, y_test
+
+
+def load_incremental_arrays(args):
+    """
+    The new data plus the replay sample of earlier data to train on, the new
+    data's test split, the warm-start model path and the updated replay sample.
+    """
+    if not args.new_data_path:
+        raise ValueError("--new_data_path is required in incremental mode")
+    new_arrays = [load_arrays(path) for path in list_shards(args.new_data_path)]
+    X_new, y_new, X_test, y_test = (np.concatenate([np.asarray(arrays[i], dtype=np.float32) for arrays in new_arrays])
+                                    for i in range(4))
+    model_path, replay_path = previous_artifacts(args.warm_start_dir or args.model_dir, fetch)
+    if replay_path:
+        previous = ReplaySample.load(replay_path, args.replay_size)
+    else:
+        print("No replay sample found; training on the new data only")
+        previous = ReplaySample.empty(X_new.shape[1], args.replay_size)
+    print(f"Training on {len(X_new)} new rows and {len(previous)} replayed rows out of {previous.seen} seen")
+
+    # Mixed, since the validation hold-out is the last rows and would otherwise be all replayed rows
+    order = np.random.default_rng(0).permutation(len(X_new) + len(previous))
+    X_train = np.concatenate([X_new, previous.X])[order]
+    y_train = np.concatenate([y_new, previous.y])[order]
+    replay = ReplaySample(previous.X.copy(), previous.y.copy(), previous.seen, args.replay_size).add(X_new, y_new)
+    return X_train, y_train, X_test, y_test, model_path, replay
+
+
+def fit_callbacks(args, model, chief=True):
+    """
+    Builds the early stopping and checkpoint callbacks, and restores the latest checkpoint with --resume.
+
+    Under MultiWorkerMirroredStrategy saving runs collective ops, so every worker has
+    to save; the other workers write to a scratch directory and all of them restore
+    from the chief's checkpoints.
+    """
+    callbacks = []
+    early_stopping = None
+    if args.early_stopping_patience > 0:
+        early_stopping = tf.keras.callbacks.EarlyStopping(
+            monitor="val_loss", patience=args.early_stopping_patience, restore_best_weights=True, verbose=1
+        )
+        callbacks.append(early_stopping)
+
+    initial_epoch = 0
+    if args.checkpoint_every > 0 or args.resume:
+        # Listed after EarlyStopping, so the restored early stopping state survives its reset
+        checkpoint_dir = os.path.join(args.model_dir, CHECKPOINT_DIR)
+        save_dir = checkpoint_dir if chief else tempfile.mkdtemp(prefix="checkpoints-")
+        checkpoint = TrainingCheckpoint(save_dir, args.checkpoint_every, early_stopping=early_stopping)
+        if args.resume:
+            initial_epoch = checkpoint.restore(model, checkpoint_dir)
+        callbacks.append(checkpoint)
+    return callbacks, initial_epoch
+
+
+def fit_and_evaluate(args, model, strategy, train_data, val_data, test_data, callbacks, initial_epoch):
+    """Trains and tests `model` with Keras fit(), or with the data-parallel loop under --distribute multiworker."""
+    if args.distribute == "multiworker":
+        distributed_fit(model, strategy, train_data, val_data, args.epochs, initial_epoch, callbacks)
+        return distributed_evaluate(model, strategy, test_data)
+    model.fit(train_data, epochs=args.epochs, validation_data=val_data, callbacks=callbacks,
+              initial_epoch=initial_epoch)
+    loss, mae = model.evaluate(test_data)
+    return mae
+
+
+def train_in_memory(args, strategy, batch_size, callbacks=(), chief=True):
+    """Trains on arrays and returns the model, its test MAE and the replay sample to save with it."""
+    if args.training_mode == "incremental":
+        X_train, y_train, X_test, y_test, model_path, replay = load_incremental_arrays(args)
+        model = warm_start_model(model_path, args.learning_rate)
     else:
-        print("No data_path provided. Using built-in Boston Housing dataset.")
-        (X_train, y_train), (X_test, y_test) = tf.keras.datasets.boston_housing.load_data()
+        X_train, y_train, X_test, y_test = load_arrays(args.data_path)
+        replay = ReplaySample.empty(X_train.shape[1], args.replay_size)
+        for i in range(0, len(X_train), 65536):
+            replay.add(X_train[i:i + 65536], y_train[i:i + 65536], np.random.default_rng(i))
+
+        normalizer = None
+        if args.normalize:
+            # Stream the features in chunks, so memory-mapped arrays are not read into memory at once
+            normalizer = adapt_normalizer(np.asarray(X_train[i:i + 65536], dtype=np.float32)
+                                          for i in range(0, len(X_train), 65536))
+        model = feed_forward_net((X_train.shape[1],), args.width, args.depth, args.learning_rate, normalizer)
+    fit_extra, initial_epoch = fit_callbacks(args, model, chief)
+    callbacks = list(callbacks) + fit_extra
 
-    input_shape = (X_train.shape[1],)
+    if isinstance(X_train, np.memmap) or args.distribute == "multiworker":
+        # Memory-mapped arrays are fed batch by batch so rows are paged in on demand, and the multi-worker
+        # loop needs datasets to shard; like validation_split, the last 10% of the training rows are held out
+        num_train = len(X_train) - int(len(X_train) * 0.1)
+        train_ds = make_array_dataset(X_train[:num_train], y_train[:num_train], batch_size, shuffle=True)
+        val_ds = make_array_dataset(X_train[num_train:], y_train[num_train:], batch_size)
+        test_ds = make_array_dataset(X_test, y_test, batch_size)
+        mae = fit_and_evaluate(args, model, strategy, train_ds, val_ds, test_ds, callbacks, initial_epoch)
+        return model, mae, replay
 
-    # Create and train model
-    model = feed_forward_net(input_shape)
-    model.fit(X_train, y_train, epochs=5, validation_split=0.1)
+    model.fit(X_train, y_train, epochs=args.epochs, batch_size=batch_size, validation_split=0.1,
+              callbacks=callbacks, initial_epoch=initial_epoch)
 
-    # Evaluate
     loss, mae = model.evaluate(X_test, y_test)
+    return model, mae, replay
+
+
+def train_streaming(args, strategy, batch_size, callbacks=(), chief=True):
+    if not args.train_files:
+        raise ValueError("--train_files is required in tfdata mode")
+    if args.training_mode == "incremental":
+        raise ValueError("Incremental training needs --data_mode memory")
+    train_files = list_shards(args.train_files)
+    if args.eval_files:
+        eval_files, eval_split = list_shards(args.eval_files), "train"
+    else:
+        eval_files, eval_split = train_files, "test"
+    print(f"Streaming {len(train_files)} training shard(s) and {len(eval_files)} evaluation shard(s)")
+
+    stall_monitor = InputStallMonitor()
+    train_ds = make_dataset(train_files, batch_size, split="train", shuffle_buffer=args.shuffle_buffer,
+                            cache=args.cache, cache_path=args.cache_path, stall_monitor=stall_monitor)
+    eval_ds = make_dataset(eval_files, batch_size, split=eval_split)
+
+    normalizer = None
+    if args.normalize:
+        features = make_dataset(train_files, 65536, split="train").map(lambda X, y: X)
+        normalizer = adapt_normalizer(features)
+    model = feed_forward_net((train_ds.element_spec[0].shape[-1],), args.width, args.depth, args.learning_rate,
+                             normalizer)
+    fit_extra, initial_epoch = fit_callbacks(args, model, chief)
+    callbacks = [stall_monitor] + list(callbacks) + fit_extra
+    return model, fit_and_evaluate(args, model, strategy, train_ds, eval_ds, eval_ds, callbacks, initial_epoch)
+
+
+def to_float32(model):
+    """
+    Rebuilds a mixed precision model from its own config with a float32 policy, so
+    the saved model serves in float32. Warm-started models keep the architecture
+    they were loaded with, which --width and --depth need not describe.
+    """
+    if tf.keras.mixed_precision.global_policy().name == "float32":
+        return model
+    tf.keras.mixed_precision.set_global_policy("float32")
+
+    def clone_float32(layer):
+        # The normalizer already runs in float32, and a rebuilt one would lose its adapted statistics
+        if isinstance(layer, tf.keras.layers.Normalization):
+            return layer
+        return layer.__class__.from_config({**layer.get_config(), "dtype": "float32"})
+
+    float32_model = tf.keras.models.clone_model(model, clone_function=clone_float32)
+    float32_model.set_weights(model.get_weights())
+    float32_model.compile_from_config(model.get_compile_config())
+    return float32_model
+
+
+def main():
+    args = parse_args()
+    configure_runtime(args.intra_op_threads, args.inter_op_threads, args.precision)
+    strategy = make_strategy(args.distribute)
+    chief = is_chief()
+    batch_size = args.batch_size * strategy.num_replicas_in_sync
+    throughput = ThroughputMonitor(batch_size)
+    print(f"Training on {strategy.num_replicas_in_sync} replica(s) with a global batch size of {batch_size}")
+
+    # Create, train and evaluate the model; variables created in the scope are mirrored across workers
+    with strategy.scope():
+        if args.data_mode == "tfdata":
+            model, mae = train_streaming(args, strategy, batch_size, [throughput], chief)
+            replay = None
+        else:
+            model, mae, replay = train_in_memory(args, strategy, batch_size, [throughput], chief)
     print(f"Test MAE: {mae}")
 
-    # Ensure the output directory exists
-    os.makedirs(args.model_dir, exist_ok=True)
+    # Only the chief writes outputs; the other workers hold identical weights
+    if not chief:
+        return
+
+    if args.metrics_file:
+        with tf.io.gfile.GFile(args.metrics_file, "w") as f:
+            json.dump({"test_mae": float(mae), "replicas": strategy.num_replicas_in_sync,
+                       "global_batch_size": batch_size, "samples_per_sec": throughput.history}, f)
+
+    model = to_float32(model)
+
+    # A gs:// model directory is written locally first and uploaded in parallel at the end
+    output_dir = tempfile.mkdtemp() if is_remote(args.model_dir) else args.model_dir
+    os.makedirs(output_dir, exist_ok=True)
 
     # Save the model
-    model_path = os.path.join(args.model_dir, "model.keras")
+    model_path = os.path.join(output_dir, "model.keras")
     model.save(model_path)
     print(f"Model saved at: {model_path}")
 
+    # Export the NumPy weights, the traced SavedModel and TFLite artifacts, and the serving warmup requests
+    for name, path in export_serving_artifacts(model, output_dir, args.export_formats).items():
+        print(f"Exported {name} to: {path}")
+    if replay is not None:
+        replay.save(os.path.join(output_dir, REPLAY_FILE))
+        print(f"Saved a replay sample of {len(replay)} rows out of {replay.seen} seen")
+
+    if output_dir != args.model_dir:
+        upload_dir(output_dir, args.model_dir)
+        print(f"Uploaded model artifacts to: {args.model_dir}")
+
 
 if __name__ == "__main__":
     main()